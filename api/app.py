@@ -40,6 +40,7 @@ def create_app():
                 'transcription': '/api/transcribe',
                 'analysis': '/api/analyze',
                 'files': '/api/files',
+                'models': '/api/models',
                 'status': '/api/jobs/{job_id}/status'
             }
         }
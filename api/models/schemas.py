@@ -12,8 +12,21 @@ class TranscriptionRequest:
     video_id_filter: Optional[str] = None
     ignore_existing: bool = False
     use_whisper: bool = False
+    backend: Optional[str] = None
     ai_analysis: bool = False
     target_person: Optional[str] = None
+    batch_size: Optional[int] = None
+    vad_filter: Optional[bool] = None
+    parallel_chunks: Optional[int] = None
+    profile: Optional[str] = None
+    cascade_model: Optional[str] = None
+    hallucination_guard: Optional[bool] = None
+    segment_timestamps: Optional[bool] = None
+    workers: Optional[int] = None
+    threads_per_worker: Optional[int] = None
+    speech_triage: Optional[bool] = None
+    triage_threshold: Optional[float] = None
+    captions: Optional[bool] = None
 
 @dataclass
 class AnalysisRequest:
@@ -49,14 +49,14 @@ def list_transcript_files():
             'summaries': []
         }
         
-        # Words (JSON com timestamps)
+        # Words (JSON com timestamps e formato colunar .words.bin)
         words_dir = TRANSCRIPT_DIR / 'words'
         if words_dir.exists():
-            for file_path in words_dir.glob("*.json"):
+            for file_path in [*words_dir.glob("*.json"), *words_dir.glob("*.words.bin")]:
                 stat = file_path.stat()
                 files['words'].append({
                     'filename': file_path.name,
-                    'video_id': file_path.stem,
+                    'video_id': file_path.name.replace('.words.bin', '').replace('.json', ''),
                     'size': stat.st_size,
                     'modified': stat.st_mtime
                 })
@@ -81,6 +81,31 @@ def cancel_job(job_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/models', methods=['GET'])
+def list_models():
+    """
+    Lista os modelos do repositório local (MODELS_DIR) e, por backend, os tamanhos
+    disponíveis e os compute_types suportados neste host
+    
+    Response: {
+        "success": true,
+        "models_dir": "/caminho/models",
+        "offline": false,
+        "device": "cpu",
+        "backends": {
+            "faster-whisper": {"installed": true, "available_sizes": ["tiny", ...], "compute_types": ["float32", "int8", ...]}
+        },
+        "models": [{"backend": "faster-whisper", "model_size": "tiny", "path": "...", "size_mb": 74.5, ...}]
+    }
+    """
+    try:
+        from src.model_store import store_report
+        
+        return jsonify({'success': True, **store_report()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/status', methods=['GET'])
 def api_status():
     """
@@ -4,9 +4,28 @@ Endpoints para operações de transcrição
 from flask import Blueprint, request, jsonify
 from api.services.transcription_service import transcription_service
 from api.services.job_manager import job_manager
+from src.backends import available_backends
+from src.config import DECODING_PROFILES
 
 bp = Blueprint('transcription', __name__)
 
+def _validate_options(options):
+    """
+    Valida as opções de transcrição que escolhem entre valores conhecidos
+    
+    Returns:
+        str ou None: Mensagem de erro, ou None se as opções forem válidas
+    """
+    if not isinstance(options, dict):
+        return 'Options must be an object'
+    profile = options.get('profile')
+    if profile is not None and profile not in DECODING_PROFILES:
+        return f"Invalid profile: {profile} (available: {', '.join(DECODING_PROFILES)})"
+    backend = options.get('backend')
+    if backend is not None and backend not in available_backends():
+        return f"Invalid backend: {backend} (available: {', '.join(available_backends())})"
+    return None
+
 @bp.route('/transcribe', methods=['POST'])
 def start_transcription():
     """
@@ -19,8 +38,21 @@ def start_transcription():
             "playlist_mode": false,
             "ignore_existing": false,
             "use_whisper": false,
+            "backend": "faster-whisper",
             "ai_analysis": false,
-            "target_person": "Nome da Pessoa"
+            "target_person": "Nome da Pessoa",
+            "batch_size": 8,
+            "vad_filter": false,
+            "parallel_chunks": 4,
+            "profile": "fast",
+            "cascade_model": "large-v3",
+            "hallucination_guard": true,
+            "segment_timestamps": false,
+            "workers": 0,
+            "threads_per_worker": 4,
+            "speech_triage": true,
+            "triage_threshold": 0.05,
+            "captions": true
         }
     }
     """
@@ -38,6 +70,9 @@ def start_transcription():
             return jsonify({'error': 'URLs must be a list'}), 400
         
         options = data.get('options', {})
+        error = _validate_options(options)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Valida URLs
         for url in urls:
@@ -77,6 +112,9 @@ def transcribe_single():
             return jsonify({'error': 'URL is required'}), 400
         
         options = data.get('options', {})
+        error = _validate_options(options)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Inicia job de transcrição
         job_id = transcription_service.transcribe_single_video(url, options)
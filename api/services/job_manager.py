@@ -89,7 +89,8 @@ class SimpleJobManager:
     
     def update_job(self, job_id: str, status: Optional[str] = None, 
                    step: Optional[str] = None, progress: Optional[int] = None,
-                   result: Optional[Any] = None, error: Optional[str] = None):
+                   result: Optional[Any] = None, error: Optional[str] = None,
+                   schedule: Optional[Dict[str, Any]] = None):
         """Atualiza um job existente"""
         if job_id not in self.jobs:
             return False
@@ -107,6 +108,8 @@ class SimpleJobManager:
                 job['result'] = result
             if error is not None:
                 job['error'] = error
+            if schedule is not None:
+                job['schedule'] = schedule
             
             job['updated_at'] = datetime.now().isoformat()
         
@@ -82,8 +82,23 @@ class TranscriptionService:
                 'video_id_filter': options.get('video_id_filter'),
                 'ignore_existing': options.get('ignore_existing', False),
                 'use_whisper': options.get('use_whisper', False),
+                'backend': options.get('backend'),
                 'ai_analysis': options.get('ai_analysis', False),
-                'target_person': options.get('target_person')
+                'target_person': options.get('target_person'),
+                'transcription_options': {
+                    'batch_size': options.get('batch_size'),
+                    'vad_filter': options.get('vad_filter'),
+                    'parallel_chunks': options.get('parallel_chunks'),
+                    'profile': options.get('profile'),
+                    'cascade_model': options.get('cascade_model'),
+                    'hallucination_guard': options.get('hallucination_guard'),
+                    'word_timestamps': False if options.get('segment_timestamps') else None
+                },
+                'workers': options.get('workers'),
+                'threads_per_worker': options.get('threads_per_worker'),
+                'speech_triage': options.get('speech_triage'),
+                'triage_threshold': options.get('triage_threshold'),
+                'captions': options.get('captions')
             }
             if not process_options['only_excel']:
                 videos_file = Path(project_root) / "videos.txt"
@@ -99,10 +114,20 @@ class TranscriptionService:
             job_manager.add_log(job_id, "Iniciando download do áudio.")
             job_manager.update_step_status(job_id, "download", "in-progress", message="Baixando áudio...")
             # ...existing code...
+            run_report = {}
+            
+            def on_schedule(schedule):
+                # Fila planejada (mais longos primeiro) e conclusão estimada, visíveis durante o job
+                job_manager.update_job(job_id, schedule=schedule)
+                job_manager.add_log(job_id, f"Transcrição de {len(schedule['order'])} arquivo(s) planejada; "
+                                            f"conclusão estimada em {schedule['eta']}.")
+            
             result = self.process_all(
                 audio_dir=str(AUDIO_DIR),
                 transcript_dir=str(TRANSCRIPT_DIR),
                 excel_name=DEFAULT_EXCEL_FILENAME,
+                run_report=run_report,
+                on_schedule=on_schedule,
                 **process_options
             )
             job_manager.add_log(job_id, "Download do áudio concluído.")
@@ -128,7 +153,8 @@ class TranscriptionService:
             result_data = {
                 'success': True,
                 'excel_file': result if isinstance(result, str) else None,
-                'processed_urls': len(urls)
+                'processed_urls': len(urls),
+                'report': run_report
             }
             job_manager.add_log(job_id, "Processamento finalizado.")
             job_manager.complete_job(job_id, result_data)
@@ -115,16 +115,62 @@ class ContentClassifier:
         Returns:
             DataFrame com colunas adicionadas
         """
-        classification_columns = ['Calúnia_IA', 'Injúria_IA', 'Difamação_IA']
+        for col in self._classification_columns():
+            if col not in df.columns:
+                df[col] = pd.NA
         
+        return df
+    
+    def _classification_columns(self) -> List[str]:
+        """Colunas preenchidas pela classificação."""
+        classification_columns = ['Calúnia_IA', 'Injúria_IA', 'Difamação_IA']
         if CLASSIFICATION_WITH_EXPLANATION:
             classification_columns.append('Explicação_IA')
+        return classification_columns
+    
+    def _duplicate_rows(self, df: pd.DataFrame) -> Dict[int, int]:
+        """
+        Associa as linhas de vídeos duplicados (coluna 'duplicata_de') às linhas equivalentes do
+        vídeo de origem no mesmo DataFrame (mesma transcrição e timestamp).
         
-        for col in classification_columns:
-            if col not in df.columns:
-                df[col] = pd.NA
+        Args:
+            df: DataFrame com segmentos
+            
+        Returns:
+            Dicionário {índice da linha duplicada: índice da linha de origem}; linhas cuja origem
+            não está no DataFrame ficam de fora e são classificadas normalmente
+        """
+        if 'duplicata_de' not in df.columns or 'video_id' not in df.columns:
+            return {}
+        key_columns = ['transcrição'] + (['timestamp'] if 'timestamp' in df.columns else [])
         
-        return df
+        def key(index, video_id):
+            return (video_id,) + tuple('' if pd.isna(df.at[index, col]) else df.at[index, col] for col in key_columns)
+        
+        sources = {}
+        for index in df.index:
+            if pd.isna(df.at[index, 'duplicata_de']):
+                sources.setdefault(key(index, df.at[index, 'video_id']), index)
+        duplicates = {}
+        for index in df.index:
+            source_id = df.at[index, 'duplicata_de']
+            if not pd.isna(source_id) and key(index, source_id) in sources:
+                duplicates[index] = sources[key(index, source_id)]
+        return duplicates
+    
+    def _copy_classifications(self, df: pd.DataFrame, duplicates: Dict[int, int]) -> None:
+        """
+        Copia para as linhas duplicadas a classificação das linhas de origem.
+        
+        Args:
+            df: DataFrame com segmentos (alterado no lugar)
+            duplicates: Resultado de _duplicate_rows
+        """
+        for index, source_index in duplicates.items():
+            for col in self._classification_columns():
+                df.at[index, col] = df.at[source_index, col]
+        if duplicates:
+            logger.info(f"Classificação reaproveitada em {len(duplicates)} segmento(s) de vídeos duplicados")
     
     def _save_progress(self, df: pd.DataFrame, output_file: str) -> None:
         """
@@ -142,17 +188,20 @@ class ContentClassifier:
         except Exception as e:
             logger.error(f"Erro ao salvar progresso: {e}")
     
-    def _get_video_ids_from_dataframe(self, df: pd.DataFrame) -> List[str]:
+    def _get_video_ids_from_dataframe(self, df: pd.DataFrame, exclude_rows=None) -> List[str]:
         """
         Extrai IDs únicos de vídeos do DataFrame.
         
         Args:
             df: DataFrame com dados
+            exclude_rows: Índices de linhas ignoradas (ex: duplicadas, que não geram resumo)
             
         Returns:
             Lista de IDs de vídeos únicos
         """
         if 'video_id' in df.columns:
+            if exclude_rows:
+                df = df[~df.index.isin(list(exclude_rows))]
             return df['video_id'].unique().tolist()
         else:
             logger.warning("Coluna 'video_id' não encontrada no DataFrame")
@@ -195,18 +244,22 @@ class ContentClassifier:
         df['transcrição'] = df['transcrição'].fillna('').astype(str)
         df = self._add_classification_columns(df)
         
-        # Identifica segmentos para processar
+        # Identifica segmentos para processar (os de vídeos duplicados copiam a classificação da origem)
+        duplicates = self._duplicate_rows(df)
         mask = pd.isna(df['Calúnia_IA']) | pd.isna(df['Injúria_IA']) | pd.isna(df['Difamação_IA'])
-        indices_to_process = df[mask].index.tolist()
+        indices_to_process = [index for index in df[mask].index if index not in duplicates]
         
         if not indices_to_process:
+            if duplicates:
+                self._copy_classifications(df, duplicates)
+                self._save_progress(df, output_file)
             logger.info("Todos os segmentos já foram processados!")
             return
         
         logger.info(f"Segmentos a processar: {len(indices_to_process)}")
         
         # Gera resumos dos vídeos
-        video_ids = self._get_video_ids_from_dataframe(df)
+        video_ids = self._get_video_ids_from_dataframe(df, exclude_rows=duplicates)
         logger.info(f"Gerando resumos para {len(video_ids)} vídeos...")
         summaries = await self.summary_generator.generate_summaries_for_videos(video_ids)
         
@@ -251,6 +304,9 @@ class ContentClassifier:
             self._save_progress(df, output_file)
             raise
         
+        if duplicates:
+            self._copy_classifications(df, duplicates)
+            self._save_progress(df, output_file)
         logger.info(f"Classificação concluída! Resultados salvos em '{output_file}'")
     
     async def classify_dataframe(
@@ -277,11 +333,14 @@ class ContentClassifier:
         df = self._add_classification_columns(df)
         
         # Gera resumos se necessário
-        video_ids = self._get_video_ids_from_dataframe(df)
+        duplicates = self._duplicate_rows(df)
+        video_ids = self._get_video_ids_from_dataframe(df, exclude_rows=duplicates)
         summaries = await self.summary_generator.generate_summaries_for_videos(video_ids)
         
-        # Processa todos os segmentos
+        # Processa todos os segmentos (os de vídeos duplicados copiam a classificação da origem)
         for index in df.index:
+            if index in duplicates:
+                continue
             segment_text = df.at[index, 'transcrição']
             video_id = df.at[index, 'video_id'] if 'video_id' in df.columns else None
             video_summary = summaries.get(video_id) if video_id else None
@@ -299,6 +358,7 @@ class ContentClassifier:
             if CLASSIFICATION_WITH_EXPLANATION:
                 df.at[index, 'Explicação_IA'] = classification['explicação']
         
+        self._copy_classifications(df, duplicates)
         return df
     
     def analyze_excel_file(self, input_file: str, output_file: str = "", sheet_name: str = 'Sheet1', target_person: Optional[str] = None, with_explanation: bool = False, resume: bool = True) -> str:
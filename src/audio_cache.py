@@ -0,0 +1,277 @@
+"""
+Módulo de cache de áudio pré-decodificado.
+Converte cada arquivo de áudio (mp4, m4a, mp3, aac, wav) uma única vez para PCM
+mono 16 kHz em float32, gravado em disco e indexado pelo hash do arquivo de origem.
+As transcrições seguintes leem o áudio mapeado em memória, sem invocar o ffmpeg.
+O cache tem um tamanho máximo (AUDIO_CACHE_MAX_MB): ao gravar um novo arquivo, os menos
+usados recentemente são removidos. Com o cache desativado, nada é gravado em disco.
+"""
+import os
+import time
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.utils.logger import setup_logger
+from src.utils.file_hash import file_sha256
+from src.config import AUDIO_CACHE_DIR, AUDIO_CACHE_ENABLED, AUDIO_CACHE_MAX_MB, AUDIO_PREFETCH_WORKERS
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Um lock por arquivo decodificado: quem chega durante a decodificação aguarda o resultado
+_decode_locks = {}
+_decode_locks_lock = threading.Lock()
+
+
+def decoded_audio_path(audio_path, cache_dir=None):
+    """
+    Retorna o caminho do áudio decodificado correspondente a um arquivo de origem.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio original.
+        cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+
+    Returns:
+        str: Caminho do arquivo .f32 (PCM float32 mono 16 kHz, sem cabeçalho).
+    """
+    key = file_sha256(audio_path)
+    return os.path.join(str(cache_dir or AUDIO_CACHE_DIR), key[:2], f"{key}.f32")
+
+
+def _run_ffmpeg(audio_path, output_path):
+    """
+    Decodifica o áudio com o ffmpeg para PCM float32, em um arquivo ou, com output_path="pipe:1",
+    na memória.
+
+    Returns:
+        bytes: Saída do ffmpeg (as amostras, quando decodificadas para a memória).
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado no PATH")
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0", "-y",
+        "-i", audio_path,
+        "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        output_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao decodificar {audio_path}: {result.stderr.decode(errors='ignore').strip()}")
+    return result.stdout
+
+
+def _touch(path):
+    """Marca um arquivo do cache como usado agora (ordem de remoção LRU)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir=None, max_mb=None, keep=None):
+    """
+    Remove os áudios decodificados usados há mais tempo até o cache caber no limite.
+
+    Arquivos ainda mapeados por outro processo podem ser removidos com segurança no Linux/macOS
+    (o conteúdo só é liberado quando o último mapeamento é fechado); no Windows, a remoção
+    falha e o arquivo é mantido.
+
+    Args:
+        cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+        max_mb (float, optional): Tamanho máximo em MB (padrão: AUDIO_CACHE_MAX_MB do config; 0 = sem limite).
+        keep (str, optional): Arquivo que nunca é removido (ex: o que acabou de ser decodificado).
+
+    Returns:
+        int: Número de arquivos removidos.
+    """
+    max_mb = AUDIO_CACHE_MAX_MB if max_mb is None else max_mb
+    cache_dir = str(cache_dir or AUDIO_CACHE_DIR)
+    if not max_mb or not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith(".f32"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    budget = max_mb * 1024 * 1024
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"Cache de áudio: {removed} arquivo(s) removido(s) para respeitar o limite de {max_mb} MB")
+    return removed
+
+
+def decode_to_cache(audio_path, cache_dir=None):
+    """
+    Garante que o áudio esteja decodificado no cache, decodificando-o se necessário.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio original.
+        cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+
+    Returns:
+        str: Caminho do arquivo decodificado.
+    """
+    decoded_path = decoded_audio_path(audio_path, cache_dir)
+    with _decode_locks_lock:
+        lock = _decode_locks.setdefault(decoded_path, threading.Lock())
+
+    with lock:
+        if os.path.exists(decoded_path):
+            _touch(decoded_path)
+            return decoded_path
+        os.makedirs(os.path.dirname(decoded_path), exist_ok=True)
+        # Temporário exclusivo do processo: vários processos podem decodificar o mesmo arquivo
+        tmp_path = f"{decoded_path}.{os.getpid()}.tmp"
+        start_time = time.time()
+        try:
+            _run_ffmpeg(audio_path, tmp_path)
+            os.replace(tmp_path, decoded_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        duration = os.path.getsize(decoded_path) / 4 / SAMPLE_RATE
+        logger.info(f"Áudio decodificado para o cache: {os.path.basename(audio_path)} "
+                    f"({duration:.1f}s de áudio em {time.time() - start_time:.1f}s)")
+    prune_cache(cache_dir, keep=decoded_path)
+    return decoded_path
+
+
+def load_audio(audio_path, cache_dir=None, mode='r'):
+    """
+    Carrega o áudio mono 16 kHz em float32 a partir do cache, mapeado em memória.
+
+    Com o cache desativado (AUDIO_CACHE_ENABLED), o áudio é decodificado direto para a memória,
+    sem gravar nada em disco.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio original.
+        cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+        mode (str): Modo do np.memmap ('r' somente leitura, 'c' cópia na escrita).
+
+    Returns:
+        np.ndarray: Amostras do áudio (np.memmap, ou um array em memória com o cache desativado);
+                    vazio se o arquivo não tiver áudio.
+    """
+    if not AUDIO_CACHE_ENABLED:
+        data = _run_ffmpeg(audio_path, "pipe:1")
+        return np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32).copy()
+    decoded_path = decode_to_cache(audio_path, cache_dir)
+    if os.path.getsize(decoded_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(decoded_path, dtype=np.float32, mode=mode)
+
+
+def cached_audio(audio_path, cache_dir=None):
+    """
+    Retorna o áudio decodificado somente se ele já estiver no cache (sem invocar o ffmpeg).
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio original.
+        cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+
+    Returns:
+        np.ndarray or None: Amostras do áudio (np.memmap), ou None se não estiver no cache.
+    """
+    try:
+        decoded_path = decoded_audio_path(audio_path, cache_dir)
+        if not os.path.exists(decoded_path):
+            return None
+        _touch(decoded_path)
+        if os.path.getsize(decoded_path) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(decoded_path, dtype=np.float32, mode='r')
+    except OSError:
+        return None
+
+
+def audio_input(audio_path, mode='r'):
+    """
+    Retorna a entrada de áudio a ser passada ao modelo de transcrição.
+
+    Com o cache ativado, devolve o áudio decodificado mapeado em memória; caso contrário
+    (ou se a decodificação falhar), devolve o próprio caminho para o modelo decodificar.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio original.
+        mode (str): Modo do np.memmap ('r' somente leitura, 'c' cópia na escrita).
+
+    Returns:
+        np.ndarray or str: Áudio decodificado ou o caminho original.
+    """
+    if not AUDIO_CACHE_ENABLED:
+        return audio_path
+    try:
+        return load_audio(audio_path, mode=mode)
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"Cache de áudio indisponível para {audio_path}; o modelo decodificará o arquivo: {e}")
+        return audio_path
+
+
+class AudioPrefetcher:
+    """Decodifica em segundo plano os próximos áudios da fila de transcrição."""
+
+    def __init__(self, max_workers=AUDIO_PREFETCH_WORKERS, cache_dir=None):
+        """
+        Inicializa o pré-carregador.
+
+        Args:
+            max_workers (int): Número de decodificações simultâneas.
+            cache_dir (str, optional): Diretório do cache (padrão: AUDIO_CACHE_DIR do config).
+        """
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="audio-prefetch")
+        self._futures = {}
+
+    def prefetch(self, audio_paths):
+        """
+        Agenda a decodificação dos áudios, na ordem em que serão transcritos.
+
+        Args:
+            audio_paths (list): Caminhos dos arquivos de áudio.
+        """
+        if not AUDIO_CACHE_ENABLED:
+            return
+        for audio_path in audio_paths:
+            if audio_path and audio_path not in self._futures:
+                self._futures[audio_path] = self._executor.submit(self._decode, audio_path)
+
+    def _decode(self, audio_path):
+        try:
+            return decode_to_cache(audio_path, self.cache_dir)
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Não foi possível pré-decodificar {audio_path}: {e}")
+            return None
+
+    def close(self):
+        """Cancela as decodificações pendentes e encerra as threads."""
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,449 @@
+"""
+Módulo de impressão digital acústica para detectar áudios duplicados.
+A cada 100 ms do áudio decodificado (16 kHz) é gerada uma sub-impressão de 32 bits com o
+sinal das variações de energia entre 33 bandas de frequência, ao longo do tempo e da
+frequência. Essas sub-impressões resistem a recodificação e mudança de volume, de modo que
+re-uploads do mesmo clipe e cópias locais de vídeos do YouTube são reconhecidos antes da
+transcrição e reaproveitam a transcrição existente.
+"""
+import os
+import json
+import shutil
+import threading
+import numpy as np
+from src.utils.logger import setup_logger
+from src.utils.audio_files import find_audio_file
+from src.word_store import WORD_STORE_SUFFIX
+from src.config import (
+    FINGERPRINT_DIR, FINGERPRINT_SIMILARITY_THRESHOLD, FINGERPRINT_MIN_COVERAGE, FINGERPRINT_MAX_OFFSET_SECONDS
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 2048                          # Amostras por janela de análise (128 ms)
+HOP_SIZE = 1600                            # Passo entre sub-impressões (100 ms)
+NUM_BANDS = 33                             # Bandas log-espaçadas entre 300 Hz e 3 kHz (32 bits de diferenças)
+BAND_RANGE_HZ = (300, 3000)
+BLOCK_FRAMES = 4096                        # Janelas processadas por vez (limita a memória em áudios longos)
+MIN_VOTES = 10                             # Sub-impressões idênticas necessárias para avaliar um candidato
+MAX_CANDIDATES = 5                         # Candidatos (vídeo, deslocamento) verificados por consulta
+# Sub-impressões de silêncio/sinal constante não distinguem áudios e são ignoradas na busca
+IGNORED_HASHES = (0, 0xFFFFFFFF)
+
+# Arquivos de saída reaproveitados de um vídeo duplicado
+OUTPUT_SUFFIXES = (".txt", ".json", WORD_STORE_SUFFIX)
+# Blocos divididos (transcripts/sections) reaproveitados de um vídeo duplicado
+SECTION_SUFFIXES = ("_split.json", "_split.txt")
+
+_band_edges = None
+
+
+def _bands():
+    """Índices dos bins da FFT que delimitam cada banda (calculados uma única vez)."""
+    global _band_edges
+    if _band_edges is None:
+        edges_hz = np.geomspace(BAND_RANGE_HZ[0], BAND_RANGE_HZ[1], NUM_BANDS + 1)
+        _band_edges = np.round(edges_hz * FRAME_SIZE / SAMPLE_RATE).astype(np.int64)
+    return _band_edges
+
+
+def compute_fingerprint(audio):
+    """
+    Calcula a impressão digital de um áudio.
+
+    Args:
+        audio (np.ndarray): Amostras mono em float32 a 16 kHz (pode ser um np.memmap).
+
+    Returns:
+        np.ndarray: Uma sub-impressão uint32 a cada HOP_SIZE amostras.
+    """
+    if len(audio) < FRAME_SIZE + HOP_SIZE:
+        return np.zeros(0, dtype=np.uint32)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, FRAME_SIZE)[::HOP_SIZE]
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    edges = _bands()
+    energies = np.empty((len(frames), NUM_BANDS), dtype=np.float32)
+    for start in range(0, len(frames), BLOCK_FRAMES):
+        block = np.asarray(frames[start:start + BLOCK_FRAMES], dtype=np.float32) * window
+        power = np.abs(np.fft.rfft(block, axis=1)) ** 2
+        energies[start:start + len(block)] = np.add.reduceat(power[:, edges[0]:edges[-1]],
+                                                             edges[:-1] - edges[0], axis=1)
+
+    # Bit = sinal da diferença (entre quadros consecutivos) das diferenças entre bandas vizinhas
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    weights = (1 << np.arange(NUM_BANDS - 1, dtype=np.uint64)).astype(np.uint64)
+    return (bits.astype(np.uint64) @ weights).astype(np.uint32)
+
+
+def fingerprint_file(audio_path):
+    """
+    Calcula a impressão digital de um arquivo a partir do cache de áudio decodificado.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio.
+
+    Returns:
+        tuple: (impressão digital, duração em segundos), ou (None, None) se não for possível
+               decodificar o áudio.
+    """
+    from src.audio_cache import load_audio
+    try:
+        audio = load_audio(audio_path)
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"Impressão digital indisponível para {audio_path}: {e}")
+        return None, None
+    return compute_fingerprint(audio), len(audio) / SAMPLE_RATE
+
+
+def similarity(fp_a, fp_b, offset=0):
+    """
+    Compara duas impressões digitais alinhadas por um deslocamento.
+
+    Args:
+        fp_a (np.ndarray): Impressão digital consultada.
+        fp_b (np.ndarray): Impressão digital de referência.
+        offset (int): Posição em fp_b correspondente ao início de fp_a (em sub-impressões).
+
+    Returns:
+        tuple: (fração de bits iguais no trecho em comum, fração do áudio mais longo coberta por ele)
+    """
+    start_a, start_b = max(0, -offset), max(0, offset)
+    length = min(len(fp_a) - start_a, len(fp_b) - start_b)
+    if length <= 0:
+        return 0.0, 0.0
+    xor = np.bitwise_xor(fp_a[start_a:start_a + length], fp_b[start_b:start_b + length])
+    different_bits = np.unpackbits(xor.view(np.uint8)).sum()
+    return 1 - different_bits / (32 * length), length / max(len(fp_a), len(fp_b))
+
+
+class FingerprintIndex:
+    """Índice em disco das impressões digitais dos vídeos já transcritos."""
+
+    def __init__(self, index_dir=FINGERPRINT_DIR):
+        """
+        Inicializa o índice (as impressões são lidas apenas na primeira busca).
+
+        Args:
+            index_dir (str or Path): Diretório com {video_id}.npy e index.json.
+        """
+        self.index_dir = str(index_dir)
+        self.meta_file = os.path.join(self.index_dir, "index.json")
+        self._lock = threading.Lock()
+        self.meta = {}
+        if os.path.exists(self.meta_file):
+            try:
+                with open(self.meta_file, encoding='utf-8') as f:
+                    self.meta = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                logger.warning(f"Índice de impressões digitais ilegível; será recriado: {self.meta_file}")
+        self._lookup = None
+
+    def _path(self, video_id):
+        return os.path.join(self.index_dir, f"{video_id}.npy")
+
+    def _save_meta(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.meta_file + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+        os.replace(self.meta_file + ".tmp", self.meta_file)
+
+    def add(self, video_id, fingerprint, duration, compute_seconds=None, pending=False):
+        """
+        Adiciona (ou substitui) a impressão digital de um vídeo.
+
+        Args:
+            video_id (str): ID do vídeo.
+            fingerprint (np.ndarray): Resultado de compute_fingerprint.
+            duration (float): Duração do áudio em segundos.
+            compute_seconds (float, optional): Tempo gasto na transcrição do vídeo.
+            pending (bool): Se True, o vídeo ainda não foi transcrito; a entrada só vale como
+                            origem de duplicados depois de confirm().
+        """
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            np.save(self._path(video_id), fingerprint)
+            self.meta[video_id] = {"duration": duration, "frames": int(len(fingerprint)),
+                                   "compute_seconds": compute_seconds}
+            if pending:
+                self.meta[video_id]["pending"] = True
+            self._save_meta()
+            self._lookup = None
+
+    def pending_ids(self):
+        """Retorna os IDs indexados cuja transcrição ainda não foi confirmada."""
+        with self._lock:
+            return {video_id for video_id, meta in self.meta.items() if meta.get("pending")}
+
+    def confirm(self, video_id, compute_seconds=None):
+        """
+        Marca um vídeo indexado como transcrito, registrando o tempo de transcrição.
+
+        Args:
+            video_id (str): ID do vídeo.
+            compute_seconds (float, optional): Tempo gasto na transcrição (mantém o atual se None).
+        """
+        with self._lock:
+            if video_id in self.meta:
+                self.meta[video_id].pop("pending", None)
+                if compute_seconds is not None:
+                    self.meta[video_id]["compute_seconds"] = compute_seconds
+                self._save_meta()
+
+    def remove(self, video_id):
+        """Remove um vídeo do índice (ex: a transcrição falhou)."""
+        with self._lock:
+            if self.meta.pop(video_id, None) is not None:
+                self._save_meta()
+                self._lookup = None
+            if os.path.exists(self._path(video_id)):
+                os.remove(self._path(video_id))
+
+    def _build_lookup(self):
+        """Monta a tabela ordenada (sub-impressão, vídeo, posição) usada na busca."""
+        video_ids, hashes, owners, positions = [], [], [], []
+        for video_id in self.meta:
+            try:
+                fingerprint = np.load(self._path(video_id), mmap_mode='r')
+            except (OSError, ValueError):
+                continue
+            video_ids.append(video_id)
+            hashes.append(np.asarray(fingerprint))
+            owners.append(np.full(len(fingerprint), len(video_ids) - 1, dtype=np.int32))
+            positions.append(np.arange(len(fingerprint), dtype=np.int32))
+        if not hashes:
+            return video_ids, np.zeros(0, np.uint32), np.zeros(0, np.int32), np.zeros(0, np.int32)
+        hashes, owners, positions = np.concatenate(hashes), np.concatenate(owners), np.concatenate(positions)
+        order = np.argsort(hashes, kind='stable')
+        return video_ids, hashes[order], owners[order], positions[order]
+
+    def find_duplicate(self, fingerprint, exclude=None, threshold=FINGERPRINT_SIMILARITY_THRESHOLD,
+                       min_coverage=FINGERPRINT_MIN_COVERAGE):
+        """
+        Procura no índice um áudio quase idêntico.
+
+        Sub-impressões idênticas votam em pares (vídeo, deslocamento); os mais votados são
+        verificados comparando todos os bits do trecho em comum.
+
+        Args:
+            fingerprint (np.ndarray): Impressão digital consultada.
+            exclude (set, optional): IDs ignorados (ex: o próprio vídeo).
+            threshold (float): Fração mínima de bits iguais.
+            min_coverage (float): Fração mínima do áudio mais longo coberta pelo trecho em comum.
+
+        Returns:
+            dict or None: video_id, similarity, coverage e offset_seconds (posição do início do
+                          áudio consultado na referência) do melhor candidato, ou None.
+        """
+        with self._lock:
+            if self._lookup is None:
+                self._lookup = self._build_lookup()
+            video_ids, hashes, owners, positions = self._lookup
+        if len(hashes) == 0 or len(fingerprint) == 0:
+            return None
+
+        query = np.asarray(fingerprint)
+        query_positions = np.flatnonzero(~np.isin(query, IGNORED_HASHES))
+        left = np.searchsorted(hashes, query[query_positions], side='left')
+        counts = np.searchsorted(hashes, query[query_positions], side='right') - left
+        total = int(counts.sum())
+        if total == 0:
+            return None
+        # Expande cada consulta em todas as ocorrências da sua sub-impressão no índice
+        starts = np.repeat(left - np.cumsum(counts) + counts, counts)
+        matches = starts + np.arange(total)
+        offsets = positions[matches].astype(np.int64) - np.repeat(query_positions, counts)
+        keys, votes = np.unique(owners[matches].astype(np.int64) * (1 << 32) + offsets + (1 << 31), return_counts=True)
+
+        best = None
+        for idx in np.argsort(votes)[::-1][:MAX_CANDIDATES]:
+            if votes[idx] < MIN_VOTES:
+                break
+            owner, offset = int(keys[idx] >> 32), int(keys[idx] & 0xFFFFFFFF) - (1 << 31)
+            video_id = video_ids[owner]
+            if exclude and video_id in exclude:
+                continue
+            reference = np.load(self._path(video_id), mmap_mode='r')
+            score, coverage = similarity(query, reference, offset)
+            if score >= threshold and coverage >= min_coverage and (best is None or score > best["similarity"]):
+                best = {"video_id": video_id, "similarity": round(float(score), 4),
+                        "coverage": round(float(coverage), 4), "offset_seconds": offset * HOP_SIZE / SAMPLE_RATE}
+        return best
+
+
+def reuse_transcript(source_id, video_id, words_dir):
+    """
+    Copia a transcrição de um vídeo para outro ID.
+
+    Args:
+        source_id (str): ID do vídeo já transcrito.
+        video_id (str): ID do vídeo duplicado.
+        words_dir (str): Diretório das transcrições ({id}.txt/.json/.words.bin).
+
+    Returns:
+        bool: True se a transcrição de origem existia e foi copiada.
+    """
+    if not os.path.exists(os.path.join(words_dir, f"{source_id}.txt")):
+        return False
+    for suffix in OUTPUT_SUFFIXES:
+        source = os.path.join(words_dir, f"{source_id}{suffix}")
+        if os.path.exists(source):
+            destination = os.path.join(words_dir, f"{video_id}{suffix}")
+            shutil.copyfile(source, destination + ".tmp")
+            os.replace(destination + ".tmp", destination)
+    return True
+
+
+def reuse_sections(source_id, video_id, sections_dir):
+    """
+    Copia os blocos divididos ({id}_split.json/.txt) de um vídeo para o seu duplicado.
+
+    Args:
+        source_id (str): ID do vídeo de origem.
+        video_id (str): ID do vídeo duplicado.
+        sections_dir (str): Diretório dos blocos divididos.
+
+    Returns:
+        bool: True se o {source_id}_split.json existia e foi copiado.
+    """
+    if not os.path.exists(os.path.join(sections_dir, f"{source_id}_split.json")):
+        return False
+    for suffix in SECTION_SUFFIXES:
+        source = os.path.join(sections_dir, f"{source_id}{suffix}")
+        if os.path.exists(source):
+            destination = os.path.join(sections_dir, f"{video_id}{suffix}")
+            shutil.copyfile(source, destination + ".tmp")
+            os.replace(destination + ".tmp", destination)
+    return True
+
+
+def find_duplicates(video_ids, audio_dir, words_dir, index=None):
+    """
+    Separa, em uma fila de transcrição, os vídeos cujo áudio duplica um vídeo já transcrito.
+
+    Os duplicados de vídeos já transcritos recebem uma cópia da transcrição imediatamente;
+    os duplicados de outro vídeo da mesma fila ficam pendentes até que ele seja transcrito
+    (ver resolve_pending_duplicates). Os demais vídeos são indexados como pendentes: só passam
+    a valer como origem para outras filas depois que a transcrição deles é confirmada. Entradas
+    pendentes de execuções anteriores (ex: interrompidas) são ignoradas.
+
+    Args:
+        video_ids (list): IDs dos vídeos a transcrever.
+        audio_dir (str): Diretório dos arquivos de áudio.
+        words_dir (str): Diretório das transcrições.
+        index (FingerprintIndex, optional): Índice usado (padrão: FINGERPRINT_DIR do config).
+
+    Returns:
+        tuple: (IDs que ainda precisam ser transcritos, lista de correspondências encontradas)
+    """
+    index = index or FingerprintIndex()
+    # Pendentes de outra execução: a transcrição delas pode nunca ter sido gerada
+    stale = index.pending_ids()
+    remaining, matches = [], []
+    for video_id in video_ids:
+        audio_file = find_audio_file(video_id, audio_dir)
+        fingerprint, duration = fingerprint_file(audio_file) if audio_file else (None, None)
+        if fingerprint is None:
+            remaining.append(video_id)
+            continue
+        match = index.find_duplicate(fingerprint, exclude=stale | {video_id})
+        if match is None:
+            index.add(video_id, fingerprint, duration, pending=True)
+            remaining.append(video_id)
+            continue
+        match.update({"duplicate_of": match.pop("video_id"), "video_id": video_id, "audio_seconds": duration})
+        if abs(match["offset_seconds"]) > FINGERPRINT_MAX_OFFSET_SECONDS:
+            # Os timestamps da transcrição existente não valeriam para este áudio
+            logger.info(f"{video_id} coincide com {match['duplicate_of']}, mas deslocado "
+                        f"{match['offset_seconds']:.1f}s; será transcrito normalmente")
+            index.add(video_id, fingerprint, duration, pending=True)
+            remaining.append(video_id)
+            continue
+        match["reused"] = reuse_transcript(match["duplicate_of"], video_id, words_dir)
+        if not match["reused"] and match["duplicate_of"] not in remaining:
+            # A origem não tem transcrição (ex: removida) nem será transcrita nesta fila
+            index.add(video_id, fingerprint, duration, pending=True)
+            remaining.append(video_id)
+            continue
+        match["saved_seconds"] = index.meta.get(match["duplicate_of"], {}).get("compute_seconds") or 0.0
+        logger.info(f"{video_id} é duplicata de {match['duplicate_of']} (similaridade {match['similarity']:.1%}, "
+                    f"cobertura {match['coverage']:.1%})")
+        matches.append(match)
+    return remaining, matches
+
+
+def resolve_pending_duplicates(matches, words_dir, failed, compute_seconds=None, index=None):
+    """
+    Após a transcrição da fila, confirma no índice os vídeos pendentes que já têm transcrição
+    (com o tempo de transcrição), remove os que falharam e copia a transcrição para os
+    duplicados que dependiam de um vídeo da mesma fila.
+
+    Args:
+        matches (list): Correspondências retornadas por find_duplicates (atualizadas no lugar).
+        words_dir (str): Diretório das transcrições.
+        failed (set): IDs cuja transcrição falhou (são removidos do índice).
+        compute_seconds (dict, optional): Tempo de transcrição por ID.
+        index (FingerprintIndex, optional): Índice usado (padrão: FINGERPRINT_DIR do config).
+
+    Returns:
+        set: IDs de duplicados que não puderam receber a transcrição (a origem falhou).
+    """
+    index = index or FingerprintIndex()
+    compute_seconds = compute_seconds or {}
+    for video_id in failed:
+        index.remove(video_id)
+    for video_id in index.pending_ids():
+        # Inclui os vídeos da fila descartados pela triagem de fala (transcrição vazia)
+        if video_id in compute_seconds or os.path.exists(os.path.join(words_dir, f"{video_id}.txt")):
+            index.confirm(video_id, compute_seconds.get(video_id))
+
+    unresolved = set()
+    for match in matches:
+        if match["reused"]:
+            continue
+        source_id = match["duplicate_of"]
+        match["saved_seconds"] = compute_seconds.get(source_id, 0.0)
+        match["reused"] = source_id not in failed and reuse_transcript(source_id, match["video_id"], words_dir)
+        if not match["reused"]:
+            unresolved.add(match["video_id"])
+    return unresolved
+
+
+def index_directory(audio_dir, words_dir, index=None):
+    """
+    Indexa os áudios de um diretório que já têm transcrição (para vídeos anteriores ao índice).
+
+    Args:
+        audio_dir (str): Diretório dos arquivos de áudio.
+        words_dir (str): Diretório das transcrições.
+        index (FingerprintIndex, optional): Índice usado (padrão: FINGERPRINT_DIR do config).
+
+    Returns:
+        int: Número de vídeos indexados.
+    """
+    from src.utils.audio_files import read_audio_files
+    index = index or FingerprintIndex()
+    indexed = 0
+    for audio_file in read_audio_files(audio_dir):
+        video_id = os.path.splitext(audio_file)[0]
+        if video_id in index.meta or not os.path.exists(os.path.join(words_dir, f"{video_id}.txt")):
+            continue
+        fingerprint, duration = fingerprint_file(os.path.join(audio_dir, audio_file))
+        if fingerprint is not None:
+            index.add(video_id, fingerprint, duration)
+            indexed += 1
+    logger.info(f"{indexed} vídeo(s) adicionados ao índice de impressões digitais ({len(index.meta)} no total)")
+    return indexed
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.config import AUDIO_DIR, WORDS_DIR
+
+    parser = argparse.ArgumentParser(description="Indexa as impressões digitais dos áudios já transcritos.")
+    parser.add_argument("-a", "--audio-dir", default=str(AUDIO_DIR), help=f"Diretório dos áudios (padrão: {AUDIO_DIR})")
+    parser.add_argument("-w", "--words-dir", default=str(WORDS_DIR), help=f"Diretório das transcrições (padrão: {WORDS_DIR})")
+    args = parser.parse_args()
+    index_directory(args.audio_dir, args.words_dir)
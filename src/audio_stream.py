@@ -0,0 +1,242 @@
+"""
+Módulo de decodificação e transcrição em janelas de áudio.
+Para áudios longos (ex: transmissões de várias horas), o áudio é lido do ffmpeg (ou do cache
+decodificado) em janelas de tamanho fixo, e cada janela é transcrita separadamente: o pico de
+memória passa a depender do tamanho da janela, não da duração do arquivo. Os segmentos que
+terminam perto do fim de uma janela são descartados e re-decodificados no início da seguinte,
+para que nenhum seja cortado ao meio.
+"""
+import shutil
+import subprocess
+import numpy as np
+from src.utils.logger import setup_logger
+from src.config import STREAMING_DECODE_MIN_SECONDS, STREAMING_WINDOW_SECONDS, STREAMING_WINDOW_MARGIN_SECONDS
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+READ_BLOCK_SAMPLES = SAMPLE_RATE * 10      # Amostras lidas do ffmpeg por chamada
+
+
+def _ffmpeg_cmd(audio_path, start=0.0, duration=None):
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado no PATH")
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0"]
+    if start > 0:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", audio_path]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    return cmd + ["-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+
+
+class FfmpegAudioReader:
+    """Lê um arquivo de áudio do ffmpeg como PCM float32 mono 16 kHz, sob demanda."""
+
+    def __init__(self, audio_path, start=0.0):
+        """
+        Inicia o ffmpeg.
+
+        Args:
+            audio_path (str): Caminho do arquivo de áudio.
+            start (float): Instante (s) a partir do qual o áudio é lido.
+        """
+        self._process = subprocess.Popen(_ffmpeg_cmd(audio_path, start), stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+        self.eof = False
+
+    def read(self, samples):
+        """
+        Lê até o número de amostras pedido (menos apenas no fim do arquivo).
+
+        Args:
+            samples (int): Número de amostras.
+
+        Returns:
+            np.ndarray: Amostras float32.
+        """
+        chunks, remaining = [], samples * 4
+        while remaining > 0 and not self.eof:
+            data = self._process.stdout.read(min(remaining, READ_BLOCK_SAMPLES * 4))
+            if not data:
+                self.eof = True
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        data = b"".join(chunks)
+        return np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32)
+
+    def close(self):
+        """Encerra o ffmpeg."""
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ArrayAudioReader:
+    """Mesma interface de FfmpegAudioReader sobre um áudio já decodificado (ex: np.memmap do cache)."""
+
+    def __init__(self, audio, start=0.0):
+        self._audio = audio
+        self._position = int(start * SAMPLE_RATE)
+        self.eof = self._position >= len(audio)
+
+    def read(self, samples):
+        # Cópia gravável do trecho: só a janela atual fica em memória
+        block = np.array(self._audio[self._position:self._position + samples], dtype=np.float32)
+        self._position += len(block)
+        self.eof = self._position >= len(self._audio)
+        return block
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CachedFileAudioReader:
+    """
+    Mesma interface de FfmpegAudioReader sobre um arquivo .f32 do cache decodificado, lido com
+    leituras comuns: ao contrário de fatiar o np.memmap, as páginas já lidas ficam só no page
+    cache do sistema e não se acumulam no RSS do processo ao longo de um áudio de várias horas.
+    """
+
+    def __init__(self, path, start=0.0, offset=0):
+        self._file = open(path, 'rb')
+        self._file.seek(offset + int(start * SAMPLE_RATE) * 4)
+        self.eof = False
+
+    def read(self, samples):
+        block = np.fromfile(self._file, dtype=np.float32, count=samples)
+        self.eof = len(block) < samples
+        return block
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_audio_reader(audio, start=0.0):
+    """
+    Abre um leitor de janelas para um caminho (via ffmpeg), um np.memmap do cache decodificado
+    (lido do arquivo) ou um array de amostras.
+
+    Args:
+        audio (str or np.ndarray): Caminho do arquivo ou amostras float32 mono 16 kHz.
+        start (float): Instante (s) inicial.
+
+    Returns:
+        FfmpegAudioReader, CachedFileAudioReader or ArrayAudioReader: Leitor com read(amostras), eof e close().
+    """
+    if isinstance(audio, str):
+        return FfmpegAudioReader(audio, start)
+    if isinstance(audio, np.memmap) and getattr(audio, "filename", None):
+        return CachedFileAudioReader(audio.filename, start, audio.offset)
+    return ArrayAudioReader(audio, start)
+
+
+class LazyAudio:
+    """
+    Áudio de um arquivo acessado por fatias (audio[a:b]), cada uma decodificada sob demanda
+    pelo ffmpeg. Usado pela re-decodificação de segmentos sem carregar o arquivo inteiro.
+    """
+
+    def __init__(self, audio_path):
+        self.audio_path = audio_path
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("LazyAudio só aceita fatias contíguas")
+        start = (key.start or 0) / SAMPLE_RATE
+        duration = None if key.stop is None else max(0, key.stop - (key.start or 0)) / SAMPLE_RATE
+        result = subprocess.run(_ffmpeg_cmd(self.audio_path, start, duration), capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Falha ao decodificar {self.audio_path}: {result.stderr.decode(errors='ignore').strip()}")
+        return np.frombuffer(result.stdout, dtype=np.float32).copy()
+
+
+def should_stream(duration):
+    """
+    Indica se um áudio deve ser transcrito em janelas.
+
+    Args:
+        duration (float or None): Duração do áudio em segundos (None = desconhecida).
+
+    Returns:
+        bool: True se STREAMING_DECODE_MIN_SECONDS estiver ativo e o áudio for pelo menos tão longo.
+    """
+    return bool(STREAMING_DECODE_MIN_SECONDS) and duration is not None and duration >= STREAMING_DECODE_MIN_SECONDS
+
+
+def transcribe_windows(transcriber, audio, start=0.0, window_seconds=STREAMING_WINDOW_SECONDS,
+                       margin_seconds=STREAMING_WINDOW_MARGIN_SECONDS, **options):
+    """
+    Transcreve um áudio janela por janela, com memória limitada ao tamanho da janela.
+
+    Cada janela começa no fim do último segmento mantido da anterior; os segmentos que terminam
+    nos últimos margin_seconds de uma janela (exceto a última) são re-decodificados na seguinte.
+
+    Args:
+        transcriber (Transcriber): Backend já configurado (carregado sob demanda).
+        audio (str or np.ndarray): Caminho do arquivo (lido pelo ffmpeg) ou amostras float32 mono 16 kHz.
+        start (float): Instante (s) a partir do qual o áudio é transcrito.
+        window_seconds (float): Duração de cada janela.
+        margin_seconds (float): Margem final de cada janela cujos segmentos são re-decodificados.
+        **options: Opções repassadas a transcriber.transcribe.
+
+    Yields:
+        dict: Segmentos no formato do JSON de palavras, com timestamps absolutos.
+    """
+    window_samples = int(window_seconds * SAMPLE_RATE)
+    margin_seconds = min(margin_seconds, window_seconds / 2)
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = start
+    windows = 0
+    with open_audio_reader(audio, start) as reader:
+        while True:
+            buffer = np.concatenate([buffer, reader.read(window_samples - len(buffer))])
+            if not len(buffer):
+                break
+            last = reader.eof
+            windows += 1
+            buffer_end = buffer_start + len(buffer) / SAMPLE_RATE
+            cut = buffer_end if last else buffer_end - margin_seconds
+            logger.debug(f"Janela {windows}: {buffer_start:.1f}-{buffer_end:.1f}s")
+
+            segments, _ = transcriber.transcribe(buffer, offset=buffer_start, **options)
+            kept_end = buffer_start
+            for seg_dict in segments:
+                if seg_dict["end"] > cut:
+                    if kept_end <= buffer_start:
+                        # Nenhum segmento completo (ex: silêncio longo): recomeça no segmento cortado
+                        kept_end = seg_dict["start"]
+                    break
+                kept_end = seg_dict["end"]
+                yield seg_dict
+            if hasattr(segments, "close"):
+                segments.close()
+            if last:
+                break
+            if kept_end <= buffer_start:
+                # Só silêncio, ou um único segmento maior que a janela: avança até a margem
+                kept_end = cut
+            buffer = buffer[int((kept_end - buffer_start) * SAMPLE_RATE):]
+            buffer_start = kept_end
+    logger.debug(f"Transcrição em janelas concluída: {windows} janela(s)")
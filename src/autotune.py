@@ -0,0 +1,309 @@
+"""
+Módulo de calibração automática de compute_type e threads por host.
+Uma execução única cronometra, sobre um trecho curto de áudio local, as combinações
+candidatas de compute_type, número de threads e número de processos do pool, e grava a
+melhor configuração por host/modelo em AUTOTUNE_FILE. A transcrição passa a usá-la
+automaticamente quando o compute_type e as threads não são informados.
+
+Uso:
+    python -m src.autotune -m small
+"""
+import os
+import json
+import wave
+import socket
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+import numpy as np
+from src.utils.logger import setup_logger
+from src.config import (
+    AUTOTUNE_FILE, AUTOTUNE_ENABLED, AUTOTUNE_FIXTURE_SECONDS, AUDIO_DIR, BENCHMARK_DIR,
+    DECODING_PROFILE, DECODING_PROFILES
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# compute_types avaliados por dispositivo (o CTranslate2 escolhe os kernels conforme AVX2/AVX512/VNNI)
+COMPUTE_TYPE_CANDIDATES = {
+    "cpu": ["int8", "int8_float32", "float32"],
+    "cuda": ["float16", "int8_float16", "int8"],
+}
+
+_settings_cache = {}
+_settings_lock = threading.Lock()
+
+
+def _cpu_info():
+    """Modelo da CPU e instruções relevantes para os kernels do CTranslate2 (Linux)."""
+    info = {"model": None, "flags": []}
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name") and info["model"] is None:
+                    info["model"] = line.split(":", 1)[1].strip()
+                elif line.startswith("flags"):
+                    flags = set(line.split(":", 1)[1].split())
+                    info["flags"] = sorted(flags & {"avx", "avx2", "avx512f", "avx512_vnni", "avx_vnni", "fma"})
+                    break
+    except OSError:
+        pass
+    return info
+
+
+def host_key():
+    """
+    Identifica o host pela CPU, número de núcleos e nome da máquina.
+
+    Returns:
+        tuple: (chave curta, dicionário descritivo do host)
+    """
+    cpu = _cpu_info()
+    host = {"hostname": socket.gethostname(), "cpu_model": cpu["model"], "cpu_flags": cpu["flags"],
+            "cpu_count": os.cpu_count()}
+    key = hashlib.sha256(json.dumps(host, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return key, host
+
+
+def _model_key(backend, model_size, device):
+    return f"{backend}:{model_size}:{device}"
+
+
+def _load(path=None):
+    path = str(path or AUTOTUNE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        logger.warning(f"Arquivo de calibração ilegível: {path}")
+        return {}
+
+
+def tuned_settings(backend, model_size, device, path=None):
+    """
+    Retorna a configuração calibrada para este host e modelo.
+
+    Args:
+        backend (str): Nome do backend de transcrição.
+        model_size (str): Tamanho do modelo.
+        device (str): Dispositivo ("cuda" ou "cpu").
+        path (str, optional): Arquivo de calibração (padrão: AUTOTUNE_FILE do config).
+
+    Returns:
+        dict or None: compute_type, cpu_threads e, na CPU, workers e threads_per_worker;
+                      None se a calibração estiver desativada ou não tiver sido feita.
+    """
+    if not AUTOTUNE_ENABLED:
+        return None
+    cache_key = (str(path or AUTOTUNE_FILE), backend, model_size, device)
+    with _settings_lock:
+        if cache_key not in _settings_cache:
+            key, _ = host_key()
+            entry = _load(path).get(key, {}).get("models", {}).get(_model_key(backend, model_size, device))
+            _settings_cache[cache_key] = entry.get("best") if entry else None
+        return _settings_cache[cache_key]
+
+
+def apply_tuned_settings(transcriber, cpu_threads=True):
+    """
+    Aplica a um backend ainda não carregado a configuração calibrada para este host.
+
+    Args:
+        transcriber (Transcriber): Instância do backend (antes de load()).
+        cpu_threads (bool): Se True, aplica também o número de threads calibrado para um único
+                            fluxo (quando não foi definido explicitamente).
+
+    Returns:
+        dict or None: Configuração aplicada, ou None se não houver calibração.
+    """
+    settings = tuned_settings(transcriber.name, transcriber.model_size, transcriber.device)
+    if not settings:
+        return None
+    transcriber.compute_type = settings["compute_type"]
+    if cpu_threads and transcriber.device == "cpu" and settings.get("cpu_threads"):
+        transcriber.load_options.setdefault("cpu_threads", settings["cpu_threads"])
+    logger.info(f"Usando configuração calibrada do host: compute_type={transcriber.compute_type}, "
+                f"cpu_threads={transcriber.load_options.get('cpu_threads', 'padrão')}")
+    return settings
+
+
+def save_settings(backend, model_size, device, best, results, path=None):
+    """
+    Grava a configuração calibrada deste host e modelo.
+
+    Args:
+        backend (str): Nome do backend de transcrição.
+        model_size (str): Tamanho do modelo.
+        device (str): Dispositivo ("cuda" ou "cpu").
+        best (dict): Configuração escolhida.
+        results (list): Medições de todas as combinações avaliadas.
+        path (str, optional): Arquivo de calibração (padrão: AUTOTUNE_FILE do config).
+    """
+    path = str(path or AUTOTUNE_FILE)
+    data = _load(path)
+    key, host = host_key()
+    host_entry = data.setdefault(key, {"host": host, "models": {}})
+    host_entry["models"][_model_key(backend, model_size, device)] = {
+        "best": best,
+        "calibrated_at": datetime.now().isoformat(),
+        "results": results,
+    }
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+    with _settings_lock:
+        _settings_cache.clear()
+
+
+def calibration_fixture(seconds=AUTOTUNE_FIXTURE_SECONDS, audio_path=None):
+    """
+    Prepara o áudio da calibração: um trecho de um áudio local (fala real) ou, na falta
+    dele, um sinal sintético.
+
+    Args:
+        seconds (float): Duração do trecho.
+        audio_path (str, optional): Áudio de origem (padrão: o primeiro áudio de AUDIO_DIR).
+
+    Returns:
+        dict: Fixture no formato do benchmark (name, path, duration).
+    """
+    from src.benchmark import generate_fixtures, SAMPLE_RATE
+    from src.utils.audio_files import read_audio_files
+    fixtures_dir = os.path.join(str(BENCHMARK_DIR), "fixtures")
+    os.makedirs(fixtures_dir, exist_ok=True)
+
+    if audio_path is None and os.path.isdir(AUDIO_DIR):
+        audio_files = sorted(read_audio_files(str(AUDIO_DIR)))
+        audio_path = os.path.join(str(AUDIO_DIR), audio_files[0]) if audio_files else None
+    if audio_path:
+        from src.audio_cache import load_audio
+        try:
+            samples = np.asarray(load_audio(audio_path)[:int(seconds * SAMPLE_RATE)])
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Não foi possível usar {audio_path} na calibração: {e}")
+        else:
+            name = f"autotune_{os.path.splitext(os.path.basename(audio_path))[0]}_{int(seconds)}s"
+            path = os.path.join(fixtures_dir, f"{name}.wav")
+            with wave.open(path, 'wb') as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(SAMPLE_RATE)
+                f.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+            return {"name": name, "path": path, "duration": len(samples) / SAMPLE_RATE}
+
+    logger.warning("Nenhum áudio local disponível; a calibração usará um sinal sintético")
+    return generate_fixtures(fixtures_dir, [(f"autotune_synthetic_{int(seconds)}s", seconds, 0.2, "wav")])[0]
+
+
+def _measure(configs, offline=False):
+    """
+    Executa configurações simultaneamente, uma por subprocesso, e retorna os resultados.
+
+    Returns:
+        tuple: (lista de resultados, throughput agregado em segundos de áudio por segundo)
+    """
+    from src.benchmark import start_isolated, collect_isolated
+    processes = [start_isolated(config, offline) for config in configs]
+    results = [collect_isolated(process, config) for process, config in zip(processes, configs)]
+    if any("error" in r for r in results):
+        logger.warning(f"Combinação falhou: {next(r['error'] for r in results if 'error' in r)}")
+        return results, 0.0
+    slowest = max(r["transcribe_seconds"] for r in results)
+    return results, sum(r["audio_seconds"] for r in results) / slowest if slowest > 0 else 0.0
+
+
+def _thread_candidates(cpu_count):
+    return sorted({max(1, cpu_count // 4), max(1, cpu_count // 2), cpu_count})
+
+
+def calibrate(model_size=None, device=None, backend="faster-whisper", fixture=None, offline=False, path=None):
+    """
+    Calibra compute_type, threads e processos do pool para este host e modelo.
+
+    Etapas: (1) compute_type com todos os núcleos; (2) threads de um único processo com o
+    melhor compute_type; (3) na CPU, divisão dos núcleos entre processos simultâneos do pool.
+
+    Args:
+        model_size (str, optional): Tamanho do modelo (padrão: o do backend).
+        device (str, optional): Dispositivo ("cuda" ou "cpu"); detectado automaticamente se None.
+        backend (str): Backend calibrado (apenas "faster-whisper" tem compute_type/threads configuráveis).
+        fixture (dict, optional): Áudio da calibração (padrão: calibration_fixture()).
+        offline (bool): Se True, usa apenas modelos já baixados.
+        path (str, optional): Arquivo de calibração (padrão: AUTOTUNE_FILE do config).
+
+    Returns:
+        dict: Configuração escolhida (compute_type, cpu_threads, rtf e, na CPU, workers,
+              threads_per_worker e throughput).
+    """
+    from src.backends import get_backend
+    from src.model_registry import detect_device
+    if backend != "faster-whisper":
+        raise ValueError("A calibração só se aplica ao backend faster-whisper")
+    model_size = model_size or get_backend(backend).default_model_size
+    device = device or detect_device()
+    fixture = fixture or calibration_fixture()
+    cpu_count = os.cpu_count() or 1
+    beam_size = DECODING_PROFILES[DECODING_PROFILE]["beam_size"]
+    base = {"backend": backend, "model_size": model_size, "device": device, "beam_size": beam_size,
+            "fixture": fixture}
+    all_results = []
+
+    def run(compute_type, threads, workers=1):
+        configs = [dict(base, compute_type=compute_type, threads=threads) for _ in range(workers)]
+        results, throughput = _measure(configs, offline)
+        all_results.append({"compute_type": compute_type, "threads": threads, "workers": workers,
+                            "throughput": round(throughput, 3),
+                            "errors": [r["error"] for r in results if "error" in r]})
+        logger.info(f"{compute_type} x {workers} processo(s) x {threads} thread(s): "
+                    f"{throughput:.2f} s de áudio/s")
+        return throughput
+
+    logger.info(f"Calibrando {backend} {model_size} ({device}) com {fixture['name']} ({fixture['duration']:.0f}s)")
+    scores = {ct: run(ct, cpu_count) for ct in COMPUTE_TYPE_CANDIDATES[device]}
+    compute_type = max(scores, key=scores.get)
+    if scores[compute_type] <= 0:
+        raise RuntimeError("Nenhuma combinação pôde ser executada; verifique a instalação do faster-whisper")
+
+    best = {"compute_type": compute_type, "cpu_threads": cpu_count,
+            "rtf": round(1 / scores[compute_type], 4)}
+    if device == "cpu":
+        thread_scores = {cpu_count: scores[compute_type]}
+        for threads in _thread_candidates(cpu_count):
+            if threads not in thread_scores:
+                thread_scores[threads] = run(compute_type, threads)
+        best["cpu_threads"] = max(thread_scores, key=thread_scores.get)
+        best["rtf"] = round(1 / thread_scores[best["cpu_threads"]], 4)
+
+        # Pool: núcleos divididos entre processos que transcrevem arquivos diferentes
+        pool_scores = {(1, best["cpu_threads"]): thread_scores[best["cpu_threads"]]}
+        for workers in (2, 4):
+            if workers <= cpu_count:
+                pool_scores[(workers, cpu_count // workers)] = run(compute_type, cpu_count // workers, workers)
+        best["workers"], best["threads_per_worker"] = max(pool_scores, key=pool_scores.get)
+        best["throughput"] = round(pool_scores[(best["workers"], best["threads_per_worker"])], 3)
+
+    save_settings(backend, model_size, device, best, all_results, path)
+    logger.info(f"Configuração calibrada salva em {path or AUTOTUNE_FILE}: {best}")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibra compute_type e threads da transcrição para este host.")
+    parser.add_argument("-m", "--model", help="Tamanho do modelo Faster-Whisper (padrão: o do config)")
+    parser.add_argument("--device", choices=["cpu", "cuda"], help="Dispositivo (padrão: detectado automaticamente)")
+    parser.add_argument("--audio", help="Áudio usado na calibração (padrão: o primeiro áudio de AUDIO_DIR)")
+    parser.add_argument("--seconds", type=float, default=AUTOTUNE_FIXTURE_SECONDS,
+                        help=f"Duração (s) do trecho de áudio da calibração (padrão: {AUTOTUNE_FIXTURE_SECONDS})")
+    parser.add_argument("--offline", action="store_true", help="Usa apenas modelos já baixados")
+    parser.add_argument("--show", action="store_true", help="Mostra a calibração existente deste host e sai")
+    args = parser.parse_args()
+
+    if args.show:
+        key, _ = host_key()
+        print(json.dumps(_load().get(key, {}), ensure_ascii=False, indent=2))
+    else:
+        calibrate(args.model, args.device, fixture=calibration_fixture(args.seconds, args.audio), offline=args.offline)
@@ -0,0 +1,65 @@
+"""
+Backends de transcrição selecionáveis pelo nome.
+Cada backend implementa a interface Transcriber e só é importado quando selecionado,
+evitando carregar torch/whisper/ctranslate2 em execuções que não os usam.
+"""
+import importlib
+from src.backends.base import Transcriber
+from src.config import DEFAULT_TRANSCRIPTION_BACKEND
+
+# Nome do backend -> caminho "módulo.Classe" da implementação
+TRANSCRIPTION_BACKENDS = {
+    "faster-whisper": "src.backends.faster_whisper_backend.FasterWhisperTranscriber",
+    "whisper": "src.backends.whisper_backend.WhisperTranscriber",
+}
+
+
+def register_backend(name, class_path):
+    """
+    Registra um novo backend de transcrição.
+
+    Args:
+        name (str): Nome usado na seleção por config/CLI/API.
+        class_path (str): Caminho "módulo.Classe" de uma subclasse de Transcriber.
+    """
+    TRANSCRIPTION_BACKENDS[name] = class_path
+
+
+def available_backends():
+    """Retorna os nomes dos backends registrados."""
+    return list(TRANSCRIPTION_BACKENDS)
+
+
+def get_backend(name=None):
+    """
+    Importa e retorna a classe de um backend de transcrição.
+
+    Args:
+        name (str, optional): Nome do backend (padrão: DEFAULT_TRANSCRIPTION_BACKEND do config).
+
+    Returns:
+        type: Subclasse de Transcriber.
+    """
+    name = name or DEFAULT_TRANSCRIPTION_BACKEND
+    if name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Backend de transcrição desconhecido: {name} (disponíveis: {', '.join(TRANSCRIPTION_BACKENDS)})")
+    module_name, class_name = TRANSCRIPTION_BACKENDS[name].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_transcriber(name=None, **kwargs):
+    """
+    Cria uma instância (ainda sem modelo carregado) de um backend de transcrição.
+
+    Args:
+        name (str, optional): Nome do backend (padrão: DEFAULT_TRANSCRIPTION_BACKEND do config).
+        **kwargs: Argumentos do construtor (model_size, device, compute_type, opções de carregamento).
+
+    Returns:
+        Transcriber: Instância do backend.
+    """
+    return get_backend(name)(**kwargs)
+
+
+__all__ = ['Transcriber', 'TRANSCRIPTION_BACKENDS', 'register_backend', 'available_backends',
+           'get_backend', 'create_transcriber']
@@ -0,0 +1,104 @@
+"""
+Interface comum dos backends de transcrição.
+"""
+import importlib
+from src.model_registry import model_registry, detect_device
+
+
+class Transcriber:
+    """
+    Backend de transcrição: carrega um modelo, transcreve áudio em um iterador de
+    segmentos (no formato do JSON de palavras) e descarta o modelo.
+
+    Subclasses definem name, default_model_size e pipeline_module e implementam transcribe().
+    """
+
+    # Nome do backend no registro de modelos e na seleção por config/CLI/API
+    name = None
+    # Tamanho de modelo usado quando nenhum é informado
+    default_model_size = None
+    # Módulo com transcribe_audio/transcribe_audio_by_video_id (gravação, cache, checkpoints)
+    pipeline_module = None
+    # Se True, o backend pode ser usado no pool de processos da CPU
+    supports_worker_pool = False
+    # Taxa de amostragem esperada para áudio já decodificado
+    sample_rate = 16000
+
+    def __init__(self, model_size=None, device=None, compute_type=None, **load_options):
+        """
+        Inicializa o backend sem carregar o modelo.
+
+        Args:
+            model_size (str, optional): Tamanho do modelo (padrão: default_model_size).
+            device (str, optional): Dispositivo ("cuda" ou "cpu"); detectado automaticamente se None.
+            compute_type (str, optional): Tipo de computação (padrão: default_compute_type do dispositivo).
+            **load_options: Opções repassadas ao carregador do modelo.
+        """
+        self.model_size = model_size or self.default_model_size
+        self.device = device or detect_device()
+        self.compute_type = compute_type or self.default_compute_type(self.device)
+        self.load_options = load_options
+        self.model = None
+        self._registry_args = None
+
+    @staticmethod
+    def default_compute_type(device):
+        """Retorna o tipo de computação padrão para o dispositivo."""
+        return "float16" if device == "cuda" else "float32"
+
+    def load(self):
+        """
+        Carrega o modelo (ou o obtém do cache de modelos do processo).
+
+        Returns:
+            Transcriber: A própria instância, para encadeamento.
+        """
+        if self.model is None:
+            # Argumentos guardados: release() devolve o mesmo modelo mesmo que load_options mude depois
+            self._registry_args = ((self.name, self.model_size, self.device, self.compute_type), dict(self.load_options))
+            self.model = model_registry.get_model(*self._registry_args[0], **self._registry_args[1])
+        return self
+
+    def release(self):
+        """
+        Devolve o modelo ao cache de modelos do processo: ele continua carregado para as próximas
+        transcrições, mas deixa de contar como em uso e pode ser descartado pelo LRU.
+        """
+        if self.model is not None:
+            args, kwargs = self._registry_args
+            model_registry.release(*args, **kwargs)
+            self.model = None
+
+    def transcribe(self, audio, offset=0.0, **options):
+        """
+        Transcreve um áudio.
+
+        Args:
+            audio (str or np.ndarray): Caminho do arquivo ou amostras mono em float32 na sample_rate.
+            offset (float): Deslocamento (s) somado aos timestamps, para áudios recortados.
+            **options: Opções de decodificação específicas do backend.
+
+        Returns:
+            tuple: (iterador de segmentos no formato do JSON de palavras, info com o atributo duration)
+        """
+        raise NotImplementedError
+
+    def unload(self):
+        """Remove o modelo do cache de modelos do processo (se nenhum outro usuário o estiver usando)."""
+        self.release()
+        model_registry.unload(self.name, self.model_size, self.device, self.compute_type, **self.load_options)
+
+    @classmethod
+    def pipeline(cls):
+        """Importa e retorna o módulo de pipeline do backend."""
+        return importlib.import_module(cls.pipeline_module)
+
+    @classmethod
+    def transcribe_file(cls, audio_path, base_name, **options):
+        """Transcreve um arquivo e grava {base_name}.txt/.json (ver transcribe_audio do pipeline)."""
+        return cls.pipeline().transcribe_audio(audio_path, base_name, **options)
+
+    @classmethod
+    def transcribe_by_video_id(cls, video_id, audio_dir=None, **options):
+        """Transcreve o áudio de um video_id (ver transcribe_audio_by_video_id do pipeline)."""
+        return cls.pipeline().transcribe_audio_by_video_id(video_id, audio_dir, **options)
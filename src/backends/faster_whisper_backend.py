@@ -0,0 +1,90 @@
+"""
+Backend de transcrição Faster-Whisper (CTranslate2).
+"""
+from src.backends.base import Transcriber
+from src.config import DEFAULT_FASTER_WHISPER_MODEL, LANGUAGE
+
+
+def segment_to_dict(seg, offset=0.0):
+    """
+    Converte um segmento do Faster-Whisper no dicionário salvo no JSON de palavras.
+
+    Args:
+        seg (Segment): Segmento retornado por model.transcribe.
+        offset (float): Deslocamento (s) somado aos timestamps, para áudios recortados.
+
+    Returns:
+        dict: Segmento com id, start, end, text e, se disponíveis, as palavras.
+    """
+    seg_dict = {
+        "id": getattr(seg, "id", None),
+        "start": seg.start + offset,
+        "end": seg.end + offset,
+        "text": seg.text,
+    }
+
+    # Métricas de confiança usadas pelos perfis de decodificação
+    for field in ("avg_logprob", "compression_ratio", "no_speech_prob"):
+        if getattr(seg, field, None) is not None:
+            seg_dict[field] = getattr(seg, field)
+
+    # Adicionar informações de palavras se disponíveis
+    if hasattr(seg, "words") and seg.words:
+        seg_dict["words"] = [
+            {
+                "word": w.word,
+                "start": w.start + offset,
+                "end": w.end + offset,
+                "probability": getattr(w, "probability", None)
+            } for w in seg.words
+        ]
+    return seg_dict
+
+
+class FasterWhisperTranscriber(Transcriber):
+    """Transcrição com o Faster-Whisper; os segmentos são gerados à medida que são decodificados."""
+
+    name = "faster-whisper"
+    default_model_size = DEFAULT_FASTER_WHISPER_MODEL
+    pipeline_module = "src.generate_transcription_fw"
+    supports_worker_pool = True
+
+    @staticmethod
+    def default_compute_type(device):
+        return "float16" if device == "cuda" else "int8"
+
+    def load(self):
+        super().load()
+        self.sample_rate = self.model.feature_extractor.sampling_rate
+        return self
+
+    def transcribe(self, audio, offset=0.0, batch_size=None, vad_filter=False, vad_parameters=None, **options):
+        """
+        Transcreve um áudio com o Faster-Whisper.
+
+        Args:
+            audio (str or np.ndarray): Caminho do arquivo ou amostras mono em float32.
+            offset (float): Deslocamento (s) somado aos timestamps, para áudios recortados.
+            batch_size (int, optional): Se maior que 1, usa o pipeline em lote (BatchedInferencePipeline).
+            vad_filter (bool): Se True, remove silêncios com o VAD Silero antes da decodificação.
+            vad_parameters (dict, optional): Parâmetros do VAD.
+            **options: Opções de decodificação (padrão: idioma do config, beam_size/best_of 5,
+                       timestamps de palavras).
+
+        Returns:
+            tuple: (gerador de segmentos, TranscriptionInfo)
+        """
+        self.load()
+        decode_options = {"language": LANGUAGE, "beam_size": 5, "best_of": 5, "word_timestamps": True}
+        decode_options.update(options)
+        if batch_size and batch_size > 1:
+            from faster_whisper import BatchedInferencePipeline
+            # O pipeline em lote sempre usa o VAD para montar os trechos do lote
+            segments, info = BatchedInferencePipeline(model=self.model).transcribe(
+                audio, batch_size=batch_size, vad_parameters=vad_parameters, **decode_options
+            )
+        else:
+            segments, info = self.model.transcribe(
+                audio, vad_filter=vad_filter, vad_parameters=vad_parameters if vad_filter else None, **decode_options
+            )
+        return (segment_to_dict(seg, offset) for seg in segments), info
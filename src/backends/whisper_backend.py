@@ -0,0 +1,52 @@
+"""
+Backend de transcrição Whisper original (openai-whisper).
+"""
+from types import SimpleNamespace
+from src.backends.base import Transcriber
+from src.config import DEFAULT_WHISPER_MODEL, LANGUAGE
+
+
+class WhisperTranscriber(Transcriber):
+    """
+    Transcrição com o Whisper original.
+
+    O openai-whisper só devolve o resultado ao final do áudio, então o iterador
+    de segmentos é produzido de uma vez após a decodificação.
+    """
+
+    name = "whisper"
+    default_model_size = DEFAULT_WHISPER_MODEL
+    pipeline_module = "src.generate_transcription"
+
+    def transcribe(self, audio, offset=0.0, **options):
+        """
+        Transcreve um áudio com o Whisper original.
+
+        Args:
+            audio (str or np.ndarray): Caminho do arquivo ou amostras mono em float32 (gravável).
+            offset (float): Deslocamento (s) somado aos timestamps, para áudios recortados.
+            **options: Opções de decodificação (padrão: idioma do config, beam_size/best_of 5,
+                       timestamps de palavras, fp16 na GPU).
+
+        Returns:
+            tuple: (iterador de segmentos, info com duration e text)
+        """
+        self.load()
+        decode_options = {"language": LANGUAGE, "fp16": self.device == "cuda", "best_of": 5, "beam_size": 5,
+                          "word_timestamps": True}
+        decode_options.update(options)
+        result = self.model.transcribe(audio, **decode_options)
+        segments = result.get("segments", [])
+        if offset:
+            for seg in segments:
+                seg["start"] += offset
+                seg["end"] += offset
+                for w in seg.get("words", []):
+                    w["start"] += offset
+                    w["end"] += offset
+
+        if isinstance(audio, str):
+            duration = segments[-1]["end"] - offset if segments else 0.0
+        else:
+            duration = len(audio) / self.sample_rate
+        return iter(segments), SimpleNamespace(duration=duration, text=result.get("text", ""))
@@ -0,0 +1,419 @@
+"""
+Módulo de benchmark de transcrição.
+Executa cada backend instalado sobre fixtures de áudio geradas localmente (duração,
+proporção de silêncio e codec variados), combinando tamanhos de modelo, compute_type,
+tamanho do feixe e número de threads. Cada configuração roda em um subprocesso isolado,
+que mede o fator de tempo real (RTF), o pico de memória (RSS), o tempo de carregamento
+do modelo e a latência até o primeiro segmento.
+
+Com --long-fixtures e --decode-modes full stream, compara o pico de memória da decodificação
+completa com o da transcrição em janelas (src.audio_stream) em áudios de 10 minutos e 4 horas.
+
+Uso:
+    python -m src.benchmark --models tiny base --compute-types int8 float32 --beam-sizes 1 5
+    python -m src.benchmark --long-fixtures --decode-modes full stream --beam-sizes 1
+"""
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import itertools
+import importlib.util
+import subprocess
+from datetime import datetime
+import numpy as np
+from src.utils.logger import setup_logger
+from src.config import BASE_DIR, BENCHMARK_DIR
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Fixtures padrão: (nome, duração em segundos, proporção de silêncio, codec)
+DEFAULT_FIXTURES = [
+    ("short_dense", 30, 0.1, "wav"),
+    ("short_sparse", 30, 0.6, "mp3"),
+    ("medium_dense", 180, 0.1, "m4a"),
+    ("medium_sparse", 180, 0.5, "wav"),
+]
+
+# Fixtures longas, para medir o pico de memória em função da duração do áudio
+LONG_FIXTURES = [
+    ("long_10min", 600, 0.2, "wav"),
+    ("long_4h", 14400, 0.2, "wav"),
+]
+
+# As fixtures são geradas e gravadas em blocos desta duração (s), com memória limitada
+FIXTURE_BLOCK_SECONDS = 600
+
+# Extensão e argumentos do ffmpeg para cada codec
+CODECS = {
+    "wav": (".wav", []),
+    "mp3": (".mp3", ["-c:a", "libmp3lame", "-b:a", "64k"]),
+    "m4a": (".m4a", ["-c:a", "aac", "-b:a", "64k"]),
+}
+
+
+def installed_backends():
+    """Retorna os backends de transcrição cujas bibliotecas estão instaladas."""
+    modules = {"faster-whisper": "faster_whisper", "whisper": "whisper"}
+    return [name for name, module in modules.items() if importlib.util.find_spec(module) is not None]
+
+
+def _synthetic_audio(duration, silence_ratio, seed=0):
+    """
+    Gera um sinal com rajadas de tons modulados (parecidas com fala) intercaladas com silêncio.
+
+    Args:
+        duration (float): Duração em segundos.
+        silence_ratio (float): Fração aproximada do tempo em silêncio.
+        seed (int or list): Semente do gerador aleatório.
+
+    Returns:
+        np.ndarray: Amostras int16 mono a 16 kHz.
+    """
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+    position = 0
+    while position < len(audio):
+        burst = int(rng.uniform(0.5, 3.0) * SAMPLE_RATE)
+        gap = int(burst * silence_ratio / max(1e-3, 1 - silence_ratio))
+        t = np.arange(min(burst, len(audio) - position)) / SAMPLE_RATE
+        pitch = rng.uniform(90, 250)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(2, 6) * t))
+        audio[position:position + len(t)] = 0.3 * voiced * envelope
+        position += burst + gap
+    audio += rng.normal(0, 0.003, len(audio)).astype(np.float32)
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def generate_fixtures(fixtures_dir, fixtures=DEFAULT_FIXTURES):
+    """
+    Gera (uma única vez) os arquivos de áudio usados no benchmark.
+
+    Codecs diferentes de WAV exigem o ffmpeg; sem ele, essas fixtures são ignoradas.
+
+    Args:
+        fixtures_dir (str): Diretório onde as fixtures são gravadas.
+        fixtures (list): Tuplas (nome, duração, proporção de silêncio, codec).
+
+    Returns:
+        list: Dicionários com name, path, duration, silence_ratio e codec.
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    generated = []
+    for seed, (name, duration, silence_ratio, codec) in enumerate(fixtures):
+        extension, codec_args = CODECS[codec]
+        path = os.path.join(fixtures_dir, f"{name}{extension}")
+        if not os.path.exists(path):
+            if codec != "wav" and not has_ffmpeg:
+                logger.warning(f"ffmpeg não encontrado; fixture {name} ({codec}) ignorada")
+                continue
+            wav_path = path if codec == "wav" else os.path.join(fixtures_dir, f"{name}.tmp.wav")
+            with wave.open(wav_path, 'wb') as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(SAMPLE_RATE)
+                for block, block_start in enumerate(range(0, duration, FIXTURE_BLOCK_SECONDS)):
+                    block_seconds = min(FIXTURE_BLOCK_SECONDS, duration - block_start)
+                    f.writeframes(_synthetic_audio(block_seconds, silence_ratio,
+                                                   seed if block == 0 else [seed, block]).tobytes())
+            if codec != "wav":
+                subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", wav_path, *codec_args, path],
+                               check=True)
+                os.remove(wav_path)
+        generated.append({"name": name, "path": path, "duration": duration,
+                          "silence_ratio": silence_ratio, "codec": codec})
+    return generated
+
+
+def local_fixtures(directory):
+    """
+    Lista arquivos de áudio reais (ex: trechos de fala) usados como fixtures adicionais.
+
+    Args:
+        directory (str): Diretório com os arquivos.
+
+    Returns:
+        list: Dicionários no mesmo formato de generate_fixtures (duração desconhecida = None).
+    """
+    from src.utils.audio_files import read_audio_files
+    return [{"name": os.path.splitext(f)[0], "path": os.path.join(directory, f), "duration": None,
+             "silence_ratio": None, "codec": os.path.splitext(f)[1].lstrip(".")}
+            for f in sorted(read_audio_files(directory))]
+
+
+def build_matrix(backends, models, compute_types, beam_sizes, threads, fixtures, decode_modes=("full",)):
+    """
+    Monta as configurações do benchmark.
+
+    O compute_type e o número de threads do CTranslate2 só se aplicam ao Faster-Whisper;
+    o Whisper original roda em float32 e usa o número de threads no torch. O modo de
+    decodificação é "full" (áudio inteiro em memória) ou "stream" (janelas de src.audio_stream).
+
+    Returns:
+        list: Dicionários de configuração, um por execução.
+    """
+    configs = []
+    for backend, model, beam_size, thread_count, fixture, decode in itertools.product(
+            backends, models, beam_sizes, threads, fixtures, decode_modes):
+        for compute_type in (compute_types if backend == "faster-whisper" else ["float32"]):
+            configs.append({
+                "backend": backend,
+                "model_size": model,
+                "compute_type": compute_type,
+                "beam_size": beam_size,
+                "threads": thread_count,
+                "fixture": fixture,
+                "decode": decode,
+            })
+    return configs
+
+
+def _peak_rss_mb():
+    """Retorna o pico de memória residente do processo atual em MB."""
+    import resource
+    # No Linux, ru_maxrss é informado em KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_configuration(config, offline=False):
+    """
+    Executa uma configuração no processo atual e mede o desempenho.
+
+    Deve ser chamada em um processo novo (ver run_isolated) para que o tempo de
+    carregamento e o pico de memória não sejam contaminados por execuções anteriores.
+
+    Args:
+        config (dict): Configuração montada por build_matrix.
+        offline (bool): Se True, usa apenas modelos já presentes no cache local.
+
+    Returns:
+        dict: Métricas da execução.
+    """
+    from src.backends import create_transcriber
+
+    load_options = {}
+    if config["backend"] == "faster-whisper":
+        load_options["cpu_threads"] = config["threads"]
+        if offline:
+            load_options["local_files_only"] = True
+    else:
+        import torch
+        torch.set_num_threads(config["threads"])
+
+    transcriber = create_transcriber(config["backend"], model_size=config["model_size"], device=config.get("device", "cpu"),
+                                     compute_type=config["compute_type"], **load_options)
+    start_time = time.time()
+    transcriber.load()
+    load_seconds = time.time() - start_time
+
+    start_time = time.time()
+    if config.get("decode") == "stream":
+        from src.audio_stream import transcribe_windows
+        segments, info = transcribe_windows(transcriber, config["fixture"]["path"], beam_size=config["beam_size"],
+                                            best_of=config["beam_size"]), None
+    else:
+        segments, info = transcriber.transcribe(config["fixture"]["path"], beam_size=config["beam_size"],
+                                                best_of=config["beam_size"])
+    first_segment_seconds = None
+    segment_count = 0
+    for _ in segments:
+        if first_segment_seconds is None:
+            first_segment_seconds = time.time() - start_time
+        segment_count += 1
+    transcribe_seconds = time.time() - start_time
+
+    audio_seconds = config["fixture"]["duration"] or (info.duration if info is not None else 0.0) or 0.0
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "first_segment_seconds": round(first_segment_seconds, 3) if first_segment_seconds is not None else None,
+        "transcribe_seconds": round(transcribe_seconds, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "rtf": round(transcribe_seconds / audio_seconds, 4) if audio_seconds else None,
+        "segments": segment_count,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def start_isolated(config, offline=False):
+    """
+    Inicia a execução de uma configuração em um subprocesso Python isolado, sem aguardar.
+
+    Args:
+        config (dict): Configuração montada por build_matrix.
+        offline (bool): Se True, usa apenas modelos já presentes no cache local.
+
+    Returns:
+        subprocess.Popen: Processo iniciado (ver collect_isolated).
+    """
+    cmd = [sys.executable, "-m", "src.benchmark", "--run-config", json.dumps(config)]
+    if offline:
+        cmd.append("--offline")
+    env = dict(os.environ, OMP_NUM_THREADS=str(config["threads"]))
+    if offline:
+        env["HF_HUB_OFFLINE"] = "1"
+    return subprocess.Popen(cmd, cwd=str(BASE_DIR), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True)
+
+
+def collect_isolated(process, config, timeout=None):
+    """
+    Aguarda um subprocesso iniciado por start_isolated e lê as suas métricas.
+
+    Args:
+        process (subprocess.Popen): Processo em execução.
+        config (dict): Configuração executada.
+        timeout (float, optional): Tempo máximo (s) de espera.
+
+    Returns:
+        dict: A configuração acrescida das métricas ou do erro.
+    """
+    result = dict(config)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        result["error"] = f"tempo limite de {timeout}s excedido"
+        return result
+    lines = stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        result["error"] = (stderr.strip().splitlines() or ["falha sem mensagem"])[-1]
+        return result
+    result.update(json.loads(lines[-1]))
+    return result
+
+
+def run_isolated(config, offline=False, timeout=None):
+    """
+    Executa uma configuração em um subprocesso Python isolado.
+
+    Args:
+        config (dict): Configuração montada por build_matrix.
+        offline (bool): Se True, usa apenas modelos já presentes no cache local.
+        timeout (float, optional): Tempo máximo (s) da execução.
+
+    Returns:
+        dict: A configuração acrescida das métricas ou do erro.
+    """
+    return collect_isolated(start_isolated(config, offline), config, timeout)
+
+
+def format_table(results):
+    """
+    Formata os resultados como uma tabela de comparação, do menor para o maior RTF.
+
+    Args:
+        results (list): Resultados de run_isolated.
+
+    Returns:
+        str: Tabela em texto.
+    """
+    headers = ["backend", "modelo", "compute", "beam", "thr", "fixture", "decode", "RTF", "load(s)", "1º seg(s)",
+               "RSS(MB)"]
+    rows = []
+    for r in sorted(results, key=lambda r: (r.get("rtf") is None, r.get("rtf") or 0)):
+        if "error" in r:
+            metrics = ["erro: " + r["error"][:40], "", "", ""]
+        else:
+            metrics = [f"{r['rtf']:.3f}" if r["rtf"] is not None else "-", f"{r['load_seconds']:.1f}",
+                       f"{r['first_segment_seconds']:.1f}" if r["first_segment_seconds"] is not None else "-",
+                       f"{r['peak_rss_mb']:.0f}"]
+        rows.append([r["backend"], r["model_size"], r["compute_type"], str(r["beam_size"]), str(r["threads"]),
+                     r["fixture"]["name"], r.get("decode", "full"), *metrics])
+    widths = [max(len(str(row[i])) for row in [headers, *rows]) for i in range(len(headers))]
+    lines = ["  ".join(h.ljust(w) for h, w in zip(headers, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines += ["  ".join(str(c).ljust(w) for c, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def run_benchmark(backends=None, models=("tiny",), compute_types=("int8",), beam_sizes=(1, 5), threads=None,
+                  fixtures_dir=None, extra_fixtures_dir=None, output=None, offline=False, timeout=None,
+                  decode_modes=("full",), long_fixtures=False):
+    """
+    Executa o benchmark completo e grava os resultados em JSON.
+
+    Args:
+        backends (list, optional): Backends a avaliar (padrão: todos os instalados).
+        models (list): Tamanhos de modelo.
+        compute_types (list): Tipos de computação (Faster-Whisper).
+        beam_sizes (list): Tamanhos do feixe.
+        threads (list, optional): Números de threads (padrão: todos os núcleos).
+        fixtures_dir (str, optional): Diretório das fixtures geradas (padrão: BENCHMARK_DIR/fixtures).
+        extra_fixtures_dir (str, optional): Diretório com áudios reais adicionais.
+        output (str, optional): Arquivo de resultados (padrão: BENCHMARK_DIR/benchmark_<data>.json).
+        offline (bool): Se True, não baixa modelos (usa apenas o cache local).
+        timeout (float, optional): Tempo máximo (s) de cada execução.
+        decode_modes (list): Modos de decodificação: "full" e/ou "stream".
+        long_fixtures (bool): Se True, inclui as fixtures longas (10 minutos e 4 horas).
+
+    Returns:
+        list: Resultados de cada configuração.
+    """
+    backends = backends or installed_backends()
+    if not backends:
+        logger.error("Nenhum backend de transcrição instalado (faster-whisper ou whisper).")
+        return []
+    threads = threads or [os.cpu_count() or 1]
+    fixtures = generate_fixtures(fixtures_dir or os.path.join(str(BENCHMARK_DIR), "fixtures"),
+                                 DEFAULT_FIXTURES + (LONG_FIXTURES if long_fixtures else []))
+    if extra_fixtures_dir:
+        fixtures += local_fixtures(extra_fixtures_dir)
+
+    configs = build_matrix(backends, models, compute_types, beam_sizes, threads, fixtures, decode_modes)
+    logger.info(f"Benchmark: {len(configs)} configurações ({', '.join(backends)}; {len(fixtures)} fixtures)")
+    results = []
+    for idx, config in enumerate(configs, 1):
+        logger.info(f"[{idx}/{len(configs)}] {config['backend']} {config['model_size']} {config['compute_type']} "
+                    f"beam={config['beam_size']} threads={config['threads']} fixture={config['fixture']['name']} "
+                    f"decode={config['decode']}")
+        result = run_isolated(config, offline=offline, timeout=timeout)
+        if "error" in result:
+            logger.warning(f"Configuração falhou: {result['error']}")
+        results.append(result)
+
+    output = output or os.path.join(str(BENCHMARK_DIR), f"benchmark_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"host": os.uname().nodename, "cpu_count": os.cpu_count(),
+                   "created_at": datetime.now().isoformat(), "results": results}, f, ensure_ascii=False, indent=2)
+    print(format_table(results))
+    logger.info(f"Resultados salvos em {output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de fator de tempo real (RTF) da transcrição.")
+    parser.add_argument("--backends", nargs="+", help="Backends a avaliar (padrão: todos os instalados)")
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="Tamanhos de modelo (padrão: tiny)")
+    parser.add_argument("--compute-types", nargs="+", default=["int8"],
+                        help="Tipos de computação do Faster-Whisper (padrão: int8)")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[1, 5], help="Tamanhos do feixe (padrão: 1 5)")
+    parser.add_argument("--threads", nargs="+", type=int, help="Números de threads (padrão: todos os núcleos)")
+    parser.add_argument("--fixtures-dir", help="Diretório das fixtures geradas (padrão: BENCHMARK_DIR/fixtures)")
+    parser.add_argument("--extra-fixtures", help="Diretório com áudios reais adicionais")
+    parser.add_argument("-o", "--output", help="Arquivo JSON de resultados")
+    parser.add_argument("--offline", action="store_true", help="Usa apenas modelos já baixados")
+    parser.add_argument("--timeout", type=float, help="Tempo máximo (s) de cada configuração")
+    parser.add_argument("--decode-modes", nargs="+", choices=["full", "stream"], default=["full"],
+                        help="Decodificação do áudio inteiro (full) e/ou em janelas (stream) (padrão: full)")
+    parser.add_argument("--long-fixtures", action="store_true",
+                        help="Inclui fixtures de 10 minutos e 4 horas (comparação de pico de memória)")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        # Execução isolada de uma configuração (chamada por run_isolated)
+        print(json.dumps(run_configuration(json.loads(args.run_config), offline=args.offline)))
+    else:
+        run_benchmark(args.backends, args.models, args.compute_types, args.beam_sizes, args.threads,
+                      args.fixtures_dir, args.extra_fixtures, args.output, args.offline, args.timeout,
+                      args.decode_modes, args.long_fixtures)
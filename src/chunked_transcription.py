@@ -0,0 +1,326 @@
+"""
+Módulo para transcrição paralela de um único áudio longo com o Faster-Whisper.
+Divide o áudio em trechos sobrepostos cortados em pontos de silêncio, transcreve
+os trechos simultaneamente e une o resultado em um único JSON de segmentos/palavras.
+"""
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.utils.logger import setup_logger
+from src.backends.faster_whisper_backend import FasterWhisperTranscriber
+from src.transcription_cache import transcription_cache
+from src.audio_cache import audio_input as cached_audio_input
+from src.utils.resource_sampler import ResourceSampler, format_peaks
+from src.autotune import apply_tuned_settings
+from src.hallucination_guard import HallucinationGuard
+from src.decoding_profiles import get_decoding_profile, decode_options, SegmentRedecoder, CascadeRedecoder
+from src.config import (
+    LANGUAGE, CHUNK_SECONDS, CHUNK_OVERLAP_SECONDS,
+    CHUNK_SILENCE_SEARCH_SECONDS, CHUNKED_MIN_DURATION_SECONDS, CASCADE_MODEL,
+    HALLUCINATION_GUARD_ENABLED, SEGMENT_TIMESTAMPS_ONLY, VAD_FILTER, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+ENERGY_FRAME_SECONDS = 0.1
+
+
+def find_silence_point(audio, target, search_seconds, sample_rate=SAMPLE_RATE):
+    """
+    Procura o ponto de menor energia ao redor de um instante alvo.
+
+    Args:
+        audio (np.ndarray): Áudio mono em float32.
+        target (float): Instante alvo do corte (s).
+        search_seconds (float): Distância máxima (s) do alvo a ser examinada.
+        sample_rate (int): Taxa de amostragem do áudio.
+
+    Returns:
+        float: Instante (s) do centro do quadro mais silencioso.
+    """
+    frame = int(ENERGY_FRAME_SECONDS * sample_rate)
+    start = max(0, int((target - search_seconds) * sample_rate))
+    end = min(len(audio), int((target + search_seconds) * sample_rate))
+    n_frames = (end - start) // frame
+    if n_frames < 1:
+        return target
+    window = audio[start:start + n_frames * frame].reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(window ** 2, axis=1))
+    quietest = int(np.argmin(energy))
+    return (start + quietest * frame + frame / 2) / sample_rate
+
+
+def plan_chunks(audio, chunk_seconds=CHUNK_SECONDS, overlap_seconds=CHUNK_OVERLAP_SECONDS,
+                search_seconds=CHUNK_SILENCE_SEARCH_SECONDS, sample_rate=SAMPLE_RATE):
+    """
+    Define os trechos de transcrição, com cortes em pontos de silêncio.
+
+    Cada trecho cobre [corte anterior - sobreposição, próximo corte + sobreposição];
+    na união, cada trecho contribui apenas com as palavras entre seus cortes.
+
+    Args:
+        audio (np.ndarray): Áudio mono em float32.
+        chunk_seconds (float): Duração alvo de cada trecho.
+        overlap_seconds (float): Sobreposição entre trechos consecutivos.
+        search_seconds (float): Janela de busca do silêncio ao redor de cada corte alvo.
+        sample_rate (int): Taxa de amostragem do áudio.
+
+    Returns:
+        list: Dicionários com start/end (região decodificada) e keep_start/keep_end (região mantida).
+    """
+    duration = len(audio) / sample_rate
+    cuts = [0.0]
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 2:
+        search = min(search_seconds, chunk_seconds / 2)
+        cut = find_silence_point(audio, target, search, sample_rate)
+        cuts.append(cut)
+        target = cut + chunk_seconds
+    cuts.append(duration)
+
+    chunks = []
+    for keep_start, keep_end in zip(cuts, cuts[1:]):
+        chunks.append({
+            "start": max(0.0, keep_start - overlap_seconds),
+            "end": min(duration, keep_end + overlap_seconds),
+            "keep_start": keep_start,
+            "keep_end": keep_end,
+        })
+    return chunks
+
+
+def _transcribe_chunk(transcriber, audio, chunk, profile, vad_filter=False, sample_rate=SAMPLE_RATE,
+                      hallucination_guard=False):
+    """
+    Transcreve um trecho e devolve os segmentos com timestamps na linha do tempo original,
+    junto com o re-decodificador usado (None se o perfil não tiver fallback) e o guarda de
+    laços de alucinação (None se desativado).
+    """
+    vad_parameters = {"min_silence_duration_ms": VAD_MIN_SILENCE_MS, "speech_pad_ms": VAD_SPEECH_PAD_MS}
+
+    def decode(start):
+        samples = audio[int(start * sample_rate):int(chunk["end"] * sample_rate)]
+        return transcriber.transcribe(samples, offset=start, vad_filter=vad_filter, vad_parameters=vad_parameters,
+                                      **decode_options(profile))[0]
+
+    segments = decode(chunk["start"])
+    guard = None
+    if hallucination_guard:
+        guard = HallucinationGuard(decode, duration=chunk["end"], check_quality=not profile["fallback"])
+        segments = guard.process(segments)
+    redecoder = None
+    if profile["fallback"]:
+        redecoder = SegmentRedecoder(transcriber, lambda: audio, word_timestamps=profile["word_timestamps"])
+        segments = redecoder.process(segments)
+    return list(segments), redecoder, guard
+
+
+def stitch_chunks(chunk_segments, chunks):
+    """
+    Une os segmentos de trechos sobrepostos em uma sequência contínua.
+
+    Cada palavra pertence ao trecho cuja região mantida contém o seu ponto médio,
+    o que elimina as palavras duplicadas na sobreposição. Os timestamps resultantes
+    são monotonicamente crescentes.
+
+    Args:
+        chunk_segments (list): Lista de listas de segmentos, uma por trecho.
+        chunks (list): Trechos retornados por plan_chunks, na mesma ordem.
+
+    Returns:
+        list: Segmentos no formato do JSON de palavras, com ids renumerados.
+    """
+    stitched = []
+    last_time = 0.0
+    for segments, chunk in zip(chunk_segments, chunks):
+        keep_start, keep_end = chunk["keep_start"], chunk["keep_end"]
+        for seg in segments:
+            words = seg.get("words")
+            if words:
+                words = [w for w in words if keep_start <= (w["start"] + w["end"]) / 2 < keep_end]
+                if not words:
+                    continue
+                if len(words) != len(seg["words"]):
+                    seg["text"] = "".join(w["word"] for w in words)
+                for w in words:
+                    w["start"] = max(w["start"], last_time)
+                    w["end"] = max(w["end"], w["start"])
+                    last_time = w["end"]
+                seg["words"] = words
+                seg["start"], seg["end"] = words[0]["start"], words[-1]["end"]
+            else:
+                if not keep_start <= (seg["start"] + seg["end"]) / 2 < keep_end:
+                    continue
+                seg["start"] = max(seg["start"], last_time)
+                seg["end"] = max(seg["end"], seg["start"])
+                last_time = seg["end"]
+            seg["id"] = len(stitched) + 1
+            stitched.append(seg)
+    return stitched
+
+
+def transcribe_audio_chunked(audio_path, base_name, parallel_chunks, model_size=None, stats=None, device=None,
+                             chunk_seconds=CHUNK_SECONDS, overlap_seconds=CHUNK_OVERLAP_SECONDS, profile=None,
+                             cascade_model=None, word_timestamps=None, vad_filter=None, cpu_threads=None,
+                             hallucination_guard=None):
+    """
+    Transcreve um áudio longo dividindo-o em trechos transcritos simultaneamente.
+    Áudios mais curtos que CHUNKED_MIN_DURATION_SECONDS são transcritos em um único trecho.
+
+    Args:
+        audio_path (str): Caminho para o arquivo de áudio.
+        base_name (str): Nome base para os arquivos de saída em WORDS_DIR.
+        parallel_chunks (int): Número de trechos transcritos ao mesmo tempo.
+        model_size (str, optional): Tamanho do modelo (padrão: DEFAULT_FASTER_WHISPER_MODEL).
+        stats (dict, optional): Dicionário preenchido com duração do áudio e tempo de transcrição.
+        device (str, optional): Força o dispositivo ("cuda" ou "cpu").
+        chunk_seconds (float): Duração alvo de cada trecho.
+        overlap_seconds (float): Sobreposição entre trechos consecutivos.
+        profile (str, optional): Perfil de decodificação (padrão: DECODING_PROFILE do config).
+        cascade_model (str, optional): Modelo maior que re-transcreve, após a união dos trechos, as
+                                       regiões de baixa confiança (padrão: CASCADE_MODEL do config).
+        word_timestamps (bool, optional): Ignorado: a união dos trechos exige timestamps de palavras
+                                          (um aviso é registrado quando False ou SEGMENT_TIMESTAMPS_ONLY).
+        vad_filter (bool, optional): Se True, remove silêncios com o VAD Silero em cada trecho
+                                     (padrão: VAD_FILTER do config).
+        cpu_threads (int, optional): Threads de CPU do modelo (padrão: as do modelo, sem calibração).
+        hallucination_guard (bool, optional): Se True, detecta e pula laços de alucinação em cada trecho
+                                              (padrão: HALLUCINATION_GUARD_ENABLED do config).
+
+    Returns:
+        bool: True se a transcrição foi bem-sucedida, False caso contrário.
+    """
+    from faster_whisper.audio import decode_audio
+    from src.generate_transcription_fw import save_transcription
+
+    logger.info(f"Iniciando transcrição paralela em trechos: {audio_path}")
+    if not os.path.exists(audio_path):
+        logger.error(f"Arquivo de áudio não encontrado: {audio_path}")
+        return False
+
+    sampler = None
+    transcriber = None
+    try:
+        # num_workers permite chamadas simultâneas ao mesmo modelo a partir de várias threads
+        transcriber = FasterWhisperTranscriber(model_size, device, num_workers=parallel_chunks)
+        # Apenas o compute_type calibrado: as threads foram medidas para um único fluxo
+        apply_tuned_settings(transcriber, cpu_threads=False)
+        if cpu_threads:
+            transcriber.load_options["cpu_threads"] = cpu_threads
+        compute_type = transcriber.compute_type
+        model_size = transcriber.model_size
+        vad_filter = VAD_FILTER if vad_filter is None else vad_filter
+        profile_name, profile = get_decoding_profile(profile)
+        # A emenda descarta a sobreposição palavra a palavra; só com timestamps de segmento,
+        # segmentos inteiros da sobreposição apareceriam nos dois trechos
+        if word_timestamps is False or (word_timestamps is None and SEGMENT_TIMESTAMPS_ONLY):
+            logger.warning("Transcrição em trechos exige timestamps de palavras; modo só com segmentos ignorado")
+        profile["word_timestamps"] = True
+        params = {"backend": transcriber.name, "model_size": model_size, "compute_type": compute_type,
+                  "language": LANGUAGE, "profile": profile_name, **profile,
+                  "chunk_seconds": chunk_seconds, "overlap_seconds": overlap_seconds, "vad_filter": vad_filter}
+        cascade_model = CASCADE_MODEL if cascade_model is None else cascade_model
+        if cascade_model:
+            params["cascade_model"] = cascade_model
+        hallucination_guard = HALLUCINATION_GUARD_ENABLED if hallucination_guard is None else hallucination_guard
+        if hallucination_guard:
+            params["hallucination_guard"] = True
+        
+        # Reaproveitar transcrição do mesmo áudio com os mesmos parâmetros
+        cached = transcription_cache.get(audio_path, params, base_name)
+        if cached is not None:
+            if stats is not None:
+                stats.update({"cache_hit": True, "saved_seconds": cached.get("compute_seconds", 0.0)})
+            return True
+        
+        sampler = ResourceSampler("transcription").start()
+        # Carregamento do modelo (warm-up) medido à parte do tempo de transcrição
+        load_start = time.time()
+        transcriber.load()
+        warmup_seconds = time.time() - load_start
+
+        start_time = time.time()
+        audio = cached_audio_input(audio_path)
+        if isinstance(audio, str):
+            audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        duration = len(audio) / SAMPLE_RATE
+        if duration < CHUNKED_MIN_DURATION_SECONDS:
+            # Áudios curtos não compensam a divisão: um único trecho cobre o arquivo todo
+            chunks = [{"start": 0.0, "end": duration, "keep_start": 0.0, "keep_end": duration}]
+        else:
+            chunks = plan_chunks(audio, chunk_seconds, overlap_seconds)
+        logger.info(f"Áudio de {duration:.1f}s dividido em {len(chunks)} trechos "
+                    f"({parallel_chunks} simultâneos)")
+
+        with ThreadPoolExecutor(max_workers=parallel_chunks) as executor:
+            results = list(executor.map(lambda chunk: _transcribe_chunk(transcriber, audio, chunk, profile, vad_filter,
+                                                                        hallucination_guard=hallucination_guard),
+                                        chunks))
+        chunk_segments = [segments for segments, _, _ in results]
+        redecoders = [redecoder for _, redecoder, _ in results if redecoder is not None]
+        guards = [guard for _, _, guard in results if guard is not None]
+
+        segments_json = stitch_chunks(chunk_segments, chunks)
+        cascade = None
+        if cascade_model:
+            cascade = CascadeRedecoder(transcriber, lambda: audio, cascade_model,
+                                       word_timestamps=profile["word_timestamps"])
+            segments_json = list(cascade.process(segments_json))
+        elapsed = time.time() - start_time
+        throughput = duration / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Áudio de {duration:.1f}s transcrito em {elapsed:.1f}s ({throughput:.2f} s de áudio/s)")
+        if stats is not None:
+            stats.update({"audio_seconds": duration, "wall_seconds": elapsed, "warmup_seconds": warmup_seconds,
+                          "chunks": len(chunks), "profile": profile_name})
+        if any(guard.regions for guard in guards):
+            hallucination_seconds = sum(guard.stats(duration)["hallucination_seconds"] for guard in guards)
+            guard_stats = {
+                "hallucination_regions": sum(len(guard.regions) for guard in guards),
+                "hallucination_segments": sum(guard.dropped_segments for guard in guards),
+                "hallucination_seconds": hallucination_seconds,
+                "hallucination_fraction": min(1.0, hallucination_seconds / duration) if duration > 0 else 0.0,
+            }
+            logger.warning(f"Laços de alucinação: {guard_stats['hallucination_regions']} região(ões), "
+                           f"{guard_stats['hallucination_segments']} segmentos descartados "
+                           f"({hallucination_seconds:.1f}s pulados)")
+            if stats is not None:
+                stats.update(guard_stats)
+        if redecoders:
+            redecoded_seconds = sum(redecoder.redecoded_seconds for redecoder in redecoders)
+            redecoded_fraction = min(1.0, redecoded_seconds / duration) if duration > 0 else 0.0
+            logger.info(f"Re-decodificados {sum(r.redecoded_segments for r in redecoders)} segmentos "
+                        f"({redecoded_fraction:.1%} do áudio)")
+            if stats is not None:
+                stats.update({"redecoded_segments": sum(r.redecoded_segments for r in redecoders),
+                              "redecoded_seconds": redecoded_seconds, "redecoded_fraction": redecoded_fraction})
+        if cascade is not None:
+            cascade_stats = cascade.stats(duration)
+            logger.info(f"Cascata: {cascade_stats['cascade_segments']}/{cascade.segments} segmentos enviados ao "
+                        f"modelo {cascade_model} ({cascade_stats['cascade_fraction']:.1%} do áudio)")
+            if stats is not None:
+                stats.update(cascade_stats)
+
+        output_txt, output_json = save_transcription(base_name, segments_json)
+        transcription_cache.put(audio_path, params, base_name, elapsed)
+        sampler.stop()
+        resources = sampler.summary(include_samples=False)
+        logger.info(f"Recursos da transcrição: {format_peaks(resources)}")
+        if stats is not None:
+            stats["resources"] = resources
+        logger.info(f"Transcrição salva em {output_txt} e segmentos em {output_json}")
+        return True
+
+    except Exception as e:
+        if sampler is not None:
+            sampler.stop()
+        logger.error(f"Erro ao transcrever {audio_path} em trechos: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return False
+    finally:
+        if transcriber is not None:
+            # O modelo continua no cache do processo, mas deixa de contar como em uso
+            transcriber.release()
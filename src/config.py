@@ -13,12 +13,91 @@ WORDS_DIR = TRANSCRIPT_DIR / "words"
 SECTIONS_DIR = TRANSCRIPT_DIR / "sections"
 EXCEL_OUTPUT_DIR = BASE_DIR / "excel_output"
 VIDEOS_FILE = BASE_DIR / "videos.txt"
+TRANSCRIPTION_CACHE_DIR = TRANSCRIPT_DIR / "cache"
+AUDIO_CACHE_DIR = AUDIO_DIR / "decoded"
+BENCHMARK_DIR = BASE_DIR / "benchmarks"
+TRANSCRIPTION_DAEMON_SOCKET = BASE_DIR / "transcriber.sock"
+FINGERPRINT_DIR = TRANSCRIPT_DIR / "fingerprints"
+AUTOTUNE_FILE = BASE_DIR / "autotune.json"
+RTF_HISTORY_FILE = BASE_DIR / "rtf_history.json"
+MODELS_DIR = BASE_DIR / "models"
 
 # Configurações de transcrição
 DEFAULT_WHISPER_MODEL = "tiny"           # Tamanho do modelo Whisper original
 DEFAULT_FASTER_WHISPER_MODEL = "tiny"     # Tamanho do modelo Faster-Whisper
 USE_FASTER_WHISPER_BY_DEFAULT = True       # Se True, usa Faster-Whisper por padrão
+DEFAULT_TRANSCRIPTION_BACKEND = "faster-whisper" if USE_FASTER_WHISPER_BY_DEFAULT else "whisper"  # Backend usado quando nenhum é informado
+MODEL_STORE_ENABLED = True                 # Carrega os modelos sempre de MODELS_DIR (python -m src.model_store prefetch)
+MODEL_STORE_OFFLINE = False                # Se True, nunca baixa modelos: falha se o modelo não estiver em MODELS_DIR
+MODEL_STORE_MODELS = [f"faster-whisper:{DEFAULT_FASTER_WHISPER_MODEL}", f"whisper:{DEFAULT_WHISPER_MODEL}"]  # Modelos baixados por padrão no prefetch
 LANGUAGE = "pt"                            # Idioma padrão para transcrição
+DECODING_PROFILE = "accurate"              # Perfil de decodificação padrão (fast, balanced ou accurate)
+FALLBACK_BEAM_SIZE = 5                     # Feixe usado ao re-decodificar segmentos de baixa confiança
+FALLBACK_LOGPROB_THRESHOLD = -1.0          # avg_logprob abaixo disso marca o segmento para re-decodificação
+FALLBACK_COMPRESSION_RATIO_THRESHOLD = 2.4 # compression_ratio acima disso (texto repetitivo) marca o segmento
+FALLBACK_NO_SPEECH_THRESHOLD = 0.6         # no_speech_prob acima disso indica silêncio: não re-decodifica
+MODEL_CACHE_MAX_MEMORY_MB = 8192           # Orçamento de memória (MB) do cache de modelos carregados
+TRANSCRIPTION_DAEMON_ENABLED = True        # Envia as transcrições ao daemon (modelos já carregados) quando ele estiver em execução
+TRANSCRIPTION_DAEMON_CONNECT_TIMEOUT = 5   # Tempo máximo (s) para conectar ao daemon
+TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS = 15  # Intervalo (s) dos sinais de vida do daemon; sem nenhum em 3 intervalos, o cliente desiste
+TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT = 6 * 3600  # Duração máxima (s) de uma transcrição no daemon; depois dela os sinais de vida param e o cliente desiste
+AUTOTUNE_ENABLED = True                    # Usa o compute_type/threads calibrados para o host (python -m src.autotune)
+AUTOTUNE_FIXTURE_SECONDS = 30              # Duração (s) do áudio usado na calibração
+SCHEDULE_LONGEST_FIRST = True              # Ordena a fila de transcrição do vídeo mais longo para o mais curto e estima a conclusão
+SCHEDULE_DEFAULT_RTF = 0.5                 # RTF (tempo de transcrição / duração) assumido enquanto não há medições
+BATCH_SIZE = 0                             # Tamanho do lote do pipeline em lote do Faster-Whisper (0 = desativado)
+WORKER_POOL_THREADS_PER_WORKER = 4         # Threads de CPU por processo no pool de transcrição automático
+VAD_FILTER = False                         # Se True, remove silêncios com VAD (Silero) antes de decodificar
+VAD_MIN_SILENCE_MS = 500                   # Silêncio mínimo (ms) para separar regiões de fala no VAD
+VAD_SPEECH_PAD_MS = 400                    # Margem (ms) mantida ao redor de cada região de fala
+TRANSCRIPTION_CACHE_ENABLED = True         # Reaproveita transcrições do mesmo áudio (hash) com os mesmos parâmetros
+AUDIO_CACHE_ENABLED = True                 # Decodifica cada áudio uma única vez para PCM 16 kHz mapeado em memória
+AUDIO_CACHE_MAX_MB = 4096                  # Tamanho máximo do cache decodificado (~230 MB por hora de áudio); os menos usados são removidos
+AUDIO_PREFETCH_WORKERS = 2                 # Decodificações simultâneas à frente da transcrição
+WORDS_JSON_ENABLED = True                  # Grava {id}.json com os segmentos/palavras (indent=2)
+SEGMENT_TIMESTAMPS_ONLY = False            # Transcreve sem timestamps de palavras (sem o alinhamento por atenção cruzada); os blocos seguem os limites dos segmentos
+BLOCK_EDGE_REFINEMENT = True               # Sem timestamps de palavras, ajusta o início/fim de cada bloco ao início/fim da fala no áudio
+BLOCK_EDGE_SEARCH_SECONDS = 1.0            # Janela (s) ao redor de cada borda de bloco onde o início/fim da fala é procurado
+WORD_STORE_ENABLED = True                  # Grava também {id}.words.bin (formato colunar mapeado em memória)
+CHECKPOINT_INTERVAL_SECONDS = 30           # Intervalo (s) entre checkpoints de transcrições em andamento
+RESOURCE_SAMPLING_ENABLED = True           # Registra RSS/CPU/threads/disco/GPU de cada etapa no relatório da execução
+RESOURCE_SAMPLE_INTERVAL = 1.0             # Intervalo (s) entre amostras de uso de recursos
+STREAMING_DECODE_MIN_SECONDS = 3600        # Áudios a partir desta duração (s) são decodificados e transcritos em janelas (0 = desativado)
+STREAMING_WINDOW_SECONDS = 600             # Duração (s) de cada janela da transcrição em janelas
+STREAMING_WINDOW_MARGIN_SECONDS = 30       # Segmentos que terminam nos últimos N s de uma janela são re-decodificados na seguinte
+PARALLEL_CHUNKS = 0                        # Trechos transcritos simultaneamente em vídeos longos (0 = desativado)
+CHUNK_SECONDS = 600                        # Duração alvo (s) de cada trecho na transcrição paralela de um vídeo longo
+CHUNK_OVERLAP_SECONDS = 5                  # Sobreposição (s) entre trechos consecutivos
+CHUNK_SILENCE_SEARCH_SECONDS = 30          # Janela (s) ao redor do corte alvo onde se procura um silêncio
+CHUNKED_MIN_DURATION_SECONDS = 1800        # Duração mínima (s) para usar a transcrição paralela em trechos
+CASCADE_MODEL = None                       # Modelo maior que re-transcreve trechos de baixa confiança (ex: "large-v3"; None = desativado)
+CASCADE_LOGPROB_THRESHOLD = -0.8           # avg_logprob abaixo disso envia o segmento ao modelo maior
+CASCADE_WORD_PROB_THRESHOLD = 0.4          # Palavra com probabilidade abaixo disso envia o segmento ao modelo maior
+HALLUCINATION_GUARD_ENABLED = False        # Interrompe laços de repetição (música/silêncio) e pula o trecho afetado
+                                           # (descarta segmentos antes da re-decodificação dos perfis com fallback)
+HALLUCINATION_MIN_SEGMENTS = 3             # Segmentos suspeitos consecutivos que caracterizam um laço
+HALLUCINATION_NGRAM = 3                    # Tamanho dos n-gramas comparados na detecção de repetição
+HALLUCINATION_REPEAT_RATIO = 0.5           # Fração dos n-gramas de um segmento já vistos nos segmentos recentes para considerá-lo repetido
+HALLUCINATION_SKIP_SECONDS = 10            # Avanço (s) após o laço antes de retomar a decodificação
+SPEECH_TRIAGE_ENABLED = True               # Pula, antes da transcrição, arquivos sem fala (só música ou silêncio)
+SPEECH_TRIAGE_MIN_SPEECH_RATIO = 0.05      # Fração mínima de fala nas janelas amostradas para transcrever o arquivo
+SPEECH_TRIAGE_WINDOWS = 12                 # Janelas amostradas ao longo do áudio na triagem
+SPEECH_TRIAGE_WINDOW_SECONDS = 10          # Duração (s) de cada janela amostrada
+SPEECH_TRIAGE_SILENCE_DB = -50             # Energia (dBFS) abaixo da qual um quadro é considerado silêncio
+FINGERPRINT_DEDUP_ENABLED = True           # Reaproveita a transcrição de áudios quase idênticos (impressão digital acústica)
+FINGERPRINT_SIMILARITY_THRESHOLD = 0.8     # Fração mínima de bits iguais entre as impressões digitais alinhadas
+FINGERPRINT_MIN_COVERAGE = 0.9             # Fração mínima de cada áudio coberta pelo trecho em comum
+FINGERPRINT_MAX_OFFSET_SECONDS = 1.0       # Deslocamento máximo (s) para reaproveitar os timestamps da transcrição
+
+# Perfis de decodificação: "fallback" re-decodifica com busca em feixe os segmentos de baixa confiança.
+# Com "temperature": 0.0 (fast/balanced), o fallback de temperatura do modelo (0.0 -> 1.0 em segmentos
+# com logprob/compressão ruins) fica desativado: esses segmentos passam pela re-decodificação com feixe.
+# Sem a chave (accurate), vale a escala de temperaturas padrão do backend.
+DECODING_PROFILES = {
+    "fast": {"beam_size": 1, "best_of": 1, "temperature": 0.0, "fallback": True},
+    "balanced": {"beam_size": 2, "best_of": 2, "temperature": 0.0, "fallback": True},
+    "accurate": {"beam_size": 5, "best_of": 5, "fallback": False},
+}
 
 # Configurações de segmentação de texto
 TARGET_WORDS_PER_BLOCK = 130               # Número alvo de palavras por bloco na divisão
@@ -36,6 +115,10 @@ LOG_FILE = BASE_DIR / "youtube_transcriber.log"
 DOWNLOAD_FORMAT = "bestaudio"
 AUDIO_FORMAT = "wav"
 AUDIO_QUALITY = 0
+CAPTIONS_ENABLED = False                   # Usa as legendas do YouTube no lugar do ASR quando houver uma faixa aceitável
+CAPTION_LANGUAGES = [LANGUAGE]             # Idiomas de legenda aceitos, em ordem de preferência
+CAPTION_ACCEPT_AUTO = True                 # Aceita legendas automáticas (só no idioma original do vídeo)
+CAPTION_MIN_COVERAGE = 0.3                 # Fração mínima da duração do vídeo coberta pelas legendas
 
 # Formatos de áudio suportados para arquivos locais
 SUPPORTED_AUDIO_FORMATS = ['.mp4', '.wav', '.m4a', '.mp3', '.aac']
@@ -0,0 +1,274 @@
+"""
+Módulo de perfis de decodificação (fast/balanced/accurate).
+Os perfis rápidos decodificam com busca gulosa ou feixe estreito e re-decodificam com
+busca em feixe apenas os segmentos de baixa confiança, mantendo a qualidade onde ela importa.
+A cascata (CascadeRedecoder) segue a mesma ideia, mas envia esses trechos a um modelo maior.
+"""
+import itertools
+from src.utils.logger import setup_logger
+from src.config import (
+    DECODING_PROFILE, DECODING_PROFILES, FALLBACK_BEAM_SIZE, FALLBACK_LOGPROB_THRESHOLD,
+    FALLBACK_COMPRESSION_RATIO_THRESHOLD, FALLBACK_NO_SPEECH_THRESHOLD, CASCADE_MODEL,
+    CASCADE_LOGPROB_THRESHOLD, CASCADE_WORD_PROB_THRESHOLD
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Trechos mais curtos que isso (s) não são re-decodificados
+MIN_REDECODE_SECONDS = 0.2
+
+
+def get_decoding_profile(name=None):
+    """
+    Retorna as opções de um perfil de decodificação.
+
+    Args:
+        name (str, optional): Nome do perfil (padrão: DECODING_PROFILE do config).
+
+    Returns:
+        tuple: (nome do perfil, dicionário com beam_size, best_of, temperature e fallback)
+    """
+    name = name or DECODING_PROFILE
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Perfil de decodificação desconhecido: {name} (disponíveis: {', '.join(DECODING_PROFILES)})")
+    return name, dict(DECODING_PROFILES[name])
+
+
+def decode_options(profile):
+    """Extrai do perfil as opções repassadas ao modelo (sem a chave fallback)."""
+    return {key: value for key, value in profile.items() if key != "fallback"}
+
+
+def needs_redecode(seg_dict):
+    """
+    Indica se um segmento tem baixa confiança e deve ser re-decodificado com busca em feixe.
+
+    Segmentos provavelmente sem fala (no_speech_prob acima do limiar) não são re-decodificados.
+
+    Args:
+        seg_dict (dict): Segmento com avg_logprob, compression_ratio e no_speech_prob.
+
+    Returns:
+        bool: True se o segmento deve ser re-decodificado.
+    """
+    no_speech_prob = seg_dict.get("no_speech_prob")
+    if no_speech_prob is not None and no_speech_prob > FALLBACK_NO_SPEECH_THRESHOLD:
+        return False
+    avg_logprob = seg_dict.get("avg_logprob")
+    compression_ratio = seg_dict.get("compression_ratio")
+    return ((avg_logprob is not None and avg_logprob < FALLBACK_LOGPROB_THRESHOLD) or
+            (compression_ratio is not None and compression_ratio > FALLBACK_COMPRESSION_RATIO_THRESHOLD))
+
+
+def needs_cascade(seg_dict):
+    """
+    Indica se um segmento tem baixa confiança e deve ser re-transcrito pelo modelo maior da cascata.
+
+    Args:
+        seg_dict (dict): Segmento com avg_logprob, no_speech_prob e, se disponíveis, as palavras.
+
+    Returns:
+        bool: True se avg_logprob ou a probabilidade de alguma palavra estiver abaixo do limiar.
+    """
+    no_speech_prob = seg_dict.get("no_speech_prob")
+    if no_speech_prob is not None and no_speech_prob > FALLBACK_NO_SPEECH_THRESHOLD:
+        return False
+    avg_logprob = seg_dict.get("avg_logprob")
+    if avg_logprob is not None and avg_logprob < CASCADE_LOGPROB_THRESHOLD:
+        return True
+    return any(w.get("probability") is not None and w["probability"] < CASCADE_WORD_PROB_THRESHOLD
+               for w in seg_dict.get("words", []))
+
+
+def _mean_logprob(segments):
+    values = [seg["avg_logprob"] for seg in segments if seg.get("avg_logprob") is not None]
+    return sum(values) / len(values) if values else float("-inf")
+
+
+class SegmentRedecoder:
+    """Re-decodifica com busca em feixe os segmentos de baixa confiança de uma transcrição em streaming."""
+
+    def __init__(self, transcriber, load_audio, beam_size=FALLBACK_BEAM_SIZE, word_timestamps=True):
+        """
+        Inicializa o re-decodificador.
+
+        Args:
+            transcriber (Transcriber): Backend já carregado usado na re-decodificação.
+            load_audio (callable): Função sem argumentos que retorna o áudio completo (float32 mono
+                                   na taxa do backend); chamada apenas na primeira re-decodificação.
+            beam_size (int): Tamanho do feixe da re-decodificação.
+            word_timestamps (bool): Se True, os segmentos re-decodificados trazem timestamps de palavras.
+        """
+        self.transcriber = transcriber
+        self.load_audio = load_audio
+        self.beam_size = beam_size
+        self.word_timestamps = word_timestamps
+        self._audio = None
+        self.segments = 0
+        self.redecoded_segments = 0
+        self.redecoded_seconds = 0.0
+
+    def process(self, segments, first_id=1):
+        """
+        Percorre os segmentos, substituindo os de baixa confiança pela re-decodificação.
+
+        Args:
+            segments (iterable): Segmentos no formato do JSON de palavras (timestamps absolutos).
+            first_id (int): Id atribuído ao primeiro segmento gerado.
+
+        Yields:
+            dict: Segmentos finais, com ids renumerados.
+        """
+        next_id = first_id
+        for seg_dict in segments:
+            self.segments += 1
+            result = [seg_dict]
+            if needs_redecode(seg_dict):
+                result = self._redecode(seg_dict)
+            for seg in result:
+                seg["id"] = next_id
+                next_id += 1
+                yield seg
+
+    def _decode_range(self, start, end):
+        """Decodifica com busca em feixe o trecho [start, end] do áudio completo."""
+        if self._audio is None:
+            self._audio = self.load_audio()
+        sample_rate = self.transcriber.sample_rate
+        clip = self._audio[int(start * sample_rate):int(end * sample_rate)]
+
+        new_segments, _ = self.transcriber.transcribe(
+            clip,
+            offset=start,
+            beam_size=self.beam_size,
+            best_of=self.beam_size,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            word_timestamps=self.word_timestamps
+        )
+        return list(new_segments)
+
+    def _redecode(self, seg_dict):
+        """Re-decodifica o trecho de um segmento e mantém o resultado mais confiável."""
+        duration = seg_dict["end"] - seg_dict["start"]
+        if duration < MIN_REDECODE_SECONDS:
+            return [seg_dict]
+        new_segments = self._decode_range(seg_dict["start"], seg_dict["end"])
+        self.redecoded_segments += 1
+        self.redecoded_seconds += duration
+        if new_segments and _mean_logprob(new_segments) >= _mean_logprob([seg_dict]):
+            logger.debug(f"Segmento {seg_dict['start']:.1f}-{seg_dict['end']:.1f}s re-decodificado com busca em feixe")
+            return new_segments
+        return [seg_dict]
+
+    def stats(self, audio_seconds):
+        """
+        Retorna as estatísticas de re-decodificação.
+
+        Args:
+            audio_seconds (float): Duração total do áudio transcrito.
+
+        Returns:
+            dict: redecoded_segments, redecoded_seconds e redecoded_fraction (fração do áudio).
+        """
+        fraction = self.redecoded_seconds / audio_seconds if audio_seconds > 0 else 0.0
+        return {
+            "redecoded_segments": self.redecoded_segments,
+            "redecoded_seconds": self.redecoded_seconds,
+            "redecoded_fraction": fraction,
+        }
+
+
+class CascadeRedecoder(SegmentRedecoder):
+    """
+    Transcrição em duas camadas: os trechos de baixa confiança do modelo pequeno são
+    re-transcritos por um modelo maior, carregado apenas quando o primeiro trecho é encontrado.
+
+    Segmentos consecutivos de baixa confiança são agrupados em uma única região, para que o
+    modelo maior tenha contexto; as palavras resultantes já saem com timestamps absolutos.
+    """
+
+    def __init__(self, transcriber, load_audio, model_size=None, beam_size=FALLBACK_BEAM_SIZE, word_timestamps=True):
+        """
+        Inicializa a cascata.
+
+        Args:
+            transcriber (Transcriber): Backend do modelo pequeno (define classe, dispositivo, tipo de
+                                       computação e opções de carregamento, como cpu_threads).
+            load_audio (callable): Função sem argumentos que retorna o áudio completo (float32 mono).
+            model_size (str, optional): Modelo maior (padrão: CASCADE_MODEL do config).
+            beam_size (int): Tamanho do feixe usado pelo modelo maior.
+            word_timestamps (bool): Se True, os segmentos do modelo maior trazem timestamps de palavras.
+        """
+        # O modelo maior herda compute_type e cpu_threads do pequeno (ex: int8 com as threads calibradas)
+        large = type(transcriber)(model_size=model_size or CASCADE_MODEL, device=transcriber.device,
+                                  compute_type=transcriber.compute_type, **transcriber.load_options)
+        large.sample_rate = transcriber.sample_rate
+        super().__init__(large, load_audio, beam_size, word_timestamps)
+
+    def process(self, segments, first_id=1):
+        """
+        Percorre os segmentos, substituindo as regiões de baixa confiança pela saída do modelo maior.
+
+        Args:
+            segments (iterable): Segmentos no formato do JSON de palavras (timestamps absolutos).
+            first_id (int): Id atribuído ao primeiro segmento gerado.
+
+        Yields:
+            dict: Segmentos finais, com ids renumerados.
+        """
+        next_id = first_id
+        region = []
+        try:
+            for seg_dict in itertools.chain(segments, [None]):
+                if seg_dict is not None:
+                    self.segments += 1
+                    if needs_cascade(seg_dict):
+                        region.append(seg_dict)
+                        continue
+                result = self._retranscribe(region) if region else []
+                region = []
+                if seg_dict is not None:
+                    result.append(seg_dict)
+                for seg in result:
+                    seg["id"] = next_id
+                    next_id += 1
+                    yield seg
+        finally:
+            # O modelo maior deixa de contar como em uso ao fim da transcrição
+            self.transcriber.release()
+
+    def _retranscribe(self, region):
+        """Re-transcreve com o modelo maior uma região de segmentos consecutivos de baixa confiança."""
+        start, end = region[0]["start"], region[-1]["end"]
+        if end - start < MIN_REDECODE_SECONDS:
+            return region
+        if self.transcriber.model is None:
+            logger.info(f"Cascata: carregando modelo {self.transcriber.model_size} para trechos de baixa confiança")
+        new_segments = self._decode_range(start, end)
+        self.redecoded_segments += len(region)
+        self.redecoded_seconds += end - start
+        if not new_segments:
+            return region
+        logger.debug(f"Região {start:.1f}-{end:.1f}s re-transcrita com o modelo {self.transcriber.model_size}")
+        return new_segments
+
+    def stats(self, audio_seconds):
+        """
+        Retorna as estatísticas da cascata.
+
+        Args:
+            audio_seconds (float): Duração total do áudio transcrito.
+
+        Returns:
+            dict: cascade_model, cascade_segments, cascade_seconds e cascade_fraction (fração do
+                  áudio enviada ao modelo maior).
+        """
+        fraction = self.redecoded_seconds / audio_seconds if audio_seconds > 0 else 0.0
+        return {
+            "cascade_model": self.transcriber.model_size,
+            "cascade_segments": self.redecoded_segments,
+            "cascade_seconds": self.redecoded_seconds,
+            "cascade_fraction": fraction,
+        }
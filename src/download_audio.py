@@ -1,14 +1,21 @@
 """
 Módulo para download de áudio de vídeos do YouTube e cópia de arquivos locais.
 Fornece funcionalidades para ler URLs/caminhos de arquivos e baixar áudio em formato WAV ou copiar arquivos locais.
+Opcionalmente, usa a faixa de legendas do vídeo (manual ou automática no idioma original) como
+transcrição, no mesmo formato de segmentos do ASR, evitando o download do áudio e o Whisper.
 """
 import os
+import re
+import html
 import shutil
-from yt_dlp import YoutubeDL
 import argparse
 from pathlib import Path
 from src.utils.logger import setup_logger
-from src.config import VIDEOS_FILE, DOWNLOAD_FORMAT, AUDIO_FORMAT, AUDIO_QUALITY, is_local_file
+from src.transcript_writer import StreamingTranscriptWriter
+from src.config import (
+    VIDEOS_FILE, DOWNLOAD_FORMAT, AUDIO_FORMAT, AUDIO_QUALITY, CAPTION_LANGUAGES, CAPTION_ACCEPT_AUTO,
+    CAPTION_MIN_COVERAGE, is_local_file
+)
 
 # Configurar logger para este módulo
 logger = setup_logger(__name__)
@@ -109,6 +116,7 @@ def download_audio(url_or_path, output_name, no_playlist=True):
         ydl_opts['noplaylist'] = True
         
     try:
+        from yt_dlp import YoutubeDL
         with YoutubeDL(ydl_opts) as ydl:
             logger.debug(f"Baixando áudio de: {url_or_path}")
             info = ydl.extract_info(url_or_path, download=True)
@@ -124,6 +132,275 @@ def download_audio(url_or_path, output_name, no_playlist=True):
         logger.error(f"Erro ao baixar {url_or_path}: {str(e)}")
         return False
 
+_TIMING_RE = re.compile(r"((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})")
+_WORD_TIME_RE = re.compile(r"<((?:\d+:)?\d{1,2}:\d{2}\.\d{3})>")
+_TAG_RE = re.compile(r"<[^>]*>")
+# Formatos de legenda do YouTube que parse_captions entende, em ordem de preferência
+CAPTION_FORMATS = ("vtt", "srt")
+
+
+def _parse_time(value):
+    """Converte um timestamp de legenda (hh:mm:ss.mmm, mm:ss.mmm ou com vírgula do SRT) em segundos."""
+    seconds = 0.0
+    for part in value.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _clean_caption(text):
+    """Remove as tags de estilo/tempo e decodifica as entidades HTML de uma linha de legenda."""
+    return " ".join(html.unescape(_TAG_RE.sub("", text)).split())
+
+
+def _caption_words(line, start, end):
+    """
+    Palavras de uma linha de legenda. Os tempos vêm das tags <hh:mm:ss.mmm> das legendas
+    automáticas; sem elas, são distribuídos pelo intervalo da legenda na proporção do tamanho
+    de cada palavra.
+    """
+    parts = _WORD_TIME_RE.split(line)
+    # parts alterna texto e tempo: [texto, tempo, texto, tempo, texto, ...]
+    chunks = [(start if i == 0 else _parse_time(parts[i - 1]), _clean_caption(parts[i]))
+              for i in range(0, len(parts), 2)]
+    chunks = [(chunk_start, text) for chunk_start, text in chunks if text]
+    words = []
+    for i, (chunk_start, text) in enumerate(chunks):
+        chunk_end = chunks[i + 1][0] if i + 1 < len(chunks) else end
+        tokens = text.split()
+        total = sum(len(token) for token in tokens)
+        position = chunk_start
+        for token in tokens:
+            token_end = position + (chunk_end - chunk_start) * len(token) / total
+            words.append({"word": " " + token, "start": round(position, 3), "end": round(token_end, 3),
+                          "probability": None})
+            position = token_end
+    return words
+
+
+def _caption_cues(content):
+    """
+    Separa as legendas de um arquivo WebVTT ou SRT em (início, fim, linhas de texto).
+
+    As legendas são separadas por linhas vazias; as linhas antes da linha de tempo (número da
+    legenda no SRT, identificador no WebVTT) são ignoradas. Linhas só com espaços, comuns nas
+    legendas automáticas do YouTube, não separam legendas.
+    """
+    cues = []
+    content = content.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n")
+    for block in re.split(r"\n{2,}", content):
+        lines = block.split("\n")
+        timing_index = next((i for i, line in enumerate(lines) if _TIMING_RE.search(line)), None)
+        if timing_index is None:
+            continue
+        match = _TIMING_RE.search(lines[timing_index])
+        cues.append((_parse_time(match.group(1)), _parse_time(match.group(2)), lines[timing_index + 1:]))
+    return cues
+
+
+def parse_captions(content, kind=None):
+    """
+    Converte uma legenda WebVTT ou SRT em segmentos no formato do JSON de palavras.
+
+    Nas legendas automáticas do YouTube cada legenda repete a linha anterior ("rolagem"); nelas,
+    as linhas já vistas na legenda anterior são descartadas, de modo que cada trecho falado
+    apareça em um único segmento. Legendas manuais são mantidas como estão.
+
+    Args:
+        content (str): Conteúdo do arquivo de legendas.
+        kind (str, optional): "auto" ou "manual"; None detecta pelas tags de tempo por palavra,
+                              presentes apenas nas legendas automáticas.
+
+    Returns:
+        list: Segmentos com id, start, end, text e words (probability None).
+    """
+    if kind is None:
+        kind = "auto" if _WORD_TIME_RE.search(content) else "manual"
+    segments = []
+    previous_lines = []
+    for start, end, lines in _caption_cues(content):
+        raw_lines = [line for line in lines if _clean_caption(line)]
+        cleaned = [_clean_caption(line) for line in raw_lines]
+        new_lines = list(zip(raw_lines, cleaned))
+        if kind == "auto":
+            new_lines = [(raw, text) for raw, text in new_lines if text not in previous_lines]
+        previous_lines = cleaned
+        if not new_lines or end <= start:
+            continue
+        words = []
+        for raw, _ in new_lines:
+            words.extend(_caption_words(raw, start, end))
+        segments.append({
+            "id": len(segments) + 1,
+            "start": round(start, 3),
+            "end": round(end, 3),
+            "text": " " + " ".join(text for _, text in new_lines),
+            "words": words,
+        })
+    return segments
+
+
+def caption_coverage(segments, duration):
+    """
+    Fração da duração do vídeo coberta pelos segmentos de legenda.
+
+    Args:
+        segments (list): Segmentos retornados por parse_captions.
+        duration (float or None): Duração do vídeo em segundos.
+
+    Returns:
+        float or None: Fração coberta (0 a 1), ou None se a duração for desconhecida.
+    """
+    if not duration:
+        return None
+    covered = sum(seg["end"] - seg["start"] for seg in segments)
+    return min(1.0, covered / duration)
+
+
+def _matches_language(track_language, language):
+    return track_language == language or track_language.split("-")[0] == language
+
+
+def select_caption_track(info, languages=None, accept_auto=CAPTION_ACCEPT_AUTO):
+    """
+    Escolhe a faixa de legendas de um vídeo a partir dos metadados do yt-dlp.
+
+    Legendas manuais têm prioridade; as automáticas só são aceitas no idioma original do vídeo
+    (as demais são traduções automáticas).
+
+    Args:
+        info (dict): Metadados retornados por YoutubeDL.extract_info.
+        languages (list, optional): Idiomas aceitos, em ordem de preferência (padrão: CAPTION_LANGUAGES do config).
+        accept_auto (bool): Se True, aceita legendas geradas automaticamente.
+
+    Returns:
+        dict or None: kind ("manual" ou "auto"), language, ext e url da faixa; None se nenhuma for aceitável.
+    """
+    languages = languages or CAPTION_LANGUAGES
+    video_language = info.get("language")
+    candidates = [("manual", info.get("subtitles") or {})]
+    if accept_auto:
+        candidates.append(("auto", info.get("automatic_captions") or {}))
+    for kind, tracks in candidates:
+        for language in languages:
+            if kind == "auto" and video_language and not _matches_language(video_language, language):
+                continue
+            if kind == "auto":
+                # "{idioma}-orig" é a faixa original; "{idioma}" também pode ser uma tradução
+                names = [name for name in (f"{language}-orig", language) if name in tracks]
+            else:
+                names = [name for name in tracks if _matches_language(name, language) and name != "live_chat"]
+            for name in names:
+                formats = {fmt.get("ext"): fmt for fmt in tracks[name] if fmt.get("url")}
+                for ext in CAPTION_FORMATS:
+                    if ext in formats:
+                        return {"kind": kind, "language": name, "ext": ext, "url": formats[ext]["url"]}
+    return None
+
+
+def write_caption_transcript(video_id, segments, words_dir=None):
+    """
+    Grava os segmentos de legenda como a transcrição do vídeo (.txt, .json e .words.bin).
+
+    Args:
+        video_id (str): ID do vídeo.
+        segments (list): Segmentos retornados por parse_captions.
+        words_dir (str, optional): Diretório das transcrições (padrão: WORDS_DIR do config).
+
+    Returns:
+        str: Caminho do .txt gravado.
+    """
+    with StreamingTranscriptWriter(video_id, words_dir) as writer:
+        for seg_dict in segments:
+            writer.write_segment(seg_dict)
+        output_txt, _ = writer.finalize()
+    return output_txt
+
+
+def captions_from_track(content, track, duration=None, min_coverage=CAPTION_MIN_COVERAGE):
+    """
+    Converte o conteúdo de uma faixa de legendas e decide se ela é aceitável como transcrição.
+
+    Args:
+        content (str): Conteúdo da faixa (WebVTT ou SRT).
+        track (dict): Faixa escolhida por select_caption_track (kind e language).
+        duration (float, optional): Duração do vídeo em segundos.
+        min_coverage (float): Fração mínima da duração do vídeo que as legendas devem cobrir.
+
+    Returns:
+        dict or None: source ("captions"), kind, language, coverage e segments; None se a faixa
+                      não tiver legendas ou cobrir menos que min_coverage do vídeo.
+    """
+    segments = parse_captions(content, track["kind"])
+    coverage = caption_coverage(segments, duration)
+    if not segments or (coverage is not None and coverage < min_coverage):
+        coverage_text = "?" if coverage is None else f"{coverage:.1%}"
+        logger.info(f"Legenda {track['language']} ({track['kind']}) rejeitada: "
+                    f"{len(segments)} segmento(s), cobertura {coverage_text}")
+        return None
+    return {
+        "source": "captions",
+        "kind": track["kind"],
+        "language": track["language"],
+        "coverage": coverage,
+        "segments": segments,
+    }
+
+
+def fetch_captions(url, languages=None, accept_auto=CAPTION_ACCEPT_AUTO, min_coverage=CAPTION_MIN_COVERAGE,
+                   no_playlist=True):
+    """
+    Baixa e converte a faixa de legendas de um vídeo do YouTube, sem baixar o áudio.
+
+    Args:
+        url (str): URL do vídeo.
+        languages (list, optional): Idiomas aceitos (padrão: CAPTION_LANGUAGES do config).
+        accept_auto (bool): Se True, aceita legendas geradas automaticamente.
+        min_coverage (float): Fração mínima da duração do vídeo que as legendas devem cobrir.
+        no_playlist (bool): Se True, ignora playlists.
+
+    Returns:
+        dict or None: source ("captions"), kind, language, coverage e segments; None se não houver
+                      faixa aceitável (o vídeo deve então passar pelo ASR).
+    """
+    ydl_opts = {"quiet": True, "skip_download": True, "noplaylist": no_playlist}
+    try:
+        from yt_dlp import YoutubeDL
+        with YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False) or {}
+            track = select_caption_track(info, languages, accept_auto)
+            if track is None:
+                logger.info(f"Nenhuma legenda aceitável para {url}")
+                return None
+            content = ydl.urlopen(track["url"]).read().decode("utf-8", errors="replace")
+    except Exception as e:
+        logger.warning(f"Legendas indisponíveis para {url}: {e}")
+        return None
+    return captions_from_track(content, track, info.get("duration"), min_coverage)
+
+
+def transcript_from_caption_file(path, video_id, words_dir=None, kind=None):
+    """
+    Converte um arquivo de legendas local (.vtt ou .srt) na transcrição de um vídeo.
+
+    Args:
+        path (str): Caminho do arquivo de legendas.
+        video_id (str): ID do vídeo (nome base dos arquivos gravados).
+        words_dir (str, optional): Diretório das transcrições (padrão: WORDS_DIR do config).
+        kind (str, optional): "auto" ou "manual" (padrão: detectado pelo conteúdo).
+
+    Returns:
+        str or None: Caminho do .txt gravado, ou None se o arquivo não tiver legendas.
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        segments = parse_captions(f.read(), kind)
+    if not segments:
+        logger.warning(f"Nenhuma legenda encontrada em {path}")
+        return None
+    output_txt = write_caption_transcript(video_id, segments, words_dir)
+    logger.info(f"Transcrição gerada a partir de {path}: {len(segments)} segmento(s) em {output_txt}")
+    return output_txt
+
+
 def main():
     """
     Função principal para download de áudios quando executado como script.
@@ -138,8 +415,19 @@ def main():
                         help="Diretório para salvar os áudios baixados/copiados (padrão: audios)")
     parser.add_argument("-v", "--verbose", action="store_true", 
                         help="Mostrar mensagens detalhadas de log")
+    parser.add_argument("--captions-file", default=None,
+                        help="Converte um arquivo de legendas (.vtt/.srt) em transcrição, sem baixar nada")
+    parser.add_argument("--video-id", default=None,
+                        help="ID do vídeo usado com --captions-file (padrão: nome do arquivo)")
+    parser.add_argument("--caption-kind", choices=["auto", "manual"], default=None,
+                        help="Tipo da legenda de --captions-file (padrão: detectado pelo conteúdo)")
     args = parser.parse_args()
     
+    if args.captions_file:
+        video_id = args.video_id or Path(args.captions_file).name.split(".")[0]
+        transcript_from_caption_file(args.captions_file, video_id, kind=args.caption_kind)
+        return
+    
     # Garantir que o diretório de saída existe
     os.makedirs(args.output_dir, exist_ok=True)
     
@@ -4,47 +4,51 @@ Fornece funcionalidades para transcrever arquivos de áudio em texto
 com suporte a timestamps de palavras.
 """
 import os
-import whisper
-import torch
 from tqdm import tqdm
 import time
 import json
 import traceback
+from types import SimpleNamespace
 from src.utils.logger import setup_logger
-from src.config import WORDS_DIR, DEFAULT_WHISPER_MODEL, LANGUAGE
+from src.utils.audio_files import read_audio_files, find_audio_file
+from src.backends.whisper_backend import WhisperTranscriber
+from src.transcription_cache import transcription_cache
+from src.decoding_profiles import get_decoding_profile, decode_options, SegmentRedecoder, CascadeRedecoder
+from src.audio_cache import AudioPrefetcher, audio_input as cached_audio_input
+from src.utils.resource_sampler import ResourceSampler, format_peaks
+from src.word_store import write_word_store, word_store_path
+from src.transcript_writer import StreamingTranscriptWriter
+from src.hallucination_guard import HallucinationGuard
+from src.audio_stream import LazyAudio, should_stream, transcribe_windows
+from src.scheduler import probe_duration
+from src.config import (
+    WORDS_DIR, DEFAULT_WHISPER_MODEL, LANGUAGE, WORDS_JSON_ENABLED, WORD_STORE_ENABLED, CASCADE_MODEL,
+    HALLUCINATION_GUARD_ENABLED, STREAMING_WINDOW_SECONDS, SEGMENT_TIMESTAMPS_ONLY
+)
 
 # Configurar logger para este módulo
 logger = setup_logger(__name__)
 
-def read_audio_files(audio_dir):
-    """
-    Lista todos os arquivos de áudio suportados em um diretório.
-    
-    Args:
-        audio_dir (str): Caminho do diretório contendo os arquivos de áudio.
-        
-    Returns:
-        list: Lista de nomes de arquivos de áudio no diretório.
-    """
-    try:
-        from src.config import SUPPORTED_AUDIO_FORMATS
-        supported_files = []
-        for f in os.listdir(audio_dir):
-            if any(f.lower().endswith(ext) for ext in SUPPORTED_AUDIO_FORMATS):
-                supported_files.append(f)
-        return supported_files
-    except Exception as e:
-        logger.error(f"Erro ao listar arquivos de áudio em {audio_dir}: {e}")
-        return []
-
-def transcribe_audio(audio_path, base_name):
+def transcribe_audio(audio_path, base_name, model_size=None, stats=None, profile=None, cascade_model=None,
+                     word_timestamps=None, hallucination_guard=None):
     """
     Transcreve um arquivo de áudio usando o modelo Whisper original.
     Suporta múltiplos formatos: WAV, MP4, M4A, MP3, AAC.
+    O modelo é obtido do cache do processo e carregado apenas uma vez.
     
     Args:
         audio_path (str): Caminho para o arquivo de áudio a ser transcrito.
         base_name (str): Nome base para os arquivos de saída.
+        model_size (str, optional): Tamanho do modelo (padrão: DEFAULT_WHISPER_MODEL).
+        stats (dict, optional): Dicionário preenchido com duração do áudio e tempo de transcrição.
+        profile (str, optional): Perfil de decodificação (fast, balanced ou accurate)
+                                 (padrão: DECODING_PROFILE do config).
+        cascade_model (str, optional): Modelo maior que re-transcreve as regiões de baixa confiança
+                                       (padrão: CASCADE_MODEL do config; vazio desativa).
+        word_timestamps (bool, optional): Se False, transcreve só com timestamps de segmento, sem o
+                                          alinhamento de palavras (padrão: not SEGMENT_TIMESTAMPS_ONLY).
+        hallucination_guard (bool, optional): Se True, descarta os laços de alucinação
+                                              (padrão: HALLUCINATION_GUARD_ENABLED do config).
         
     Returns:
         bool: True se a transcrição foi bem-sucedida, False caso contrário.
@@ -65,98 +69,180 @@ def transcribe_audio(audio_path, base_name):
     
     logger.info(f"Formato detectado: {file_ext}")
     
+    sampler = None
+    transcriber = None
     try:
         # Determinar dispositivo (GPU ou CPU)
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        transcriber = WhisperTranscriber(model_size)
+        device = transcriber.device
         
         # Log de informações do dispositivo
+        logger.info(f"Carregando modelo Whisper (device: {device})...")
         if device == "cuda":
-            logger.info(f"Carregando modelo Whisper (device: {device})...")
+            import torch
             logger.info(f"GPU disponível: {torch.cuda.get_device_name(0)}")
             logger.info(f"Memória total da GPU: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.2f} GB")
             torch.cuda.empty_cache()
-        else:
-            logger.info(f"Carregando modelo Whisper (device: {device})...")
             
         # Carregar modelo Whisper
-        model_size = DEFAULT_WHISPER_MODEL
+        model_size = transcriber.model_size
         logger.info(f"Carregando modelo tamanho: {model_size}")
-        model = whisper.load_model(model_size, device=device)
-        logger.info("Modelo carregado. Iniciando transcrição...")
+        compute_type = transcriber.compute_type
+        profile_name, profile = get_decoding_profile(profile)
+        # Sem timestamps de palavras, o modelo pula o alinhamento por atenção cruzada de cada segmento
+        profile["word_timestamps"] = not SEGMENT_TIMESTAMPS_ONLY if word_timestamps is None else word_timestamps
+        params = {"backend": transcriber.name, "model_size": model_size, "compute_type": compute_type,
+                  "language": LANGUAGE, "profile": profile_name, **profile}
+        cascade_model = CASCADE_MODEL if cascade_model is None else cascade_model
+        if cascade_model:
+            params["cascade_model"] = cascade_model
+        hallucination_guard = HALLUCINATION_GUARD_ENABLED if hallucination_guard is None else hallucination_guard
+        if hallucination_guard:
+            params["hallucination_guard"] = True
         
-        # Configurar monitoramento de GPU se disponível
-        if device == "cuda":
-            def gpu_monitor():
-                while not stop_monitor[0]:
-                    mem = torch.cuda.memory_allocated(0) / 1024**2
-                    logger.debug(f"[GPU] Memória alocada: {mem:.2f} MB")
-                    time.sleep(1)
-            
-            import threading
-            stop_monitor = [False]
-            monitor_thread = threading.Thread(target=gpu_monitor)
-            monitor_thread.start()
+        # Reaproveitar transcrição do mesmo áudio com os mesmos parâmetros
+        cached = transcription_cache.get(audio_path, params, base_name)
+        if cached is not None:
+            if stats is not None:
+                stats.update({"cache_hit": True, "saved_seconds": cached.get("compute_seconds", 0.0)})
+            return True
+        
+        # Amostrar uso de recursos (RSS, CPU, disco e GPU) do carregamento do modelo até a gravação
+        sampler = ResourceSampler("transcription").start()
+        # Carregamento do modelo (warm-up) medido à parte do tempo de transcrição
+        load_start = time.time()
+        transcriber.load()
+        warmup_seconds = time.time() - load_start
+        logger.info(f"Modelo carregado em {warmup_seconds:.1f}s. Iniciando transcrição...")
             
         # Realizar transcrição
+        start_time = time.time()
         with tqdm(total=1, desc="Transcrevendo", bar_format='{l_bar}{bar}| {elapsed} {postfix}') as pbar:
-            result = model.transcribe(
-                audio_path,
-                language=LANGUAGE,
-                fp16=True if device == "cuda" else False,
-                best_of=5,
-                beam_size=5,
-                word_timestamps=True
-            )
-            pbar.update(1)
+            # Cópia na escrita: o Whisper converte o array em tensor, o que exige um buffer gravável
+            audio = cached_audio_input(audio_path, mode='c')
+            total_seconds = probe_duration(audio_path) if isinstance(audio, str) else len(audio) / transcriber.sample_rate
+            # Áudios longos: decodificação e transcrição em janelas (memória independente da duração)
+            streaming = should_stream(total_seconds)
+            if streaming:
+                logger.info(f"Áudio de {total_seconds / 3600:.1f} h: transcrição em janelas de {STREAMING_WINDOW_SECONDS}s")
+                segments = transcribe_windows(transcriber, audio, **decode_options(profile))
+                info = SimpleNamespace(duration=total_seconds, text=None)
+            else:
+                segments, info = transcriber.transcribe(audio, **decode_options(profile))
             
-        # Finalizar monitoramento da GPU
-        if device == "cuda":
-            stop_monitor[0] = True
-            monitor_thread.join()
-            logger.debug("Monitoramento de GPU finalizado")
+            # Decodificado no máximo uma vez: re-decodificador e cascata compartilham o array
+            decoded = {}
             
-        # Criar diretório de saída se não existir
-        os.makedirs(WORDS_DIR, exist_ok=True)
+            def load_full_audio():
+                if not isinstance(audio, str):
+                    return audio
+                if "audio" not in decoded:
+                    if streaming:
+                        decoded["audio"] = LazyAudio(audio_path)
+                    else:
+                        import whisper
+                        decoded["audio"] = whisper.load_audio(audio_path)
+                return decoded["audio"]
+            
+            guard = None
+            if hallucination_guard:
+                # O Whisper original decodifica o áudio inteiro de uma vez: os laços são apenas descartados
+                guard = HallucinationGuard(check_quality=not profile["fallback"])
+                segments = guard.process(segments)
+            redecoder = None
+            if profile["fallback"]:
+                # Perfis rápidos: re-decodifica com busca em feixe apenas os segmentos de baixa confiança
+                redecoder = SegmentRedecoder(transcriber, load_full_audio, word_timestamps=profile["word_timestamps"])
+                segments = redecoder.process(segments)
+            cascade = None
+            if cascade_model:
+                # Cascata: regiões de baixa confiança são re-transcritas pelo modelo maior
+                cascade = CascadeRedecoder(transcriber, load_full_audio, cascade_model,
+                                           word_timestamps=profile["word_timestamps"])
+                segments = cascade.process(segments)
+            if streaming:
+                # Áudios longos: cada segmento é gravado assim que decodificado, sem acumular a transcrição
+                with StreamingTranscriptWriter(base_name, WORDS_DIR) as writer:
+                    for seg_dict in segments:
+                        writer.write_segment(seg_dict)
+                    output_txt, output_json = writer.finalize()
+            else:
+                segments = list(segments)
+            pbar.update(1)
+        elapsed = time.time() - start_time
+        audio_seconds = info.duration
+        logger.info(f"Áudio de {audio_seconds:.1f}s transcrito em {elapsed:.1f}s")
+        if stats is not None:
+            stats.update({"audio_seconds": audio_seconds, "wall_seconds": elapsed, "warmup_seconds": warmup_seconds,
+                          "profile": profile_name})
+        if guard is not None and guard.regions:
+            guard_stats = guard.stats(audio_seconds)
+            logger.warning(f"Laços de alucinação: {guard_stats['hallucination_regions']} região(ões), "
+                           f"{guard_stats['hallucination_segments']} segmentos descartados")
+            if stats is not None:
+                stats.update(guard_stats)
+        if redecoder is not None:
+            redecode_stats = redecoder.stats(audio_seconds)
+            logger.info(f"Re-decodificados {redecode_stats['redecoded_segments']}/{redecoder.segments} segmentos "
+                        f"({redecode_stats['redecoded_fraction']:.1%} do áudio)")
+            if stats is not None:
+                stats.update(redecode_stats)
+        if cascade is not None:
+            cascade_stats = cascade.stats(audio_seconds)
+            logger.info(f"Cascata: {cascade_stats['cascade_segments']}/{cascade.segments} segmentos enviados ao "
+                        f"modelo {cascade_model} ({cascade_stats['cascade_fraction']:.1%} do áudio)")
+            if stats is not None:
+                stats.update(cascade_stats)
+            
+        # Em janelas, os arquivos já foram gerados pelo escritor em streaming
+        if not streaming:
+            # Criar diretório de saída se não existir
+            os.makedirs(WORDS_DIR, exist_ok=True)
         
-        # Salvar resultado da transcrição em formato texto
-        output_txt = os.path.join(WORDS_DIR, f"{base_name}.txt")
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            f.write(result["text"])
+            # Salvar resultado da transcrição em formato texto
+            output_txt = os.path.join(WORDS_DIR, f"{base_name}.txt")
+            # Com segmentos substituídos, o texto é remontado a partir deles
+            replaced = (redecoder is not None or cascade is not None or
+                        (guard is not None and guard.regions))
+            text = info.text if not replaced else "".join(seg["text"] for seg in segments)
+            with open(output_txt, 'w', encoding='utf-8') as f:
+                f.write(text)
             
-        # Salvar segmentos com timestamps em formato JSON
-        output_json = os.path.join(WORDS_DIR, f"{base_name}.json")
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(result.get("segments", []), f, ensure_ascii=False, indent=2)
+            # Salvar segmentos com timestamps em formato JSON e/ou colunar
+            output_json = os.path.join(WORDS_DIR, f"{base_name}.json")
+            if WORDS_JSON_ENABLED:
+                with open(output_json, 'w', encoding='utf-8') as f:
+                    json.dump(segments, f, ensure_ascii=False, indent=2)
+            if WORD_STORE_ENABLED:
+                store_path = write_word_store(segments, word_store_path(base_name, WORDS_DIR))
+                if not WORDS_JSON_ENABLED:
+                    output_json = store_path
+        
+        transcription_cache.put(audio_path, params, base_name, elapsed)
+        
+        # Finalizar amostragem de recursos
+        sampler.stop()
+        resources = sampler.summary(include_samples=False)
+        logger.info(f"Recursos da transcrição: {format_peaks(resources)}")
+        if stats is not None:
+            stats["resources"] = resources
             
         logger.info(f"Transcrição salva em {output_txt} e segmentos em {output_json}")
         return True
         
     except Exception as e:
+        if sampler is not None:
+            sampler.stop()
         logger.error(f"Erro ao transcrever {audio_path}: {str(e)}")
         logger.debug(traceback.format_exc())
         return False
+    finally:
+        if transcriber is not None:
+            # O modelo continua no cache do processo, mas deixa de contar como em uso
+            transcriber.release()
 
-def find_audio_file(video_id, audio_dir):
-    """
-    Encontra o arquivo de áudio correspondente a um video_id, suportando múltiplos formatos.
-    
-    Args:
-        video_id (str): ID do vídeo para procurar
-        audio_dir (str): Diretório onde procurar os arquivos
-        
-    Returns:
-        str or None: Caminho do arquivo encontrado ou None se não encontrado
-    """
-    from src.config import SUPPORTED_AUDIO_FORMATS
-    
-    for ext in SUPPORTED_AUDIO_FORMATS:
-        potential_file = os.path.join(audio_dir, f"{video_id}{ext}")
-        if os.path.exists(potential_file):
-            return potential_file
-    
-    return None
-
-def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
+def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None, model_size=None, stats=None, use_daemon=True,
+                                 **options):
     """
     Transcreve um arquivo de áudio baseado no video_id, procurando por diferentes formatos.
     
@@ -164,6 +250,12 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
         video_id (str): ID do vídeo para transcrever
         audio_dir (str): Diretório dos arquivos de áudio (padrão: AUDIO_DIR do config)
         output_dir (str): Diretório de saída (padrão: WORDS_DIR do config)
+        model_size (str, optional): Tamanho do modelo a ser usado
+        stats (dict, optional): Dicionário preenchido com duração do áudio e tempo de transcrição
+        use_daemon (bool): Se True e o daemon de transcrição estiver em execução, a transcrição
+                           é feita por ele (modelo já carregado); caso contrário, neste processo
+        **options: profile (perfil de decodificação), cascade_model (modelo maior da cascata),
+                   word_timestamps e hallucination_guard; as opções exclusivas do Faster-Whisper são ignoradas
         
     Returns:
         bool: True se a transcrição foi bem-sucedida, False caso contrário
@@ -172,6 +264,21 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
     
     if audio_dir is None:
         audio_dir = str(AUDIO_DIR)
+    if use_daemon:
+        from src.transcription_daemon import transcribe_via_daemon
+        success = transcribe_via_daemon(WhisperTranscriber.name, video_id, audio_dir, stats=stats,
+                                        model_size=model_size, **options)
+        if success is not None:
+            return success
+    
+    profile = options.pop("profile", None)
+    cascade_model = options.pop("cascade_model", None)
+    word_timestamps = options.pop("word_timestamps", None)
+    hallucination_guard = options.pop("hallucination_guard", None)
+    ignored = [name for name, value in options.items() if value]
+    if ignored:
+        logger.warning(f"Opções não suportadas pelo Whisper original serão ignoradas: {', '.join(ignored)}")
+    
     if output_dir is None:
         output_dir = str(WORDS_DIR)
     
@@ -182,36 +289,42 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
         return False
     
     logger.info(f"Arquivo de áudio encontrado: {audio_file}")
-    return transcribe_audio(audio_file, video_id)
+    return transcribe_audio(audio_file, video_id, model_size=model_size, stats=stats, profile=profile,
+                            cascade_model=cascade_model, word_timestamps=word_timestamps,
+                            hallucination_guard=hallucination_guard)
 
-def main():
+def main(audio_dir="audios", model_size=None):
     """
     Função principal para processamento em lote de arquivos de áudio.
+    O mesmo modelo carregado é reutilizado para todos os arquivos.
+    
+    Args:
+        audio_dir (str): Diretório contendo os arquivos de áudio.
+        model_size (str, optional): Tamanho do modelo a ser usado.
     """
     try:
         # Garantir que diretórios existem
         os.makedirs(WORDS_DIR, exist_ok=True)
         
-        # Configurar diretório de áudio
-        audio_dir = "audios"
-        
         # Listar arquivos de áudio
         audio_files = read_audio_files(audio_dir)
         if not audio_files:
-            logger.warning("Nenhum arquivo de áudio encontrado em 'audios'.")
+            logger.warning(f"Nenhum arquivo de áudio encontrado em '{audio_dir}'.")
             return
             
         logger.info(f"Encontrados {len(audio_files)} arquivos de áudio para transcrever.")
         
-        # Processar cada arquivo
+        # Processar cada arquivo, decodificando os próximos áudios em segundo plano
         successful = 0
-        for idx, audio_file in enumerate(audio_files, 1):
-            logger.info(f"[{idx}/{len(audio_files)}] Processando: {audio_file}")
-            audio_path = os.path.join(audio_dir, audio_file)
-            base_name = os.path.splitext(audio_file)[0]
-            
-            if transcribe_audio(audio_path, base_name):
-                successful += 1
+        with AudioPrefetcher() as prefetcher:
+            prefetcher.prefetch([os.path.join(audio_dir, audio_file) for audio_file in audio_files])
+            for idx, audio_file in enumerate(audio_files, 1):
+                logger.info(f"[{idx}/{len(audio_files)}] Processando: {audio_file}")
+                audio_path = os.path.join(audio_dir, audio_file)
+                base_name = os.path.splitext(audio_file)[0]
+                
+                if transcribe_audio(audio_path, base_name, model_size=model_size):
+                    successful += 1
                 
         logger.info(f"Processo de transcrição finalizado. {successful}/{len(audio_files)} arquivos transcritos com sucesso.")
         
@@ -234,4 +347,4 @@ if __name__ == "__main__":
     # Atualizar configurações conforme argumentos
     WORDS_DIR = args.output_dir
 
-    main()
+    main(audio_dir=args.audio_dir, model_size=args.model)
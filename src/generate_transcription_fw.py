@@ -5,45 +5,79 @@ com suporte a timestamps de palavras, usando uma implementação mais rápida do
 """
 import os
 import time
-import json
 from tqdm import tqdm
 import traceback
-from faster_whisper import WhisperModel
+from types import SimpleNamespace
 from src.utils.logger import setup_logger
-from src.config import WORDS_DIR, DEFAULT_FASTER_WHISPER_MODEL, LANGUAGE
+from src.utils.audio_files import read_audio_files, find_audio_file
+from src.backends.faster_whisper_backend import FasterWhisperTranscriber
+from src.transcript_writer import StreamingTranscriptWriter, load_checkpoint
+from src.decoding_profiles import get_decoding_profile, decode_options, SegmentRedecoder, CascadeRedecoder
+from src.transcription_cache import transcription_cache
+from src.audio_cache import AudioPrefetcher, audio_input as cached_audio_input
+from src.utils.resource_sampler import ResourceSampler, format_peaks
+from src.autotune import apply_tuned_settings
+from src.hallucination_guard import HallucinationGuard
+from src.audio_stream import LazyAudio, should_stream, transcribe_windows
+from src.scheduler import probe_duration
+from src.config import (
+    WORDS_DIR, DEFAULT_FASTER_WHISPER_MODEL, LANGUAGE, BATCH_SIZE,
+    VAD_FILTER, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS, PARALLEL_CHUNKS, DECODING_PROFILE, DECODING_PROFILES,
+    CASCADE_MODEL, HALLUCINATION_GUARD_ENABLED, STREAMING_WINDOW_SECONDS, SEGMENT_TIMESTAMPS_ONLY
+)
 
 # Configurar logger para este módulo
 logger = setup_logger(__name__)
 
-def read_audio_files(audio_dir):
+def save_transcription(base_name, segments_json):
     """
-    Lista todos os arquivos de áudio suportados em um diretório.
+    Salva o texto completo ({base_name}.txt) e os segmentos ({base_name}.json) em WORDS_DIR.
     
     Args:
-        audio_dir (str): Caminho do diretório contendo os arquivos de áudio.
+        base_name (str): Nome base para os arquivos de saída.
+        segments_json (list): Segmentos no formato de segment_to_dict.
         
     Returns:
-        list: Lista de nomes de arquivos de áudio no diretório.
+        tuple: Caminhos (output_txt, output_json) dos arquivos salvos.
     """
-    try:
-        from src.config import SUPPORTED_AUDIO_FORMATS
-        supported_files = []
-        for f in os.listdir(audio_dir):
-            if any(f.lower().endswith(ext) for ext in SUPPORTED_AUDIO_FORMATS):
-                supported_files.append(f)
-        return supported_files
-    except Exception as e:
-        logger.error(f"Erro ao listar arquivos de áudio em {audio_dir}: {e}")
-        return []
+    writer = StreamingTranscriptWriter(base_name, WORDS_DIR)
+    for seg_dict in segments_json:
+        writer.write_segment(seg_dict)
+    return writer.finalize()
 
-def transcribe_audio(audio_path, base_name):
+def transcribe_audio(audio_path, base_name, model_size=None, batch_size=None, stats=None,
+                     device=None, cpu_threads=None, num_workers=None, vad_filter=None, resume=False, profile=None,
+                     cascade_model=None, word_timestamps=None, hallucination_guard=None):
     """
     Transcreve um arquivo de áudio usando o modelo Faster-Whisper.
     Suporta múltiplos formatos: WAV, MP4, M4A, MP3, AAC.
+    O modelo é obtido do cache do processo e carregado apenas uma vez.
     
     Args:
         audio_path (str): Caminho para o arquivo de áudio a ser transcrito.
         base_name (str): Nome base para os arquivos de saída.
+        model_size (str, optional): Tamanho do modelo (padrão: DEFAULT_FASTER_WHISPER_MODEL).
+        batch_size (int, optional): Se maior que 1, usa o pipeline em lote do Faster-Whisper,
+                                    decodificando vários trechos do áudio em uma única passada
+                                    (padrão: BATCH_SIZE do config).
+        stats (dict, optional): Dicionário preenchido com duração do áudio e tempo de transcrição.
+        device (str, optional): Força o dispositivo ("cuda" ou "cpu"); detectado automaticamente se None.
+        cpu_threads (int, optional): Número de threads de CPU usadas pelo modelo.
+        num_workers (int, optional): Número de workers internos do modelo (transcrições simultâneas).
+        vad_filter (bool, optional): Se True, remove silêncios com o VAD Silero antes da decodificação;
+                                     os timestamps continuam na linha do tempo original
+                                     (padrão: VAD_FILTER do config).
+        resume (bool): Se True e houver checkpoint compatível, retoma a transcrição a partir
+                       do último segmento concluído.
+        profile (str, optional): Perfil de decodificação (fast, balanced ou accurate); nos perfis
+                                 com fallback, segmentos de baixa confiança são re-decodificados
+                                 com busca em feixe (padrão: DECODING_PROFILE do config).
+        cascade_model (str, optional): Modelo maior que re-transcreve as regiões de baixa confiança
+                                       (padrão: CASCADE_MODEL do config; vazio desativa).
+        word_timestamps (bool, optional): Se False, transcreve só com timestamps de segmento, sem o
+                                          alinhamento de palavras (padrão: not SEGMENT_TIMESTAMPS_ONLY).
+        hallucination_guard (bool, optional): Se True, detecta laços de alucinação e retoma a
+                                              decodificação adiante (padrão: HALLUCINATION_GUARD_ENABLED).
         
     Returns:
         bool: True se a transcrição foi bem-sucedida, False caso contrário.
@@ -64,131 +98,229 @@ def transcribe_audio(audio_path, base_name):
     
     logger.info(f"Formato detectado: {file_ext}")
     
+    sampler = None
+    transcriber = None
     try:
-        # Detectar GPU
-        import torch
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        transcriber = FasterWhisperTranscriber(model_size, device)
+        device = transcriber.device
+        # compute_type/threads calibrados para este host (python -m src.autotune)
+        apply_tuned_settings(transcriber)
         
         # Log de informações do dispositivo
+        logger.info(f"Carregando modelo Faster-Whisper (device: {device})...")
         if device == "cuda":
-            logger.info(f"Carregando modelo Faster-Whisper (device: {device})...")
+            import torch
             logger.info(f"GPU disponível: {torch.cuda.get_device_name(0)}")
             logger.info(f"Memória total da GPU: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.2f} GB")
             torch.cuda.empty_cache()
-        else:
-            logger.info(f"Carregando modelo Faster-Whisper (device: {device})...")
             
         # Definir tamanho do modelo e tipo de computação
-        model_size = DEFAULT_FASTER_WHISPER_MODEL
-        compute_type = "float16" if device == "cuda" else "int8"
-        
-        logger.info(f"Carregando modelo tamanho: {model_size}, compute_type: {compute_type}")
-        model = WhisperModel(model_size, device=device, compute_type=compute_type)
-        logger.info("Modelo carregado. Iniciando transcrição...")
-        
-        # Configurar monitoramento de GPU se disponível
-        if device == "cuda":
-            def gpu_monitor():
-                while not stop_monitor[0]:
-                    mem = torch.cuda.memory_allocated(0) / 1024**2
-                    logger.debug(f"[GPU] Memória alocada: {mem:.2f} MB")
-                    time.sleep(1)
-            
-            import threading
-            stop_monitor = [False]
-            monitor_thread = threading.Thread(target=gpu_monitor)
-            monitor_thread.start()
-        
-        # Realizar transcrição
-        with tqdm(total=1, desc="Transcrevendo", bar_format='{l_bar}{bar}| {elapsed} {postfix}') as pbar:
-            result = model.transcribe(
-                audio_path,
-                language=LANGUAGE,
-                beam_size=5,
-                best_of=5,
-                word_timestamps=True
-            )
-            # Desempacotar o gerador em segmentos
-            segments, info = result
-            segments = list(segments)  # Força execução do gerador para lista
-            pbar.update(1)
-        
-        # Finalizar monitoramento da GPU
-        if device == "cuda":
-            stop_monitor[0] = True
-            monitor_thread.join()
-            logger.debug("Monitoramento de GPU finalizado")
+        model_size = transcriber.model_size
+        compute_type = transcriber.compute_type
+        batch_size = BATCH_SIZE if batch_size is None else batch_size
+        vad_filter = VAD_FILTER if vad_filter is None else vad_filter
+        profile_name, profile = get_decoding_profile(profile)
+        # Sem timestamps de palavras, o modelo pula o alinhamento por atenção cruzada de cada segmento
+        profile["word_timestamps"] = not SEGMENT_TIMESTAMPS_ONLY if word_timestamps is None else word_timestamps
+        params = {"backend": transcriber.name, "model_size": model_size, "compute_type": compute_type,
+                  "language": LANGUAGE, "profile": profile_name, **profile,
+                  "batch_size": batch_size, "vad_filter": vad_filter}
+        cascade_model = CASCADE_MODEL if cascade_model is None else cascade_model
+        if cascade_model:
+            params["cascade_model"] = cascade_model
+        hallucination_guard = HALLUCINATION_GUARD_ENABLED if hallucination_guard is None else hallucination_guard
+        if hallucination_guard:
+            params["hallucination_guard"] = True
         
-        # Concatenar texto dos segmentos
-        text = " ".join(seg.text for seg in segments)
+        # Reaproveitar transcrição do mesmo áudio com os mesmos parâmetros
+        cached = transcription_cache.get(audio_path, params, base_name)
+        if cached is not None:
+            if stats is not None:
+                stats.update({"cache_hit": True, "saved_seconds": cached.get("compute_seconds", 0.0)})
+            return True
         
-        # Criar diretório de saída se não existir
-        os.makedirs(WORDS_DIR, exist_ok=True)
+        if cpu_threads:
+            transcriber.load_options["cpu_threads"] = cpu_threads
+        if num_workers:
+            transcriber.load_options["num_workers"] = num_workers
         
-        # Salvar texto completo
-        output_txt = os.path.join(WORDS_DIR, f"{base_name}.txt")
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            f.write(text)
+        # Amostrar uso de recursos (RSS, CPU, disco e GPU) do carregamento do modelo até a gravação
+        sampler = ResourceSampler("transcription").start()
+        logger.info(f"Carregando modelo tamanho: {model_size}, compute_type: {compute_type}")
+        # Carregamento do modelo (warm-up) medido à parte do tempo de transcrição
+        load_start = time.time()
+        transcriber.load()
+        warmup_seconds = time.time() - load_start
+        logger.info(f"Modelo carregado em {warmup_seconds:.1f}s. Iniciando transcrição...")
         
-        # Preparar dados de segmentos para JSON
-        output_json = os.path.join(WORDS_DIR, f"{base_name}.json")
-        segments_json = []
+        # Realizar transcrição
+        vad_parameters = {"min_silence_duration_ms": VAD_MIN_SILENCE_MS, "speech_pad_ms": VAD_SPEECH_PAD_MS}
+        checkpoint = load_checkpoint(base_name) if resume else None
+        if checkpoint and checkpoint.get("params") != params:
+            logger.warning(f"Checkpoint de {base_name} gerado com outros parâmetros; reiniciando a transcrição")
+            checkpoint = None
         
-        for seg in segments:
-            # Criar dicionário para cada segmento
-            seg_dict = {
-                "id": getattr(seg, "id", None),
-                "start": seg.start,
-                "end": seg.end,
-                "text": seg.text,
-            }
+        start_time = time.time()
+        with StreamingTranscriptWriter(base_name, resume=checkpoint is not None, params=params) as writer:
+            logger.info(f"Segmentos parciais sendo gravados em {writer.partial_path}")
             
-            # Adicionar informações de palavras se disponíveis
-            if hasattr(seg, "words") and seg.words:
-                seg_dict["words"] = [
-                    {
-                        "word": w.word,
-                        "start": w.start,
-                        "end": w.end,
-                        "probability": getattr(w, "probability", None)
-                    } for w in seg.words
-                ]
-                
-            segments_json.append(seg_dict)
+            # Na retomada, decodifica apenas o áudio após o último segmento concluído
+            offset = writer.last_end
+            sampling_rate = transcriber.sample_rate
+            full_audio = cached_audio_input(audio_path)
+            total_seconds = (probe_duration(audio_path) if isinstance(full_audio, str)
+                             else len(full_audio) / sampling_rate)
+            # Áudios longos: decodificação e transcrição em janelas (memória independente da duração)
+            streaming = should_stream(total_seconds)
+            
+            # Decodificado no máximo uma vez: retomada, guarda, re-decodificador e cascata compartilham o array
+            decoded = {}
+            
+            def load_full_audio():
+                if not isinstance(full_audio, str):
+                    return full_audio
+                if "audio" not in decoded:
+                    if streaming:
+                        decoded["audio"] = LazyAudio(audio_path)
+                    else:
+                        from faster_whisper.audio import decode_audio
+                        decoded["audio"] = decode_audio(audio_path, sampling_rate=sampling_rate)
+                return decoded["audio"]
+            
+            def decode_from(start):
+                options = dict(batch_size=batch_size, vad_filter=vad_filter, vad_parameters=vad_parameters,
+                               **decode_options(profile))
+                if streaming:
+                    return transcribe_windows(transcriber, full_audio, start=start, **options)
+                return transcriber.transcribe(load_full_audio()[int(start * sampling_rate):], offset=start, **options)[0]
+            
+            audio_input = full_audio
+            if offset > 0:
+                logger.info(f"Retomando transcrição a partir de {offset:.1f}s")
+                if not streaming:
+                    audio_input = load_full_audio()[int(offset * sampling_rate):]
+                    total_seconds = offset + len(audio_input) / sampling_rate
+            
+            if offset > 0 and total_seconds - offset < 1:
+                # Todo o áudio já havia sido transcrito antes da interrupção
+                segments, info = iter([]), SimpleNamespace(duration=max(0.0, total_seconds - offset))
+            elif streaming:
+                logger.info(f"Áudio de {total_seconds / 3600:.1f} h: transcrição em janelas de {STREAMING_WINDOW_SECONDS}s")
+                segments, info = decode_from(offset), SimpleNamespace(duration=total_seconds - offset)
+            else:
+                if batch_size and batch_size > 1:
+                    logger.info(f"Transcrição em lote ativada (batch_size: {batch_size})")
+                # Os segmentos são um gerador: cada um é gravado assim que decodificado
+                segments, info = transcriber.transcribe(audio_input, offset=offset, batch_size=batch_size,
+                                                        vad_filter=vad_filter, vad_parameters=vad_parameters,
+                                                        **decode_options(profile))
+            
+            # Laços de alucinação (música/silêncio): interrompe a decodificação e retoma adiante
+            guard = None
+            if hallucination_guard:
+                guard = HallucinationGuard(decode_from, duration=offset + info.duration,
+                                           check_quality=not profile["fallback"])
+                segments = guard.process(segments, first_id=writer.segment_count + 1)
+            
+            # Perfis rápidos: re-decodifica com busca em feixe apenas os segmentos de baixa confiança
+            redecoder = None
+            if profile["fallback"]:
+                logger.info(f"Perfil de decodificação '{profile_name}' (beam_size: {profile['beam_size']}) "
+                            f"com re-decodificação de segmentos de baixa confiança")
+                redecoder = SegmentRedecoder(transcriber, load_full_audio, word_timestamps=profile["word_timestamps"])
+                segments = redecoder.process(segments, first_id=writer.segment_count + 1)
+            
+            # Cascata: regiões de baixa confiança são re-transcritas pelo modelo maior
+            cascade = None
+            if cascade_model:
+                logger.info(f"Cascata ativada: regiões de baixa confiança serão re-transcritas com {cascade_model}")
+                cascade = CascadeRedecoder(transcriber, load_full_audio, cascade_model,
+                                           word_timestamps=profile["word_timestamps"])
+                segments = cascade.process(segments, first_id=writer.segment_count + 1)
+            
+            with tqdm(total=round(offset + info.duration, 1), initial=round(offset, 1), unit="s", desc="Transcrevendo",
+                      bar_format='{l_bar}{bar}| {n:.0f}/{total:.0f}s [{elapsed}<{remaining}]') as pbar:
+                for seg_dict in segments:
+                    if offset > 0:
+                        # Na emenda, descarta palavras anteriores ao último segmento já gravado
+                        if "words" in seg_dict:
+                            words = [w for w in seg_dict["words"] if w["end"] > writer.last_end]
+                            if not words:
+                                continue
+                            if len(words) != len(seg_dict["words"]):
+                                seg_dict["text"] = "".join(w["word"] for w in words)
+                            seg_dict["words"] = words
+                            seg_dict["start"] = words[0]["start"]
+                        elif seg_dict["end"] <= writer.last_end:
+                            continue
+                        seg_dict["id"] = writer.segment_count + 1
+                    writer.write_segment(seg_dict)
+                    pbar.update(max(0.0, min(seg_dict["end"], pbar.total) - pbar.n))
+                pbar.update(pbar.total - pbar.n)
+            
+            elapsed = time.time() - start_time
+            throughput = info.duration / elapsed if elapsed > 0 else 0.0
+            logger.info(f"Áudio de {info.duration:.1f}s transcrito em {elapsed:.1f}s ({throughput:.2f} s de áudio/s)")
+            if stats is not None:
+                stats.update({"audio_seconds": info.duration, "wall_seconds": elapsed, "warmup_seconds": warmup_seconds,
+                              "profile": profile_name})
+            if guard is not None and guard.regions:
+                guard_stats = guard.stats(info.duration)
+                logger.warning(f"Laços de alucinação: {guard_stats['hallucination_regions']} região(ões), "
+                               f"{guard_stats['hallucination_segments']} segmentos descartados "
+                               f"({guard_stats['hallucination_seconds']:.1f}s pulados)")
+                if stats is not None:
+                    stats.update(guard_stats)
+            if redecoder is not None:
+                redecode_stats = redecoder.stats(info.duration)
+                logger.info(f"Re-decodificados {redecode_stats['redecoded_segments']}/{redecoder.segments} segmentos "
+                            f"({redecode_stats['redecoded_fraction']:.1%} do áudio)")
+                if stats is not None:
+                    stats.update(redecode_stats)
+            if cascade is not None:
+                cascade_stats = cascade.stats(info.duration)
+                logger.info(f"Cascata: {cascade_stats['cascade_segments']}/{cascade.segments} segmentos enviados ao "
+                            f"modelo {cascade_model} ({cascade_stats['cascade_fraction']:.1%} do áudio)")
+                if stats is not None:
+                    stats.update(cascade_stats)
+            
+            # Fração do áudio descartada pelo VAD
+            duration_after_vad = getattr(info, "duration_after_vad", None)
+            if duration_after_vad is not None and info.duration > 0 and duration_after_vad < info.duration:
+                skipped_fraction = 1 - duration_after_vad / info.duration
+                logger.info(f"VAD: {skipped_fraction:.1%} do áudio ignorado como silêncio "
+                            f"({info.duration - duration_after_vad:.1f}s de {info.duration:.1f}s)")
+                if stats is not None:
+                    stats["vad_skipped_fraction"] = skipped_fraction
+            
+            # Gerar texto completo e segmentos com timestamps a partir do arquivo parcial
+            output_txt, output_json = writer.finalize()
+        
+        transcription_cache.put(audio_path, params, base_name, time.time() - start_time)
         
-        # Salvar JSON de segmentos
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(segments_json, f, ensure_ascii=False, indent=2)
+        # Finalizar amostragem de recursos
+        sampler.stop()
+        resources = sampler.summary(include_samples=False)
+        logger.info(f"Recursos da transcrição: {format_peaks(resources)}")
+        if stats is not None:
+            stats["resources"] = resources
             
         logger.info(f"Transcrição salva em {output_txt} e segmentos em {output_json}")
         return True
         
     except Exception as e:
+        if sampler is not None:
+            sampler.stop()
         logger.error(f"Erro ao transcrever {audio_path}: {str(e)}")
         logger.debug(traceback.format_exc())
         return False
+    finally:
+        if transcriber is not None:
+            # O modelo continua no cache do processo, mas deixa de contar como em uso
+            transcriber.release()
 
-def find_audio_file(video_id, audio_dir):
-    """
-    Encontra o arquivo de áudio correspondente a um video_id, suportando múltiplos formatos.
-    
-    Args:
-        video_id (str): ID do vídeo para procurar
-        audio_dir (str): Diretório onde procurar os arquivos
-        
-    Returns:
-        str or None: Caminho do arquivo encontrado ou None se não encontrado
-    """
-    from src.config import SUPPORTED_AUDIO_FORMATS
-    
-    for ext in SUPPORTED_AUDIO_FORMATS:
-        potential_file = os.path.join(audio_dir, f"{video_id}{ext}")
-        if os.path.exists(potential_file):
-            return potential_file
-    
-    return None
-
-def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
+def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None, model_size=None, batch_size=None, stats=None,
+                                 parallel_chunks=None, use_daemon=True, **model_options):
     """
     Transcreve um arquivo de áudio baseado no video_id, procurando por diferentes formatos.
     
@@ -196,6 +328,15 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
         video_id (str): ID do vídeo para transcrever
         audio_dir (str): Diretório dos arquivos de áudio (padrão: AUDIO_DIR do config)
         output_dir (str): Diretório de saída (padrão: WORDS_DIR do config)
+        model_size (str, optional): Tamanho do modelo a ser usado
+        batch_size (int, optional): Tamanho do lote para transcrição em lote
+        stats (dict, optional): Dicionário preenchido com duração do áudio e tempo de transcrição
+        parallel_chunks (int, optional): Se maior que 1, divide áudios longos em trechos
+                                         transcritos simultaneamente
+        use_daemon (bool): Se True e o daemon de transcrição estiver em execução, a transcrição
+                           é feita por ele (modelo já carregado); caso contrário, neste processo
+        **model_options: Opções do modelo (device, cpu_threads, num_workers, vad_filter, profile,
+                         cascade_model, word_timestamps, hallucination_guard)
         
     Returns:
         bool: True se a transcrição foi bem-sucedida, False caso contrário
@@ -207,6 +348,14 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
     if output_dir is None:
         output_dir = str(WORDS_DIR)
     
+    if use_daemon:
+        from src.transcription_daemon import transcribe_via_daemon
+        success = transcribe_via_daemon(FasterWhisperTranscriber.name, video_id, audio_dir, stats=stats,
+                                        model_size=model_size, batch_size=batch_size,
+                                        parallel_chunks=parallel_chunks, **model_options)
+        if success is not None:
+            return success
+    
     # Encontra o arquivo de áudio
     audio_file = find_audio_file(video_id, audio_dir)
     if not audio_file:
@@ -214,38 +363,91 @@ def transcribe_audio_by_video_id(video_id, audio_dir=None, output_dir=None):
         return False
     
     logger.info(f"Arquivo de áudio encontrado: {audio_file}")
-    return transcribe_audio(audio_file, video_id)
+    if load_checkpoint(video_id) is not None:
+        logger.info(f"Checkpoint encontrado para {video_id}; a transcrição será retomada")
+        model_options["resume"] = True
+    parallel_chunks = PARALLEL_CHUNKS if parallel_chunks is None else parallel_chunks
+    if parallel_chunks and parallel_chunks > 1:
+        from src.chunked_transcription import transcribe_audio_chunked
+        # Lote, checkpoints e workers próprios não têm equivalente na transcrição em trechos
+        ignored = [name for name, value in (("batch_size", batch_size and batch_size > 1),
+                                            ("resume", model_options.get("resume")),
+                                            ("num_workers", model_options.get("num_workers"))) if value]
+        if ignored:
+            logger.warning(f"Opções não suportadas na transcrição em trechos serão ignoradas: {', '.join(ignored)}")
+        return transcribe_audio_chunked(audio_file, video_id, parallel_chunks, model_size=model_size, stats=stats,
+                                        device=model_options.get("device"), profile=model_options.get("profile"),
+                                        cascade_model=model_options.get("cascade_model"),
+                                        word_timestamps=model_options.get("word_timestamps"),
+                                        vad_filter=model_options.get("vad_filter"),
+                                        cpu_threads=model_options.get("cpu_threads"),
+                                        hallucination_guard=model_options.get("hallucination_guard"))
+    return transcribe_audio(audio_file, video_id, model_size=model_size, batch_size=batch_size, stats=stats,
+                            **model_options)
 
-def main():
+def main(audio_dir="audios", model_size=None, batch_size=None, workers=None, threads_per_worker=None, vad_filter=None,
+         profile=None, cascade_model=None, hallucination_guard=None):
     """
     Função principal para processamento em lote de arquivos de áudio.
+    O mesmo modelo carregado é reutilizado para todos os arquivos.
+    
+    Args:
+        audio_dir (str): Diretório contendo os arquivos de áudio.
+        model_size (str, optional): Tamanho do modelo a ser usado.
+        batch_size (int, optional): Tamanho do lote para transcrição em lote.
+        workers (int, optional): Se informado, distribui os arquivos em um pool de processos
+                                 na CPU (0 = tamanho automático).
+        threads_per_worker (int, optional): Threads de CPU por processo do pool.
+        vad_filter (bool, optional): Se True, remove silêncios com VAD antes da decodificação.
+        profile (str, optional): Perfil de decodificação (fast, balanced ou accurate).
+        cascade_model (str, optional): Modelo maior para as regiões de baixa confiança.
+        hallucination_guard (bool, optional): Se True, detecta e pula laços de alucinação.
     """
     try:
         # Garantir que diretórios existem
         os.makedirs(WORDS_DIR, exist_ok=True)
         
-        # Configurar diretório de áudio
-        audio_dir = "audios"
-        
         # Listar arquivos de áudio
         audio_files = read_audio_files(audio_dir)
         if not audio_files:
-            logger.warning("Nenhum arquivo de áudio encontrado em 'audios'.")
+            logger.warning(f"Nenhum arquivo de áudio encontrado em '{audio_dir}'.")
             return
             
         logger.info(f"Encontrados {len(audio_files)} arquivos de áudio para transcrever.")
         
-        # Processar cada arquivo
+        if workers is not None:
+            from src.worker_pool import TranscriptionWorkerPool
+            video_ids = [os.path.splitext(audio_file)[0] for audio_file in audio_files]
+            with TranscriptionWorkerPool(workers, threads_per_worker, audio_dir=audio_dir,
+                                         model_size=model_size, batch_size=batch_size,
+                                         vad_filter=vad_filter, profile=profile,
+                                         cascade_model=cascade_model,
+                                         hallucination_guard=hallucination_guard) as pool:
+                pool.transcribe(video_ids)
+            return
+        
+        # Processar cada arquivo, decodificando os próximos áudios em segundo plano
         successful = 0
-        for idx, audio_file in enumerate(audio_files, 1):
-            logger.info(f"[{idx}/{len(audio_files)}] Processando: {audio_file}")
-            audio_path = os.path.join(audio_dir, audio_file)
-            base_name = os.path.splitext(audio_file)[0]
-            
-            if transcribe_audio(audio_path, base_name):
-                successful += 1
+        audio_seconds = 0.0
+        batch_start = time.time()
+        with AudioPrefetcher() as prefetcher:
+            prefetcher.prefetch([os.path.join(audio_dir, audio_file) for audio_file in audio_files])
+            for idx, audio_file in enumerate(audio_files, 1):
+                logger.info(f"[{idx}/{len(audio_files)}] Processando: {audio_file}")
+                audio_path = os.path.join(audio_dir, audio_file)
+                base_name = os.path.splitext(audio_file)[0]
                 
+                stats = {}
+                if transcribe_audio(audio_path, base_name, model_size=model_size, batch_size=batch_size, stats=stats,
+                                    vad_filter=vad_filter, profile=profile, cascade_model=cascade_model,
+                                    hallucination_guard=hallucination_guard):
+                    successful += 1
+                    audio_seconds += stats.get("audio_seconds", 0.0)
+        
+        wall_seconds = time.time() - batch_start
         logger.info(f"Processo de transcrição finalizado. {successful}/{len(audio_files)} arquivos transcritos com sucesso.")
+        if wall_seconds > 0:
+            logger.info(f"Throughput: {audio_seconds / wall_seconds:.2f} s de áudio/s ({audio_seconds:.1f}s de áudio em {wall_seconds:.1f}s)")
         
     except Exception as e:
         logger.error(f"Erro durante o processamento principal: {e}")
@@ -261,8 +463,24 @@ if __name__ == "__main__":
                         help=f"Diretório para salvar as transcrições (padrão: {WORDS_DIR})")
     parser.add_argument("-m", "--model", default=DEFAULT_FASTER_WHISPER_MODEL, 
                         help=f"Tamanho do modelo Faster-Whisper (padrão: {DEFAULT_FASTER_WHISPER_MODEL})")
+    parser.add_argument("-b", "--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Tamanho do lote para transcrição em lote; 0 ou 1 desativa (padrão: {BATCH_SIZE})")
+    parser.add_argument("--vad", action="store_true", default=VAD_FILTER,
+                        help="Remove silêncios com VAD antes da decodificação")
+    parser.add_argument("-p", "--profile", choices=list(DECODING_PROFILES), default=DECODING_PROFILE,
+                        help=f"Perfil de decodificação: velocidade x precisão (padrão: {DECODING_PROFILE})")
+    parser.add_argument("--cascade-model", default=CASCADE_MODEL,
+                        help="Modelo maior (ex: large-v3) que re-transcreve só as regiões de baixa confiança")
+    parser.add_argument("--hallucination-guard", action="store_true", default=HALLUCINATION_GUARD_ENABLED,
+                        help="Detecta laços de alucinação (música/silêncio) e retoma a decodificação adiante")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Transcreve em um pool de N processos na CPU (0 = automático pelo número de núcleos)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Threads de CPU por processo do pool (padrão: derivado do número de núcleos)")
     args = parser.parse_args()
     
     WORDS_DIR = args.output_dir
 
-    main()
+    main(audio_dir=args.audio_dir, model_size=args.model, batch_size=args.batch_size,
+         workers=args.workers, threads_per_worker=args.threads_per_worker, vad_filter=args.vad,
+         profile=args.profile, cascade_model=args.cascade_model, hallucination_guard=args.hallucination_guard)
@@ -0,0 +1,192 @@
+"""
+Módulo de detecção de laços de alucinação.
+Em música ou silêncio o Whisper às vezes entra em laço, repetindo a mesma frase por minutos
+de áudio. O guarda acompanha os segmentos à medida que são decodificados e, ao encontrar uma
+sequência de segmentos repetitivos (n-gramas já vistos, compression_ratio alto ou fala
+improvável), descarta-os, registra a região no JSON de palavras e retoma a decodificação
+adiante do laço.
+"""
+import re
+from collections import deque
+from src.utils.logger import setup_logger
+from src.config import (
+    HALLUCINATION_MIN_SEGMENTS, HALLUCINATION_SKIP_SECONDS, HALLUCINATION_NGRAM, HALLUCINATION_REPEAT_RATIO,
+    FALLBACK_COMPRESSION_RATIO_THRESHOLD, FALLBACK_NO_SPEECH_THRESHOLD, FALLBACK_LOGPROB_THRESHOLD
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Segmentos recentes cujos n-gramas são comparados com o segmento atual
+RECENT_SEGMENTS = 8
+
+
+def _ngrams(text, n):
+    """n-gramas das palavras normalizadas; textos mais curtos que n formam um único n-grama."""
+    tokens = re.findall(r"\w+", text.lower())
+    if len(tokens) < n:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+
+
+class HallucinationGuard:
+    """Interrompe laços de repetição em uma transcrição em streaming e pula o trecho afetado."""
+
+    def __init__(self, restart=None, duration=None, min_segments=HALLUCINATION_MIN_SEGMENTS,
+                 skip_seconds=HALLUCINATION_SKIP_SECONDS, ngram=HALLUCINATION_NGRAM,
+                 repeat_ratio=HALLUCINATION_REPEAT_RATIO, check_quality=True):
+        """
+        Inicializa o guarda.
+
+        Args:
+            restart (callable, optional): Função que recebe um instante (s) e retorna os segmentos
+                                          decodificados a partir dele (timestamps absolutos). Sem ela,
+                                          o laço é descartado mas a decodificação não é interrompida.
+            duration (float, optional): Duração total do áudio; a decodificação não é retomada além dela.
+            min_segments (int): Segmentos suspeitos consecutivos que caracterizam um laço.
+            skip_seconds (float): Avanço (s) após o último segmento do laço antes de retomar.
+            ngram (int): Tamanho dos n-gramas usados na detecção de repetição.
+            repeat_ratio (float): Fração dos n-gramas de um segmento já vistos nos segmentos recentes
+                                  a partir da qual ele é considerado repetido.
+            check_quality (bool): Se False, só a repetição caracteriza um segmento suspeito; compression_ratio
+                                  e no_speech_prob ficam para a re-decodificação dos perfis com fallback.
+        """
+        self.restart = restart
+        self.duration = duration
+        self.min_segments = min_segments
+        self.skip_seconds = skip_seconds
+        self.ngram = ngram
+        self.repeat_ratio = repeat_ratio
+        self.check_quality = check_quality
+        self.segments = 0
+        self.dropped_segments = 0
+        self.regions = []
+        self._recent = deque(maxlen=RECENT_SEGMENTS)
+
+    def suspicion(self, seg_dict):
+        """
+        Indica por que um segmento parece parte de um laço de alucinação.
+
+        Args:
+            seg_dict (dict): Segmento com text e, se disponíveis, compression_ratio, no_speech_prob
+                             e avg_logprob.
+
+        Returns:
+            str or None: "repetition", "compression_ratio" ou "no_speech"; None se o segmento parece fala.
+        """
+        grams = _ngrams(seg_dict.get("text", ""), self.ngram)
+        seen = set().union(*self._recent)
+        self._recent.append(grams)
+        if grams and len(grams & seen) >= self.repeat_ratio * len(grams):
+            return "repetition"
+        if not self.check_quality:
+            return None
+        compression_ratio = seg_dict.get("compression_ratio")
+        if compression_ratio is not None and compression_ratio > FALLBACK_COMPRESSION_RATIO_THRESHOLD:
+            return "compression_ratio"
+        no_speech_prob = seg_dict.get("no_speech_prob")
+        avg_logprob = seg_dict.get("avg_logprob")
+        if (no_speech_prob is not None and no_speech_prob > FALLBACK_NO_SPEECH_THRESHOLD and
+                avg_logprob is not None and avg_logprob < FALLBACK_LOGPROB_THRESHOLD):
+            return "no_speech"
+        return None
+
+    def process(self, segments, first_id=1):
+        """
+        Percorre os segmentos, descartando os laços de alucinação.
+
+        Cada laço é substituído por um segmento sem texto que cobre a região pulada e traz a
+        chave "hallucination" (motivos, segmentos descartados e um exemplo do texto repetido).
+
+        Args:
+            segments (iterable): Segmentos no formato do JSON de palavras (timestamps absolutos).
+            first_id (int): Id atribuído ao primeiro segmento gerado.
+
+        Yields:
+            dict: Segmentos finais, com ids renumerados.
+        """
+        next_id = first_id
+        pending = []
+        region = None
+        while segments is not None:
+            source, segments = segments, None
+            for seg_dict in source:
+                self.segments += 1
+                reason = self.suspicion(seg_dict)
+                if reason is None:
+                    output = [seg for seg, _ in pending] + [seg_dict]
+                    if region is not None:
+                        output.insert(0, self._marker(region))
+                        region = None
+                    pending = []
+                    for seg in output:
+                        seg["id"] = next_id
+                        next_id += 1
+                        yield seg
+                    continue
+
+                pending.append((seg_dict, reason))
+                # Também a continuação de um laço já aberto exige min_segments suspeitos seguidos:
+                # um único segmento duvidoso após a retomada não provoca outro salto
+                if len(pending) < self.min_segments:
+                    continue
+                # Laço detectado (ou continuação de um laço já aberto): descarta os suspeitos
+                if region is None:
+                    region = {"start": pending[0][0]["start"], "end": pending[0][0]["end"], "reasons": set(),
+                              "dropped_segments": 0, "sample": pending[0][0].get("text", "").strip()}
+                    logger.warning(f"Laço de alucinação detectado em {region['start']:.1f}s: \"{region['sample'][:60]}\"")
+                region["end"] = max(region["end"], pending[-1][0]["end"])
+                region["reasons"].update(r for _, r in pending)
+                region["dropped_segments"] += len(pending)
+                self.dropped_segments += len(pending)
+                pending = []
+                if self.restart is not None:
+                    resume_at = region["end"] + self.skip_seconds
+                    if self.duration is not None:
+                        resume_at = min(resume_at, self.duration)
+                    region["end"] = resume_at
+                    if hasattr(source, "close"):
+                        source.close()
+                    if self.duration is None or resume_at < self.duration:
+                        logger.info(f"Retomando a decodificação em {resume_at:.1f}s")
+                        segments = self.restart(resume_at)
+                    break
+
+        for seg in ([self._marker(region)] if region is not None else []) + [seg for seg, _ in pending]:
+            seg["id"] = next_id
+            next_id += 1
+            yield seg
+
+    def _marker(self, region):
+        """Segmento sem texto que marca uma região descartada no JSON de palavras."""
+        self.regions.append(region)
+        return {
+            "id": None,
+            "start": region["start"],
+            "end": region["end"],
+            "text": "",
+            "hallucination": {
+                "reasons": sorted(region["reasons"]),
+                "dropped_segments": region["dropped_segments"],
+                "sample": region["sample"][:200],
+            },
+        }
+
+    def stats(self, audio_seconds):
+        """
+        Retorna as estatísticas dos laços descartados.
+
+        Args:
+            audio_seconds (float): Duração total do áudio transcrito.
+
+        Returns:
+            dict: hallucination_regions, hallucination_segments (descartados), hallucination_seconds
+                  e hallucination_fraction (fração do áudio).
+        """
+        seconds = sum(region["end"] - region["start"] for region in self.regions)
+        return {
+            "hallucination_regions": len(self.regions),
+            "hallucination_segments": self.dropped_segments,
+            "hallucination_seconds": seconds,
+            "hallucination_fraction": min(1.0, seconds / audio_seconds) if audio_seconds > 0 else 0.0,
+        }
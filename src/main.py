@@ -3,6 +3,7 @@ import argparse
 import datetime
 import sys
 import json
+import time
 import asyncio
 from pathlib import Path
 
@@ -38,7 +39,27 @@ def format_timestamp(seconds):
     secs = int(seconds % 60)
     return f"{hours:02}:{minutes:02}:{secs:02}"
 
-def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlist_mode=False, video_id_filter=None, ignore_existing=False, use_whisper=False, ai_analysis=False, only_ai_analysis=False, ai_resume=False, target_person=None):
+def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlist_mode=False, video_id_filter=None, ignore_existing=False, use_whisper=False, ai_analysis=False, only_ai_analysis=False, ai_resume=False, target_person=None, transcription_options=None, run_report=None, workers=None, threads_per_worker=None, backend=None, speech_triage=None, triage_threshold=None, on_schedule=None, captions=None):
+    """
+    Executa o pipeline completo: download, transcrição, divisão em blocos e exportação para Excel.
+    
+    Args:
+        transcription_options (dict, optional): Opções repassadas a transcribe_audio_by_video_id
+                                                (ex: model_size, batch_size).
+        run_report (dict, optional): Dicionário preenchido com as métricas da execução.
+        workers (int, optional): Se informado, transcreve em um pool de processos na CPU (0 = automático).
+        threads_per_worker (int, optional): Threads de CPU por processo do pool.
+        backend (str, optional): Nome do backend de transcrição (padrão: DEFAULT_TRANSCRIPTION_BACKEND;
+                                 use_whisper=True equivale a "whisper").
+        speech_triage (bool, optional): Se True, pula os arquivos sem fala antes da transcrição
+                                        (padrão: SPEECH_TRIAGE_ENABLED do config).
+        triage_threshold (float, optional): Fração mínima de fala para transcrever um arquivo
+                                            (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config).
+        on_schedule (callable, optional): Chamada com a fila de transcrição planejada (ordem e ETA).
+        captions (bool, optional): Se True, usa a legenda do YouTube como transcrição quando houver uma
+                                   faixa aceitável, sem baixar o áudio (padrão: CAPTIONS_ENABLED do config).
+    """
+    transcription_options = {k: v for k, v in (transcription_options or {}).items() if v is not None}
     now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     name, ext = os.path.splitext(excel_name)
     excel_name = f"{name}_{now}{ext}"
@@ -77,26 +98,26 @@ def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlis
                         })
                     processed_videos.add(video_id)
         
-        # Para vídeos não processados, tenta usar os arquivos JSON da pasta words
+        # Para vídeos não processados, tenta usar os segmentos da pasta words (colunar ou JSON)
         if os.path.exists(words_dir):
-            for filename in os.listdir(words_dir):
-                if filename.endswith('.json'):
-                    video_id = filename.replace('.json', '')
+            for filename in sorted(os.listdir(words_dir)):
+                if filename.endswith('.json') or filename.endswith('.words.bin'):
+                    video_id = filename.replace('.words.bin', '').replace('.json', '')
                     if video_id_filter and video_id != video_id_filter:
                         continue
                     if video_id in processed_videos:
                         continue  # Já foi processado com split
                     
-                    segments_file = os.path.join(words_dir, filename)
-                    with open(segments_file, encoding="utf-8") as f:
-                        segments = json.load(f)
-                    
                     try:
-                        from src.split_transcription import split_transcription_json
+                        from src.split_transcription import split_transcription_json, load_block_audio
+                        from src.word_store import load_segments
                     except ImportError:
-                        from split_transcription import split_transcription_json
+                        from split_transcription import split_transcription_json, load_block_audio
+                        from word_store import load_segments
+                    segments = load_segments(video_id, words_dir)
                     
-                    blocks = split_transcription_json(segments)
+                    # Sem timestamps de palavras, as bordas dos blocos são ajustadas ao áudio
+                    blocks = split_transcription_json(segments, load_audio=lambda: load_block_audio(video_id, audio_dir))
                     for block in blocks:
                         start_formatted = format_timestamp(block['start'])
                         end_formatted = format_timestamp(block['end'])
@@ -134,25 +155,45 @@ def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlis
             print("Nenhum trecho gerado.")
         return
     try:
-        from src.download_audio import read_urls, download_audio
-        from src.config import is_local_file
-        if use_whisper:
-            from src.generate_transcription import transcribe_audio_by_video_id
-        else:
-            from src.generate_transcription_fw import transcribe_audio_by_video_id
+        from src.download_audio import read_urls, download_audio, fetch_captions, write_caption_transcript
+        from src.config import is_local_file, FINGERPRINT_DEDUP_ENABLED, SPEECH_TRIAGE_ENABLED, CAPTIONS_ENABLED
+        from src.audio_cache import AudioPrefetcher
+        from src.audio_fingerprint import find_duplicates, resolve_pending_duplicates, reuse_sections
+        from src.speech_triage import triage_queue, no_speech_outdated
+        from src.backends import get_backend
+        from src.utils.resource_sampler import StageSampler
     except ImportError:
-        from download_audio import read_urls, download_audio
-        from config import is_local_file
-        if use_whisper:
-            from generate_transcription import transcribe_audio_by_video_id
-        else:
-            from generate_transcription_fw import transcribe_audio_by_video_id
+        from download_audio import read_urls, download_audio, fetch_captions, write_caption_transcript
+        from config import is_local_file, FINGERPRINT_DEDUP_ENABLED, SPEECH_TRIAGE_ENABLED, CAPTIONS_ENABLED
+        from audio_cache import AudioPrefetcher
+        from audio_fingerprint import find_duplicates, resolve_pending_duplicates, reuse_sections
+        from speech_triage import triage_queue, no_speech_outdated
+        from backends import get_backend
+        from utils.resource_sampler import StageSampler
+    
+    # O backend (e suas dependências pesadas) só é importado quando a transcrição começa
+    backend_cls = get_backend("whisper" if use_whisper else backend)
     
     entries = read_urls("videos.txt")
     if not entries:
         print("Nenhuma entrada encontrada. Verifique videos.txt.")
         return
     
+    # Uso de recursos de cada etapa, gravado em run_report["resources"]
+    stage_sampler = StageSampler(run_report)
+    
+    # Etapa 1: download/cópia dos áudios e montagem da fila de transcrição.
+    # Cada áudio baixado já começa a ser decodificado em segundo plano para a transcrição.
+    stage_sampler.begin("download")
+    prefetcher = AudioPrefetcher()
+    video_ids = []
+    pending = []
+    sources = {}
+    # Origem da transcrição de cada vídeo processado: legenda do YouTube ou ASR
+    ingest = {}
+    captions = CAPTIONS_ENABLED if captions is None else captions
+    speech_triage = SPEECH_TRIAGE_ENABLED if speech_triage is None else speech_triage
+    words_dir = os.path.join(transcript_dir, "words")
     for entry in entries:
         video_id = extract_video_id(entry)
         if not video_id:
@@ -163,45 +204,115 @@ def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlis
         
         # Ajusta para buscar em transcripts/words
         transcription_file = os.path.join(transcript_dir, "words", f"{video_id}.txt")
-        segments_file = os.path.join(transcript_dir, "words", f"{video_id}.json")
+        transcribed = os.path.exists(transcription_file)
+        # A transcrição vazia de um arquivo sem fala só vale enquanto a triagem o pularia
+        if transcribed and no_speech_outdated(video_id, words_dir, speech_triage, triage_threshold):
+            print(f"Transcrição vazia (sem fala) de {video_id} refeita: triagem desativada ou limiar menor.")
+            transcribed = False
         
-        if os.path.exists(transcription_file) and ignore_existing:
+        if transcribed and ignore_existing:
             print(f"Transcrição já existe para {video_id}, ignorando download/transcrição.")
-        else:
-            if not os.path.exists(transcription_file):
-                print(f"Processando entrada: {entry}")
-                
-                # Determinar extensão baseada no tipo de entrada
-                if is_local_file(entry):
-                    # Para arquivos locais, mantém a extensão original
-                    source_ext = os.path.splitext(entry)[1]
-                    audio_file = os.path.join(audio_dir, f"{video_id}{source_ext}")
-                else:
-                    # Para URLs do YouTube, usa formato WAV
-                    audio_file = os.path.join(audio_dir, f"{video_id}.wav")
-                
-                # Download/cópia do arquivo
-                if download_audio(entry, audio_file, no_playlist=not playlist_mode):
-                    # Transcrever usando a função que detecta automaticamente o formato
-                    if not transcribe_audio_by_video_id(video_id, audio_dir):
-                        print(f"Falha na transcrição de {entry}. Continuando...")
-                        continue
-                else:
-                    print(f"Falha ao processar {entry}. Pulando transcrição.")
+        elif not transcribed:
+            print(f"Processando entrada: {entry}")
+            
+            # Com uma legenda aceitável, o vídeo não é baixado nem transcrito pelo modelo
+            if captions and not is_local_file(entry):
+                caption = fetch_captions(entry, no_playlist=not playlist_mode)
+                if caption is not None:
+                    write_caption_transcript(video_id, caption["segments"], words_dir)
+                    ingest[video_id] = {key: caption[key] for key in ("source", "kind", "language", "coverage")}
+                    ingest[video_id]["segments"] = len(caption["segments"])
+                    video_ids.append(video_id)
                     continue
+            
+            # Determinar extensão baseada no tipo de entrada
+            if is_local_file(entry):
+                # Para arquivos locais, mantém a extensão original
+                source_ext = os.path.splitext(entry)[1]
+                audio_file = os.path.join(audio_dir, f"{video_id}{source_ext}")
+            else:
+                # Para URLs do YouTube, usa formato WAV
+                audio_file = os.path.join(audio_dir, f"{video_id}.wav")
+            
+            # Download/cópia do arquivo
+            if not download_audio(entry, audio_file, no_playlist=not playlist_mode):
+                print(f"Falha ao processar {entry}. Pulando transcrição.")
+                continue
+            prefetcher.prefetch([audio_file])
+            pending.append(video_id)
+            sources[video_id] = entry
+            ingest[video_id] = {"source": "asr"}
+        video_ids.append(video_id)
+    
+    if captions:
+        report_sources(ingest, run_report)
+    
+    # Áudios quase idênticos a vídeos já transcritos (re-uploads, cópias locais) reaproveitam a transcrição
+    duplicates = None
+    if FINGERPRINT_DEDUP_ENABLED and pending:
+        stage_sampler.begin("dedupe")
+        pending, duplicates = find_duplicates(pending, audio_dir, words_dir)
+    
+    # Arquivos só de música ou silêncio recebem uma transcrição vazia sem passar pelo modelo
+    if speech_triage and pending:
+        stage_sampler.begin("triage")
+        pending, skipped = triage_queue(pending, audio_dir, words_dir, triage_threshold)
+        report_triage(skipped, run_report)
+    
+    # Etapa 2: transcrição da fila (sequencial ou em pool de processos)
+    stage_sampler.begin("transcription")
+    queue_report = run_report if run_report is not None else {}
+    failed = transcribe_queue(pending, audio_dir, backend_cls, transcription_options,
+                              workers=workers, threads_per_worker=threads_per_worker, run_report=queue_report,
+                              sources=sources, on_schedule=on_schedule)
+    prefetcher.close()
+    if duplicates is not None:
+        per_file = queue_report.get("transcription", {}).get("per_file", [])
+        compute_seconds = {r["video_id"]: r["wall_seconds"] for r in per_file if r["success"]}
+        failed |= resolve_pending_duplicates(duplicates, words_dir, failed, compute_seconds)
+        report_duplicates(duplicates, run_report)
+    
+    # Etapa 3: divisão em blocos
+    stage_sampler.begin("split")
+    sections_dir = os.path.join(transcript_dir, "sections")
+    # Duplicados reaproveitam os blocos da origem (divididos antes deles) e são marcados no Excel,
+    # para que a análise IA reaproveite a classificação da origem em vez de repeti-la
+    duplicate_sources = {match["video_id"]: match["duplicate_of"] for match in duplicates or [] if match["reused"]}
+    blocks_by_video = {}
+    for video_id in sorted(video_ids, key=lambda video_id: video_id in duplicate_sources):
+        if video_id in failed:
+            continue
+        video_blocks = blocks_by_video.setdefault(video_id, [])
+        source_id = duplicate_sources.get(video_id)
+        if source_id is not None and reuse_sections(source_id, video_id, sections_dir):
+            with open(os.path.join(sections_dir, f"{video_id}_split.json"), encoding="utf-8") as f:
+                blocks = json.load(f)
+            print(f"Blocos de {source_id} reaproveitados para {video_id} ({len(blocks)} blocos)")
+            for block in blocks:
+                start_formatted = format_timestamp(block['start'])
+                end_formatted = format_timestamp(block['end'])
+                video_blocks.append({"transcrição": block["text"], "timestamp": f"{start_formatted} - {end_formatted}",
+                                     "video_id": video_id, "duplicata_de": source_id})
+            continue
+        transcription_file = os.path.join(transcript_dir, "words", f"{video_id}.txt")
+        try:
+            from src.word_store import load_segments
+        except ImportError:
+            from word_store import load_segments
+        # Segmentos do arquivo colunar (mapeado em memória) ou, na falta dele, do JSON
+        segments = load_segments(video_id, os.path.join(transcript_dir, "words"))
         
         if not os.path.exists(transcription_file):
             print(f"Arquivo de transcrição não encontrado para {video_id}, pulando.")
             continue
-        # Preferencialmente faz split pelo JSON se existir
-        if os.path.exists(segments_file):
-            with open(segments_file, encoding="utf-8") as f:
-                segments = json.load(f)
+        # Preferencialmente faz split pelos segmentos com timestamps se existirem
+        if segments is not None:
             try:
-                from src.split_transcription import split_transcription_json
+                from src.split_transcription import split_transcription_json, load_block_audio
             except ImportError:
-                from split_transcription import split_transcription_json
-            blocks = split_transcription_json(segments)
+                from split_transcription import split_transcription_json, load_block_audio
+            # Sem timestamps de palavras, as bordas dos blocos são ajustadas ao áudio
+            blocks = split_transcription_json(segments, load_audio=lambda: load_block_audio(video_id, audio_dir))
             
             # Salvando os blocos divididos em transcripts/sections como o script original faz
             out_json_path = Path(os.path.join(transcript_dir, "sections", f"{video_id}_split.json"))
@@ -221,7 +332,7 @@ def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlis
             for block in blocks:
                 start_formatted = format_timestamp(block['start'])
                 end_formatted = format_timestamp(block['end'])
-                all_blocks.append({"transcrição": block["text"], "timestamp": f"{start_formatted} - {end_formatted}", "video_id": video_id})
+                video_blocks.append({"transcrição": block["text"], "timestamp": f"{start_formatted} - {end_formatted}", "video_id": video_id})
         else:
             with open(transcription_file, encoding="utf-8") as f:
                 text = f.read()
@@ -236,19 +347,263 @@ def process_all(audio_dir, transcript_dir, excel_name, only_excel=False, playlis
             print(f"Split concluído. {len(blocks)} blocos salvos em {out_txt_path}")
             
             for block in blocks:
-                all_blocks.append({"transcrição": block, "video_id": video_id})
+                video_blocks.append({"transcrição": block, "video_id": video_id})
+        if source_id is not None:
+            for block in video_blocks:
+                block["duplicata_de"] = source_id
+    # Excel na ordem da fila
+    for video_id in video_ids:
+        all_blocks.extend(blocks_by_video.get(video_id, []))
     
     if all_blocks:
+        stage_sampler.begin("excel")
         excel_path = save_blocks_to_excel(all_blocks, excel_name)
+        stage_sampler.end()
         
         # Se análise IA foi solicitada, processar o arquivo Excel gerado
         if ai_analysis and excel_path:
             print("Iniciando análise IA...")
             asyncio.run(process_ai_analysis(excel_path, target_person, ai_resume))
     else:
+        stage_sampler.end()
         print("Nenhum trecho gerado.")
 
 
+def transcribe_queue(video_ids, audio_dir, backend_cls, transcription_options,
+                     workers=None, threads_per_worker=None, run_report=None, sources=None, on_schedule=None):
+    """
+    Transcreve uma fila de vídeos, sequencialmente ou em um pool de processos na CPU,
+    e exibe o throughput (segundos de áudio por segundo de relógio).
+    Com SCHEDULE_LONGEST_FIRST, a fila é ordenada do vídeo mais longo para o mais curto
+    e a conclusão é estimada pelo RTF medido nas execuções anteriores.
+    
+    Args:
+        video_ids (list): IDs dos vídeos cujos áudios já estão em audio_dir.
+        audio_dir (str): Diretório dos arquivos de áudio.
+        backend_cls (type): Backend de transcrição (subclasse de Transcriber).
+        transcription_options (dict): Opções repassadas a transcribe_by_video_id do backend.
+        workers (int, optional): Número de processos do pool (None = sequencial, 0 = automático).
+        threads_per_worker (int, optional): Threads de CPU por processo do pool.
+        run_report (dict, optional): Relatório da execução a ser preenchido.
+        sources (dict, optional): Entrada de origem (arquivo ou URL) de cada video_id, usada para
+                                  medir a duração quando o áudio não pode ser lido.
+        on_schedule (callable, optional): Chamada com a fila planejada antes de a transcrição começar.
+        
+    Returns:
+        set: IDs dos vídeos cuja transcrição falhou.
+    """
+    if not video_ids:
+        return set()
+    try:
+        from src.config import SCHEDULE_LONGEST_FIRST
+        from src.scheduler import probe_durations, estimate_rtf, record_rtf, plan_schedule, log_schedule
+    except ImportError:
+        from config import SCHEDULE_LONGEST_FIRST
+        from scheduler import probe_durations, estimate_rtf, record_rtf, plan_schedule, log_schedule
+    
+    if workers is not None and not backend_cls.supports_worker_pool:
+        print(f"O pool de processos não é suportado pelo backend {backend_cls.name}. Transcrevendo sequencialmente.")
+        workers = None
+    
+    pool = None
+    if workers is not None:
+        try:
+            from src.worker_pool import TranscriptionWorkerPool
+        except ImportError:
+            from worker_pool import TranscriptionWorkerPool
+        pool = TranscriptionWorkerPool(workers, threads_per_worker, audio_dir=audio_dir, backend=backend_cls.name,
+                                       **transcription_options)
+    concurrency = pool.workers if pool is not None else 1
+    model_size = transcription_options.get("model_size") or backend_cls.default_model_size
+    
+    # Mais longos primeiro: um vídeo longo no fim da fila deixaria os demais processos ociosos
+    schedule = None
+    if SCHEDULE_LONGEST_FIRST:
+        rtf, rtf_source = estimate_rtf(backend_cls.name, model_size, concurrency)
+        schedule = plan_schedule(probe_durations(video_ids, audio_dir, sources), concurrency, rtf)
+        schedule["rtf_source"] = rtf_source
+        video_ids = schedule["order"]
+        log_schedule(schedule)
+        print(f"Fila de transcrição: {len(video_ids)} arquivo(s), do mais longo para o mais curto; conclusão estimada em {schedule['eta']}")
+        if on_schedule is not None:
+            on_schedule(schedule)
+    
+    start_time = time.time()
+    if pool is not None:
+        with pool:
+            results = pool.transcribe(video_ids)
+    else:
+        results = []
+        for video_id in video_ids:
+            file_start = time.time()
+            stats = {}
+            success = backend_cls.transcribe_by_video_id(video_id, audio_dir, stats=stats, **transcription_options)
+            results.append({
+                "video_id": video_id,
+                "success": bool(success),
+                # Carregamento do modelo (warm-up) informado à parte do tempo de transcrição
+                "elapsed": time.time() - file_start - stats.get("warmup_seconds", 0.0),
+                "warmup_seconds": stats.get("warmup_seconds", 0.0),
+                "audio_seconds": stats.get("audio_seconds", 0.0),
+                "wall_seconds": stats.get("wall_seconds", 0.0),
+                "cache_hit": stats.get("cache_hit", False),
+                "saved_seconds": stats.get("saved_seconds", 0.0),
+                "profile": stats.get("profile"),
+                "redecoded_fraction": stats.get("redecoded_fraction", 0.0),
+                "cascade_seconds": stats.get("cascade_seconds", 0.0),
+                "cascade_fraction": stats.get("cascade_fraction", 0.0),
+                "hallucination_seconds": stats.get("hallucination_seconds", 0.0),
+                "resources": stats.get("resources"),
+            })
+    wall_seconds = time.time() - start_time
+    record_rtf(backend_cls.name, model_size, concurrency, results)
+    if schedule is not None:
+        schedule["actual_seconds"] = round(wall_seconds, 1)
+        print(f"Tempo estimado: {schedule['estimated_seconds']:.0f}s, tempo real: {wall_seconds:.0f}s")
+    
+    failed = set()
+    for result in results:
+        if not result["success"]:
+            print(f"Falha na transcrição de {result['video_id']}. Continuando...")
+            failed.add(result["video_id"])
+    
+    transcribed = [r for r in results if r["success"]]
+    audio_seconds = sum(r["audio_seconds"] for r in transcribed)
+    throughput = audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+    print(f"Transcrição: {len(transcribed)}/{len(results)} arquivo(s), {audio_seconds:.1f}s de áudio em {wall_seconds:.1f}s ({throughput:.2f} s de áudio/s)")
+    for result in transcribed:
+        if result.get("redecoded_fraction"):
+            print(f"{result['video_id']}: {result['redecoded_fraction']:.1%} do áudio re-decodificado com busca em feixe (perfil {result['profile']})")
+    cascade_seconds = sum(r.get("cascade_seconds", 0.0) for r in transcribed)
+    cascade_fraction = cascade_seconds / audio_seconds if audio_seconds > 0 else 0.0
+    if cascade_seconds > 0:
+        print(f"Cascata: {cascade_fraction:.1%} do áudio ({cascade_seconds:.1f}s) re-transcrito com o modelo maior")
+    hallucination_seconds = sum(r.get("hallucination_seconds", 0.0) for r in transcribed)
+    if hallucination_seconds > 0:
+        print(f"Laços de alucinação: {hallucination_seconds:.1f}s de áudio pulados (marcados no JSON de palavras)")
+    warmup_seconds = sum(r.get("warmup_seconds", 0.0) for r in results)
+    if warmup_seconds > 0:
+        print(f"Carregamento de modelos (warm-up): {warmup_seconds:.1f}s")
+    cache_hits = sum(1 for r in transcribed if r.get("cache_hit"))
+    saved_seconds = sum(r.get("saved_seconds", 0.0) for r in transcribed)
+    cache_stats = {"hits": cache_hits, "misses": len(results) - cache_hits, "saved_seconds": saved_seconds}
+    if cache_hits:
+        print(f"Cache de transcrições: {cache_hits} hit(s), {cache_stats['misses']} miss(es), {saved_seconds:.1f}s de transcrição economizados")
+    if run_report is not None:
+        run_report["transcription"] = {
+            "files": len(transcribed),
+            "failed": len(failed),
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            "throughput": round(throughput, 3),
+            "cache": cache_stats,
+            "cascade": {"seconds": cascade_seconds, "fraction": round(cascade_fraction, 4)},
+            "hallucination_seconds": hallucination_seconds,
+            "warmup_seconds": warmup_seconds,
+            "schedule": schedule,
+            "per_file": results,
+        }
+    return failed
+
+
+def report_triage(skipped, run_report=None):
+    """
+    Exibe os arquivos pulados por não terem fala suficiente.
+    
+    Args:
+        skipped (list): Resultados retornados por triage_queue.
+        run_report (dict, optional): Relatório da execução a ser preenchido.
+    """
+    skipped_audio_seconds = sum(result["audio_seconds"] for result in skipped)
+    for result in skipped:
+        print(f"{result['video_id']}: {result['speech_ratio']:.1%} de fala; transcrição pulada (transcrição vazia gravada)")
+    if skipped:
+        print(f"Triagem de fala: {len(skipped)} arquivo(s) sem fala, {skipped_audio_seconds:.1f}s de áudio sem transcrever")
+    if run_report is not None:
+        run_report["triage"] = {
+            "skipped": skipped,
+            "skipped_audio_seconds": skipped_audio_seconds,
+        }
+
+
+def report_sources(ingest, run_report=None):
+    """
+    Exibe a origem da transcrição de cada vídeo: legenda do YouTube ou ASR.
+    
+    Args:
+        ingest (dict): Origem de cada video_id (source e, para legendas, kind, language, coverage e segments).
+        run_report (dict, optional): Relatório da execução a ser preenchido.
+    """
+    from_captions = [video_id for video_id, info in ingest.items() if info["source"] == "captions"]
+    for video_id in from_captions:
+        info = ingest[video_id]
+        coverage = "" if info["coverage"] is None else f", cobertura {info['coverage']:.1%}"
+        print(f"{video_id}: transcrição a partir da legenda {info['language']} ({info['kind']}{coverage})")
+    if ingest:
+        print(f"Legendas: {len(from_captions)} vídeo(s) sem ASR, {len(ingest) - len(from_captions)} pelo ASR")
+    if run_report is not None:
+        run_report["ingest"] = {
+            "per_video": ingest,
+            "captions": len(from_captions),
+            "asr": len(ingest) - len(from_captions),
+        }
+
+
+def report_duplicates(duplicates, run_report=None):
+    """
+    Exibe os vídeos duplicados cuja transcrição foi reaproveitada e o tempo economizado.
+    
+    Args:
+        duplicates (list): Correspondências retornadas por find_duplicates.
+        run_report (dict, optional): Relatório da execução a ser preenchido.
+    """
+    reused = [match for match in duplicates if match["reused"]]
+    saved_audio_seconds = sum(match["audio_seconds"] for match in reused)
+    saved_seconds = sum(match["saved_seconds"] for match in reused)
+    for match in duplicates:
+        status = "transcrição reaproveitada" if match["reused"] else "origem falhou; não reaproveitada"
+        print(f"{match['video_id']} é duplicata de {match['duplicate_of']} (similaridade {match['similarity']:.1%}): {status}")
+    if reused:
+        print(f"Duplicatas: {len(reused)} vídeo(s), {saved_audio_seconds:.1f}s de áudio sem transcrever ({saved_seconds:.1f}s de transcrição economizados)")
+    if run_report is not None:
+        run_report["duplicates"] = {
+            "matches": duplicates,
+            "saved_audio_seconds": saved_audio_seconds,
+            "saved_seconds": saved_seconds,
+        }
+
+
+def report_resources(run_report):
+    """
+    Exibe os picos de uso de recursos de cada etapa registrados no relatório da execução.
+    
+    Args:
+        run_report (dict): Relatório preenchido por process_all.
+    """
+    try:
+        from src.utils.resource_sampler import format_peaks
+    except ImportError:
+        from utils.resource_sampler import format_peaks
+    for stage, summary in run_report.get("resources", {}).items():
+        print(f"Recursos ({stage}, {summary['duration_seconds']:.1f}s): {format_peaks(summary)}")
+
+
+def save_run_report(run_report, path):
+    """
+    Grava o relatório da execução em JSON.
+    
+    Args:
+        run_report (dict): Relatório preenchido por process_all.
+        path (str): Caminho do arquivo de saída.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run_report, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Relatório da execução salvo em {path}")
+
+
 async def process_ai_analysis(excel_file, target_person=None, resume_existing=True):
     """
     Processa análise IA em um arquivo Excel.
@@ -313,6 +668,11 @@ async def process_only_ai_analysis(excel_file, target_person=None, resume_existi
         raise
 
 if __name__ == "__main__":
+    try:
+        from src.config import DECODING_PROFILES
+    except ImportError:
+        from config import DECODING_PROFILES
+    
     parser = argparse.ArgumentParser(description="Processa vídeos do YouTube, transcreve e exporta para Excel.")
     parser.add_argument("-t", "--transcripts", default="transcripts", help="Diretório para salvar as transcrições completas")
     parser.add_argument("-a", "--audios", default="audios", help="Diretório para salvar os áudios baixados")
@@ -322,9 +682,24 @@ if __name__ == "__main__":
     parser.add_argument("-id", "--video-id", help="Processa apenas o vídeo com este ID do YouTube")
     parser.add_argument("--ignore", action="store_true", help="Ignora download/transcrição se o vídeo já tiver transcrição gerada")
     parser.add_argument("--whisper", action="store_true", help="Força o uso do Whisper original (padrão: faster-whisper)")
+    parser.add_argument("--backend", help="Backend de transcrição pelo nome (ex: faster-whisper, whisper; padrão: DEFAULT_TRANSCRIPTION_BACKEND do config)")
     parser.add_argument("--test-whisper", action="store_true", help="Executa apenas um teste de transcrição Whisper para o vídeo especificado com arquivos _test.")
     parser.add_argument("--cpu", action="store_true", help="Força o uso de CPU para a transcrição (ignora GPU mesmo se disponível)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Transcrição em lote do Faster-Whisper com este tamanho de lote (padrão: BATCH_SIZE do config)")
+    parser.add_argument("--vad", action="store_true", default=None, help="Remove silêncios com VAD antes da decodificação (Faster-Whisper)")
+    parser.add_argument("--profile", choices=list(DECODING_PROFILES), default=None, help="Perfil de decodificação (perfis de DECODING_PROFILES no config): fast/balanced decodificam mais rápido, sem o fallback de temperatura, e re-decodificam com busca em feixe só os segmentos de baixa confiança (padrão: DECODING_PROFILE do config)")
+    parser.add_argument("--cascade-model", default=None, help="Modelo maior (ex: large-v3) que re-transcreve só as regiões de baixa confiança do modelo rápido (padrão: CASCADE_MODEL do config)")
+    parser.add_argument("--hallucination-guard", action="store_true", help="Detecta laços de alucinação (música/silêncio), interrompe a decodificação e retoma adiante, marcando as regiões puladas no JSON de palavras (padrão: HALLUCINATION_GUARD_ENABLED do config)")
+    parser.add_argument("--segment-timestamps", action="store_true", help="Transcreve só com timestamps de segmento (sem alinhamento de palavras, mais rápido); os blocos do Excel seguem os limites dos segmentos (padrão: SEGMENT_TIMESTAMPS_ONLY do config)")
+    parser.add_argument("--parallel-chunks", type=int, default=None, help="Divide vídeos longos em N trechos transcritos simultaneamente (Faster-Whisper)")
+    parser.add_argument("--no-daemon", action="store_true", help="Transcreve neste processo mesmo se o daemon de transcrição (python -m src.transcription_daemon) estiver em execução")
+    parser.add_argument("--no-triage", action="store_true", help="Transcreve todos os arquivos, sem a triagem que pula áudios sem fala (música/silêncio)")
+    parser.add_argument("--captions", action="store_true", help="Usa a legenda do YouTube (manual ou automática no idioma original) como transcrição quando houver, sem baixar o áudio")
+    parser.add_argument("--triage-threshold", type=float, default=None, help="Fração mínima de fala para transcrever um arquivo (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config)")
+    parser.add_argument("--workers", type=int, default=None, help="Transcreve em um pool de N processos na CPU (0 = automático pelo número de núcleos)")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="Threads de CPU por processo do pool (padrão: derivado do número de núcleos)")
     parser.add_argument("--test-excel", help="Gera um Excel a partir de um arquivo de transcrição _test.txt (e _test.json) com timestamps.")
+    parser.add_argument("--report", help="Grava o relatório da execução (agenda e ETA, métricas da transcrição, recursos por etapa) neste arquivo JSON")
     
     # Argumentos de análise IA
     parser.add_argument("--ai-analysis", action="store_true", help="Ativa análise IA após geração do Excel")
@@ -360,6 +735,7 @@ if __name__ == "__main__":
             resume_existing=args.ai_resume
         ))
     else:
+        run_report = {}
         process_all(
             args.audios, 
             args.transcripts, 
@@ -370,5 +746,21 @@ if __name__ == "__main__":
             ignore_existing=args.ignore, 
             use_whisper=args.whisper,
             ai_analysis=args.ai_analysis,
-            target_person=args.target_person
-        )
\ No newline at end of file
+            target_person=args.target_person,
+            transcription_options={"batch_size": args.batch_size, "vad_filter": args.vad,
+                                   "parallel_chunks": args.parallel_chunks, "profile": args.profile,
+                                   "cascade_model": args.cascade_model,
+                                   "hallucination_guard": True if args.hallucination_guard else None,
+                                   "word_timestamps": False if args.segment_timestamps else None,
+                                   "use_daemon": False if args.no_daemon else None},
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            backend=args.backend,
+            speech_triage=False if args.no_triage else None,
+            triage_threshold=args.triage_threshold,
+            captions=True if args.captions else None,
+            run_report=run_report
+        )
+        report_resources(run_report)
+        if args.report:
+            save_run_report(run_report, args.report)
\ No newline at end of file
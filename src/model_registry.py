@@ -0,0 +1,268 @@
+"""
+Módulo de cache de modelos de transcrição compartilhado pelo processo.
+Mantém os modelos Whisper/Faster-Whisper carregados entre chamadas de transcrição,
+com descarte LRU quando o orçamento de memória configurado é excedido. Modelos em uso
+(obtidos com get_model e ainda não devolvidos com release) nunca são descartados.
+"""
+import gc
+import sys
+import threading
+import time
+from collections import OrderedDict
+from src.utils.logger import setup_logger
+from src.config import MODEL_CACHE_MAX_MEMORY_MB
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Memória aproximada (MB) de cada tamanho de modelo com pesos em float32
+MODEL_MEMORY_ESTIMATES_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3000,
+    "large": 6200,
+    "turbo": 3200,
+}
+
+# Fator aplicado à estimativa de memória conforme o compute_type
+COMPUTE_TYPE_MEMORY_FACTOR = {
+    "float32": 1.0,
+    "float16": 0.5,
+    "bfloat16": 0.5,
+    "int8_float16": 0.35,
+    "int8_bfloat16": 0.35,
+    "int8_float32": 0.3,
+    "int8": 0.3,
+}
+
+
+def estimate_model_memory_mb(model_size, compute_type=None):
+    """
+    Estima a memória ocupada por um modelo carregado.
+
+    Args:
+        model_size (str): Tamanho do modelo (tiny, base, small, medium, large-v3...).
+        compute_type (str, optional): Tipo de computação usado no carregamento.
+
+    Returns:
+        float: Estimativa de memória em MB.
+    """
+    base_size = model_size.split(".")[0]
+    if base_size.startswith("large"):
+        base_size = "large"
+    elif "turbo" in base_size:
+        base_size = "turbo"
+    memory = MODEL_MEMORY_ESTIMATES_MB.get(base_size, MODEL_MEMORY_ESTIMATES_MB["large"])
+    return memory * COMPUTE_TYPE_MEMORY_FACTOR.get(compute_type or "float32", 1.0)
+
+
+def detect_device():
+    """
+    Detecta o dispositivo disponível para inferência.
+
+    Returns:
+        str: "cuda" se houver GPU disponível, "cpu" caso contrário.
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _load_faster_whisper(model_size, device, compute_type, **load_kwargs):
+    from faster_whisper import WhisperModel
+    from src.model_store import resolve_model
+    # Sempre a partir do repositório local (MODELS_DIR), nunca do cache implícito do hub
+    model_path = resolve_model("faster-whisper", model_size) or model_size
+    return WhisperModel(model_path, device=device, compute_type=compute_type, **load_kwargs)
+
+
+def _load_whisper(model_size, device, compute_type, **load_kwargs):
+    import whisper
+    from src.model_store import resolve_model
+    download_root = resolve_model("whisper", model_size)
+    if download_root is not None:
+        load_kwargs.setdefault("download_root", download_root)
+    return whisper.load_model(model_size, device=device, **load_kwargs)
+
+
+# Funções de carregamento por backend
+MODEL_LOADERS = {
+    "faster-whisper": _load_faster_whisper,
+    "whisper": _load_whisper,
+}
+
+
+class ModelRegistry:
+    """Cache LRU de modelos de transcrição, seguro para uso entre threads."""
+
+    def __init__(self, max_memory_mb=MODEL_CACHE_MAX_MEMORY_MB):
+        """
+        Inicializa o registro de modelos.
+
+        Args:
+            max_memory_mb (float): Orçamento de memória (MB) para os modelos em cache.
+        """
+        self.max_memory_mb = max_memory_mb
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(backend, model_size, device, compute_type, **load_kwargs):
+        """Gera a chave de cache de um modelo."""
+        return (backend, model_size, device, compute_type) + tuple(sorted(load_kwargs.items()))
+
+    def get_model(self, backend, model_size, device, compute_type=None, **load_kwargs):
+        """
+        Retorna um modelo carregado, carregando-o apenas na primeira solicitação.
+
+        Args:
+            backend (str): Backend de transcrição ("faster-whisper" ou "whisper").
+            model_size (str): Tamanho do modelo.
+            device (str): Dispositivo ("cuda" ou "cpu").
+            compute_type (str, optional): Tipo de computação do modelo.
+            **load_kwargs: Argumentos adicionais repassados ao carregador.
+
+        Returns:
+            object: Instância do modelo carregado.
+        """
+        if backend not in MODEL_LOADERS:
+            raise ValueError(f"Backend de transcrição desconhecido: {backend}")
+
+        key = self.make_key(backend, model_size, device, compute_type, **load_kwargs)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._models[key]["in_use"] += 1
+                self.hits += 1
+                return self._models[key]["model"]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Um único carregamento por chave; outras threads aguardam o resultado
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self._models[key]["in_use"] += 1
+                    self.hits += 1
+                    return self._models[key]["model"]
+                self.misses += 1
+                memory_mb = estimate_model_memory_mb(model_size, compute_type)
+                self._make_room(memory_mb)
+
+            logger.info(f"Carregando modelo {backend} '{model_size}' (device: {device}, compute_type: {compute_type})")
+            start_time = time.time()
+            try:
+                model = MODEL_LOADERS[backend](model_size, device, compute_type, **load_kwargs)
+            except Exception:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+                raise
+            load_time = time.time() - start_time
+            logger.info(f"Modelo '{model_size}' carregado em {load_time:.1f}s (~{memory_mb:.0f} MB)")
+
+            with self._lock:
+                self._models[key] = {"model": model, "memory_mb": memory_mb, "device": device, "load_time": load_time,
+                                     "in_use": 1}
+                self._key_locks.pop(key, None)
+            return model
+
+    def release(self, backend, model_size, device, compute_type=None, **load_kwargs):
+        """
+        Devolve um modelo obtido com get_model: ele continua em cache, mas pode ser descartado
+        quando nenhum outro usuário o estiver usando.
+
+        Args:
+            backend (str): Backend de transcrição.
+            model_size (str): Tamanho do modelo.
+            device (str): Dispositivo.
+            compute_type (str, optional): Tipo de computação do modelo.
+            **load_kwargs: Argumentos adicionais usados no carregamento.
+        """
+        key = self.make_key(backend, model_size, device, compute_type, **load_kwargs)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry["in_use"] > 0:
+                entry["in_use"] -= 1
+
+    def _make_room(self, memory_mb):
+        """
+        Descarta os modelos menos usados até caber o novo modelo. Modelos em uso são mantidos:
+        descartá-los só removeria a referência do cache, sem liberar a memória. Deve ser chamado com o lock.
+        """
+        if memory_mb > self.max_memory_mb:
+            logger.warning(f"Modelo (~{memory_mb:.0f} MB) excede o orçamento de cache de {self.max_memory_mb} MB")
+        for old_key in [key for key, entry in self._models.items() if not entry["in_use"]]:
+            if self.used_memory_mb() + memory_mb <= self.max_memory_mb:
+                break
+            entry = self._models.pop(old_key)
+            logger.info(f"Descartando modelo do cache (LRU): {old_key[:4]}")
+            self._release(entry)
+        if self.used_memory_mb() + memory_mb > self.max_memory_mb and self._models:
+            in_use = [key[:4] for key, entry in self._models.items() if entry["in_use"]]
+            logger.warning(f"Orçamento de cache de modelos excedido: {len(in_use)} modelo(s) em uso não podem "
+                           f"ser descartados ({in_use})")
+
+    @staticmethod
+    def _release(entry):
+        """Libera a referência ao modelo e a memória de GPU associada."""
+        device = entry["device"]
+        entry.clear()
+        gc.collect()
+        if device == "cuda" and "torch" in sys.modules:
+            sys.modules["torch"].cuda.empty_cache()
+
+    def used_memory_mb(self):
+        """Retorna a memória estimada (MB) ocupada pelos modelos em cache."""
+        return sum(entry["memory_mb"] for entry in self._models.values())
+
+    def unload(self, backend, model_size, device, compute_type=None, **load_kwargs):
+        """
+        Remove um modelo específico do cache, se ele não estiver em uso.
+
+        Returns:
+            bool: True se o modelo foi removido, False se não estava em cache ou ainda está em uso.
+        """
+        key = self.make_key(backend, model_size, device, compute_type, **load_kwargs)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return False
+            if entry["in_use"]:
+                logger.info(f"Modelo {key[:4]} ainda em uso ({entry['in_use']}); mantido no cache")
+                return False
+            self._release(self._models.pop(key))
+            return True
+
+    def clear(self):
+        """Remove todos os modelos do cache."""
+        with self._lock:
+            while self._models:
+                _, entry = self._models.popitem(last=False)
+                self._release(entry)
+
+    def stats(self):
+        """
+        Retorna estatísticas do cache.
+
+        Returns:
+            dict: Modelos carregados, memória estimada, hits e misses.
+        """
+        with self._lock:
+            return {
+                "models": [list(key[:4]) for key in self._models],
+                "in_use": [list(key[:4]) for key, entry in self._models.items() if entry["in_use"]],
+                "used_memory_mb": round(self.used_memory_mb(), 1),
+                "max_memory_mb": self.max_memory_mb,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Instância global do registro de modelos
+model_registry = ModelRegistry()
@@ -0,0 +1,355 @@
+"""
+Módulo do repositório local de modelos de transcrição.
+Os modelos ficam em MODELS_DIR (um diretório por backend e tamanho, com um manifest.json
+de tamanhos e SHA-256 dos arquivos) e são sempre carregados de lá: o primeiro carregamento
+em um worker novo não depende mais do hub. Em máquinas sem acesso à internet, basta copiar
+MODELS_DIR de uma máquina onde os modelos foram baixados e conferi-los com "verify".
+
+Uso:
+    python -m src.model_store prefetch faster-whisper:small whisper:base
+    python -m src.model_store verify
+    python -m src.model_store list
+"""
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from src.utils.logger import setup_logger
+from src.config import (
+    MODELS_DIR, MODEL_STORE_ENABLED, MODEL_STORE_OFFLINE, MODEL_STORE_MODELS, CASCADE_MODEL,
+    DEFAULT_FASTER_WHISPER_MODEL, DEFAULT_WHISPER_MODEL
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def model_dir(backend, model_size, root=None):
+    """
+    Retorna o diretório de um modelo no repositório local.
+
+    Args:
+        backend (str): Nome do backend ("faster-whisper" ou "whisper").
+        model_size (str): Tamanho do modelo ou id de repositório do hub.
+        root (str, optional): Raiz do repositório (padrão: MODELS_DIR do config).
+
+    Returns:
+        str: Caminho do diretório (pode ainda não existir).
+    """
+    return os.path.join(str(root or MODELS_DIR), backend, model_size.replace("/", "--"))
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+
+def _hub_checksums(repo_id):
+    """SHA-256 publicados no hub para os arquivos LFS (pesos) de um repositório, se acessível."""
+    try:
+        from huggingface_hub import HfApi
+        info = HfApi().model_info(repo_id, files_metadata=True)
+    except Exception as e:
+        logger.warning(f"Checksums do hub indisponíveis para {repo_id}: {e}")
+        return {}
+    checksums = {}
+    for sibling in info.siblings or []:
+        lfs = getattr(sibling, "lfs", None)
+        sha256 = lfs.get("sha256") if isinstance(lfs, dict) else getattr(lfs, "sha256", None)
+        if sha256:
+            checksums[sibling.rfilename] = sha256
+    return checksums
+
+
+def _fetch_faster_whisper(model_size, target):
+    """Baixa um modelo do Faster-Whisper; retorna (origem, checksums esperados)."""
+    from faster_whisper.utils import download_model, _MODELS
+    repo_id = _MODELS.get(model_size, model_size)
+    download_model(model_size, output_dir=target)
+    return repo_id, _hub_checksums(repo_id)
+
+
+def _fetch_whisper(model_size, target):
+    """Baixa um modelo do Whisper original; o SHA-256 esperado faz parte da URL oficial."""
+    import whisper
+    if model_size not in whisper._MODELS:
+        raise ValueError(f"Modelo Whisper desconhecido: {model_size} (disponíveis: {', '.join(whisper.available_models())})")
+    url = whisper._MODELS[model_size]
+    # _download confere o SHA-256 ao final do download
+    whisper._download(url, target, in_memory=False)
+    return url, {os.path.basename(url): url.split("/")[-2]}
+
+
+# Funções de download por backend
+MODEL_FETCHERS = {
+    "faster-whisper": _fetch_faster_whisper,
+    "whisper": _fetch_whisper,
+}
+
+
+def prefetch(backend, model_size, root=None, force=False):
+    """
+    Baixa um modelo para o repositório local e grava o seu manifesto.
+
+    O download é feito em um diretório temporário e só então movido para o destino, para que
+    processos concorrentes nunca vejam um modelo incompleto.
+
+    Args:
+        backend (str): Nome do backend ("faster-whisper" ou "whisper").
+        model_size (str): Tamanho do modelo ou id de repositório do hub.
+        root (str, optional): Raiz do repositório (padrão: MODELS_DIR do config).
+        force (bool): Se True, baixa novamente mesmo que o modelo já esteja presente.
+
+    Returns:
+        dict: Manifesto do modelo.
+
+    Raises:
+        ValueError: Se o backend for desconhecido ou um checksum não conferir.
+    """
+    if backend not in MODEL_FETCHERS:
+        raise ValueError(f"Backend de transcrição desconhecido: {backend}")
+    directory = model_dir(backend, model_size, root)
+    manifest = _read_manifest(directory)
+    if manifest is not None and not force:
+        logger.info(f"Modelo {backend}:{model_size} já presente em {directory}")
+        return manifest
+
+    temp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    try:
+        logger.info(f"Baixando modelo {backend}:{model_size} para {directory}")
+        source, expected = MODEL_FETCHERS[backend](model_size, temp_dir)
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(temp_dir):
+            # Metadados do cache do hub não fazem parte do modelo
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, temp_dir)
+                files[name] = {"size": os.path.getsize(path), "sha256": _sha256(path)}
+                if name in expected and expected[name] != files[name]["sha256"]:
+                    raise ValueError(f"Checksum de {name} não confere com o publicado ({backend}:{model_size})")
+        manifest = {
+            "backend": backend,
+            "model_size": model_size,
+            "source": source,
+            "files": files,
+            "upstream_verified": sorted(name for name in files if name in expected),
+            "fetched_at": datetime.now().isoformat(),
+        }
+        with open(os.path.join(temp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        if force:
+            shutil.rmtree(directory, ignore_errors=True)
+        elif os.path.isdir(directory) and _read_manifest(directory) is None:
+            # Diretório sem manifesto (cópia manual incompleta, manifesto corrompido): afastado antes da troca
+            invalid_dir = f"{directory}.invalid-{os.getpid()}"
+            logger.warning(f"Diretório de modelo sem manifesto válido em {directory}; substituído pelo novo download")
+            os.replace(directory, invalid_dir)
+            shutil.rmtree(invalid_dir, ignore_errors=True)
+        try:
+            os.replace(temp_dir, directory)
+        except OSError:
+            if _read_manifest(directory) is None:
+                raise
+            # Outro processo concluiu o mesmo download antes
+            logger.debug(f"Modelo {backend}:{model_size} já gravado por outro processo")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    logger.info(f"Modelo {backend}:{model_size} salvo ({sum(f['size'] for f in files.values()) / 1024**2:.0f} MB)")
+    return manifest
+
+
+def verify(backend, model_size, root=None, checksums=True):
+    """
+    Confere um modelo do repositório local com o seu manifesto.
+
+    Args:
+        backend (str): Nome do backend.
+        model_size (str): Tamanho do modelo.
+        root (str, optional): Raiz do repositório (padrão: MODELS_DIR do config).
+        checksums (bool): Se True, recalcula o SHA-256 de cada arquivo; senão confere só os tamanhos.
+
+    Returns:
+        list: Problemas encontrados (vazia se o modelo está íntegro).
+    """
+    directory = model_dir(backend, model_size, root)
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        return [f"manifesto ausente em {directory}"]
+    problems = []
+    for name, expected in manifest["files"].items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            problems.append(f"{name}: arquivo ausente")
+        elif os.path.getsize(path) != expected["size"]:
+            problems.append(f"{name}: tamanho {os.path.getsize(path)} (esperado {expected['size']})")
+        elif checksums and _sha256(path) != expected["sha256"]:
+            problems.append(f"{name}: SHA-256 não confere")
+    return problems
+
+
+def resolve_model(backend, model_size):
+    """
+    Retorna o caminho local de onde um modelo deve ser carregado, baixando-o se necessário.
+
+    Para o Faster-Whisper é o diretório do modelo (passado no lugar do tamanho); para o Whisper
+    original é o diretório usado como download_root.
+
+    Args:
+        backend (str): Nome do backend.
+        model_size (str): Tamanho do modelo, id do hub ou caminho de um modelo local.
+
+    Returns:
+        str or None: Caminho local, ou None se o repositório estiver desativado ou model_size já for um caminho.
+
+    Raises:
+        FileNotFoundError: Se o modelo não estiver no repositório e MODEL_STORE_OFFLINE estiver ativo.
+        ValueError: Se o modelo estiver incompleto no repositório.
+    """
+    if not MODEL_STORE_ENABLED or os.path.exists(model_size):
+        return None
+    directory = model_dir(backend, model_size)
+    if _read_manifest(directory) is None:
+        if MODEL_STORE_OFFLINE:
+            raise FileNotFoundError(f"Modelo {backend}:{model_size} não encontrado em {MODELS_DIR}; execute "
+                                    f"'python -m src.model_store prefetch {backend}:{model_size}' em uma máquina "
+                                    f"com acesso à internet e copie o diretório")
+        logger.warning(f"Modelo {backend}:{model_size} ausente em {MODELS_DIR}; baixando antes do carregamento")
+        prefetch(backend, model_size)
+    # Conferência rápida (tamanhos); os checksums são recalculados com "verify"
+    problems = verify(backend, model_size, checksums=False)
+    if problems:
+        raise ValueError(f"Modelo {backend}:{model_size} incompleto em {directory}: {'; '.join(problems)}")
+    return directory
+
+
+def list_models(root=None):
+    """
+    Lista os modelos presentes no repositório local.
+
+    Args:
+        root (str, optional): Raiz do repositório (padrão: MODELS_DIR do config).
+
+    Returns:
+        list: Dicionários com backend, model_size, path, size_mb, fetched_at e upstream_verified.
+    """
+    root = str(root or MODELS_DIR)
+    models = []
+    for backend in sorted(MODEL_FETCHERS):
+        backend_dir = os.path.join(root, backend)
+        if not os.path.isdir(backend_dir):
+            continue
+        for name in sorted(os.listdir(backend_dir)):
+            manifest = _read_manifest(os.path.join(backend_dir, name))
+            if manifest is None:
+                continue
+            models.append({
+                "backend": backend,
+                "model_size": manifest["model_size"],
+                "path": os.path.join(backend_dir, name),
+                "size_mb": round(sum(f["size"] for f in manifest["files"].values()) / 1024**2, 1),
+                "fetched_at": manifest.get("fetched_at"),
+                "upstream_verified": bool(manifest.get("upstream_verified")),
+            })
+    return models
+
+
+def _backend_capabilities(backend, device):
+    """Tamanhos de modelo conhecidos e compute_types suportados no dispositivo, se o backend estiver instalado."""
+    try:
+        if backend == "faster-whisper":
+            import ctranslate2
+            from faster_whisper import available_models
+            return {"installed": True, "available_sizes": list(available_models()),
+                    "compute_types": sorted(ctranslate2.get_supported_compute_types(device))}
+        import whisper
+        return {"installed": True, "available_sizes": list(whisper.available_models()),
+                "compute_types": ["float16", "float32"] if device == "cuda" else ["float32"]}
+    except ImportError:
+        return {"installed": False, "available_sizes": [], "compute_types": []}
+
+
+def store_report(device=None):
+    """
+    Resume o repositório de modelos para a API: modelos locais e, por backend, os tamanhos
+    conhecidos e os compute_types suportados neste host.
+
+    Args:
+        device (str, optional): Dispositivo ("cuda" ou "cpu"); detectado automaticamente se None.
+
+    Returns:
+        dict: models_dir, enabled, offline, device, backends e models.
+    """
+    from src.model_registry import detect_device
+    device = device or detect_device()
+    return {
+        "models_dir": str(MODELS_DIR),
+        "enabled": MODEL_STORE_ENABLED,
+        "offline": MODEL_STORE_OFFLINE,
+        "device": device,
+        "backends": {backend: _backend_capabilities(backend, device) for backend in MODEL_FETCHERS},
+        "models": list_models(),
+    }
+
+
+def _parse_specs(specs):
+    """Converte especificações BACKEND[:MODELO] em pares (backend, tamanho)."""
+    parsed = []
+    for spec in specs:
+        backend, _, model_size = spec.partition(":")
+        parsed.append((backend, model_size or (DEFAULT_WHISPER_MODEL if backend == "whisper"
+                                               else DEFAULT_FASTER_WHISPER_MODEL)))
+    return parsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repositório local de modelos de transcrição.")
+    parser.add_argument("command", choices=["prefetch", "verify", "list"],
+                        help="prefetch: baixa os modelos; verify: confere os checksums; list: lista os modelos locais")
+    parser.add_argument("models", nargs="*", metavar="BACKEND[:MODELO]",
+                        help="Modelos (padrão: MODEL_STORE_MODELS do config no prefetch; todos os locais no verify)")
+    parser.add_argument("--dir", default=None, help=f"Raiz do repositório (padrão: {MODELS_DIR})")
+    parser.add_argument("--force", action="store_true", help="Baixa novamente modelos já presentes")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for model in list_models(args.dir):
+            print(f"{model['backend']}:{model['model_size']}  {model['size_mb']:.0f} MB  {model['path']}")
+    elif args.command == "prefetch":
+        specs = _parse_specs(args.models) or [tuple(spec.split(":", 1)) for spec in MODEL_STORE_MODELS]
+        if not args.models and CASCADE_MODEL:
+            specs.append(("faster-whisper", CASCADE_MODEL))
+        for backend, model_size in specs:
+            prefetch(backend, model_size, args.dir, force=args.force)
+            print(f"{backend}:{model_size}: ok")
+    else:
+        specs = _parse_specs(args.models) or [(m["backend"], m["model_size"]) for m in list_models(args.dir)]
+        failed = 0
+        for backend, model_size in specs:
+            problems = verify(backend, model_size, args.dir)
+            print(f"{backend}:{model_size}: {'ok' if not problems else 'FALHOU'}")
+            for problem in problems:
+                print(f"  {problem}")
+            failed += bool(problems)
+        raise SystemExit(1 if failed else 0)
@@ -0,0 +1,232 @@
+"""
+Módulo de agendamento da fila de transcrição.
+Mede a duração de cada entrada (ffprobe para arquivos locais, metadados do yt-dlp para URLs),
+ordena a fila da mais longa para a mais curta (Longest Processing Time first) — assim um vídeo
+longo não fica para o fim deixando os demais processos ociosos — e estima o tempo total a
+partir do fator de tempo real (RTF) medido nas execuções anteriores.
+"""
+import os
+import json
+import wave
+import heapq
+import shutil
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from src.utils.logger import setup_logger
+from src.utils.audio_files import find_audio_file
+from src.config import RTF_HISTORY_FILE, SCHEDULE_DEFAULT_RTF, is_youtube_url
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Peso da medição mais recente na média móvel do RTF
+RTF_SMOOTHING = 0.5
+
+_history_lock = threading.Lock()
+
+
+def _probe_file(path):
+    """Duração (s) de um arquivo local com o ffprobe; WAV é lido diretamente se ele faltar."""
+    if shutil.which("ffprobe") is not None:
+        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+               "-of", "default=noprint_wrappers=1:nokey=1", path]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            return float(result.stdout.strip())
+        except (OSError, subprocess.SubprocessError, ValueError):
+            pass
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, 'rb') as f:
+                return f.getnframes() / f.getframerate()
+        except (wave.Error, OSError, EOFError):
+            pass
+    return None
+
+
+def _probe_url(url):
+    """Duração (s) de um vídeo a partir dos metadados do yt-dlp, sem baixá-lo."""
+    try:
+        from yt_dlp import YoutubeDL
+        with YoutubeDL({"quiet": True, "skip_download": True, "noplaylist": True}) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except Exception as e:
+        logger.debug(f"Metadados indisponíveis para {url}: {e}")
+        return None
+    duration = (info or {}).get("duration")
+    return float(duration) if duration else None
+
+
+def probe_duration(source):
+    """
+    Mede a duração de uma entrada.
+
+    Args:
+        source (str): Caminho de um arquivo local ou URL do YouTube.
+
+    Returns:
+        float or None: Duração em segundos, ou None se não for possível medi-la.
+    """
+    source = source.strip()
+    if is_youtube_url(source):
+        return _probe_url(source)
+    return _probe_file(source) if os.path.exists(source) else None
+
+
+def probe_durations(video_ids, audio_dir, sources=None):
+    """
+    Mede a duração de cada vídeo da fila: pelo áudio já em audio_dir ou, na falta dele, pela
+    entrada de origem (arquivo local ou URL).
+
+    Args:
+        video_ids (list): IDs dos vídeos.
+        audio_dir (str): Diretório dos arquivos de áudio.
+        sources (dict, optional): Entrada de origem (arquivo ou URL) de cada video_id.
+
+    Returns:
+        dict: Duração (s) de cada video_id; None quando desconhecida.
+    """
+    durations = {}
+    for video_id in video_ids:
+        audio_file = find_audio_file(video_id, audio_dir) if audio_dir else None
+        duration = _probe_file(audio_file) if audio_file else None
+        if duration is None and sources and sources.get(video_id):
+            duration = probe_duration(sources[video_id])
+        durations[video_id] = duration
+    return durations
+
+
+def _rtf_key(backend, model_size, workers):
+    return f"{backend}:{model_size}:{workers or 1}"
+
+
+def _load_history(path=None):
+    path = str(path or RTF_HISTORY_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def estimate_rtf(backend, model_size, workers=1, path=None):
+    """
+    Retorna o RTF esperado por arquivo (tempo de transcrição / duração do áudio).
+
+    Args:
+        backend (str): Nome do backend de transcrição.
+        model_size (str): Tamanho do modelo.
+        workers (int): Processos transcrevendo ao mesmo tempo (1 = sequencial).
+        path (str, optional): Histórico de RTF (padrão: RTF_HISTORY_FILE do config).
+
+    Returns:
+        tuple: (RTF, origem: "history", "autotune" ou "default")
+    """
+    entry = _load_history(path).get(_rtf_key(backend, model_size, workers))
+    if entry:
+        return entry["rtf"], "history"
+    if (workers or 1) == 1:
+        from src.autotune import tuned_settings
+        from src.model_registry import detect_device
+        tuned = tuned_settings(backend, model_size, detect_device())
+        if tuned and tuned.get("rtf"):
+            return tuned["rtf"], "autotune"
+    return SCHEDULE_DEFAULT_RTF, "default"
+
+
+def record_rtf(backend, model_size, workers, results, path=None):
+    """
+    Atualiza o histórico de RTF com os arquivos transcritos (sem os acertos de cache).
+
+    Args:
+        backend (str): Nome do backend de transcrição.
+        model_size (str): Tamanho do modelo.
+        workers (int): Processos transcrevendo ao mesmo tempo (1 = sequencial).
+        results (list): Resultados por arquivo com success, cache_hit, elapsed e audio_seconds.
+        path (str, optional): Histórico de RTF (padrão: RTF_HISTORY_FILE do config).
+
+    Returns:
+        float or None: RTF medido nesta execução, ou None se não houve arquivos transcritos.
+    """
+    measured = [r for r in results if r["success"] and not r.get("cache_hit") and r.get("audio_seconds")]
+    if not measured:
+        return None
+    rtf = sum(r["elapsed"] for r in measured) / sum(r["audio_seconds"] for r in measured)
+    path = str(path or RTF_HISTORY_FILE)
+    key = _rtf_key(backend, model_size, workers)
+    with _history_lock:
+        history = _load_history(path)
+        previous = history.get(key, {}).get("rtf")
+        smoothed = rtf if previous is None else RTF_SMOOTHING * rtf + (1 - RTF_SMOOTHING) * previous
+        history[key] = {"rtf": round(smoothed, 4), "last_rtf": round(rtf, 4), "updated_at": datetime.now().isoformat()}
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+        os.replace(path + ".tmp", path)
+    return rtf
+
+
+def plan_schedule(durations, workers=1, rtf=SCHEDULE_DEFAULT_RTF):
+    """
+    Ordena a fila da mais longa para a mais curta e simula a sua distribuição entre os processos.
+
+    Durações desconhecidas são estimadas pela média das conhecidas.
+
+    Args:
+        durations (dict): Duração (s) de cada video_id (None = desconhecida).
+        workers (int): Processos transcrevendo ao mesmo tempo (1 = sequencial).
+        rtf (float): Tempo de transcrição por segundo de áudio em cada processo.
+
+    Returns:
+        dict: order (video_ids na ordem de execução), workers, rtf, assignments (processo, início e
+              fim estimados de cada vídeo), audio_seconds, estimated_seconds (tempo total) e eta.
+    """
+    workers = max(1, workers or 1)
+    known = [d for d in durations.values() if d is not None]
+    fallback = sum(known) / len(known) if known else 0.0
+    ordered = sorted(durations, key=lambda video_id: -(durations[video_id] if durations[video_id] is not None
+                                                       else fallback))
+    # Cada vídeo vai para o processo que fica livre primeiro
+    free_at = [(0.0, worker) for worker in range(workers)]
+    assignments = []
+    for video_id in ordered:
+        audio_seconds = durations[video_id] if durations[video_id] is not None else fallback
+        start, worker = heapq.heappop(free_at)
+        end = start + audio_seconds * rtf
+        heapq.heappush(free_at, (end, worker))
+        assignments.append({"video_id": video_id, "worker": worker, "audio_seconds": round(audio_seconds, 1),
+                            "duration_known": durations[video_id] is not None,
+                            "start": round(start, 1), "end": round(end, 1)})
+    estimated_seconds = max((a["end"] for a in assignments), default=0.0)
+    return {
+        "order": ordered,
+        "workers": workers,
+        "rtf": rtf,
+        "assignments": assignments,
+        "audio_seconds": round(sum(a["audio_seconds"] for a in assignments), 1),
+        "estimated_seconds": round(estimated_seconds, 1),
+        "eta": (datetime.now() + timedelta(seconds=estimated_seconds)).isoformat(timespec="seconds"),
+    }
+
+
+def _hms(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def log_schedule(schedule):
+    """
+    Registra no log a fila planejada e a estimativa de conclusão.
+
+    Args:
+        schedule (dict): Resultado de plan_schedule.
+    """
+    logger.info(f"Fila planejada: {len(schedule['order'])} arquivo(s), {_hms(schedule['audio_seconds'])} de áudio "
+                f"em {schedule['workers']} processo(s), RTF {schedule['rtf']:.3f} ({schedule.get('rtf_source', '?')})")
+    for a in schedule["assignments"]:
+        duration = _hms(a["audio_seconds"]) + ("" if a["duration_known"] else " (estimada)")
+        logger.info(f"  processo {a['worker']}: {a['video_id']} {duration}, "
+                    f"previsto {_hms(a['start'])} -> {_hms(a['end'])}")
+    logger.info(f"Conclusão estimada em {_hms(schedule['estimated_seconds'])} (ETA {schedule['eta']})")
@@ -0,0 +1,248 @@
+"""
+Módulo de triagem de fala antes da transcrição.
+Avalia, em algumas janelas distribuídas ao longo do áudio (lidas do cache decodificado ou, com
+o cache desativado, decodificadas uma a uma pelo ffmpeg), a fração com fala:
+quadros abaixo de um limiar de energia são silêncio e o restante passa pelo VAD Silero do
+Faster-Whisper (que distingue fala de música). Arquivos com fala desprezível são pulados em
+segundos e recebem uma transcrição vazia marcada com "no_speech".
+"""
+import os
+import time
+import numpy as np
+from src.utils.logger import setup_logger
+from src.utils.audio_files import find_audio_file
+from src.transcript_writer import StreamingTranscriptWriter
+from src.audio_stream import LazyAudio
+from src.scheduler import probe_duration
+from src.config import (
+    SPEECH_TRIAGE_MIN_SPEECH_RATIO, SPEECH_TRIAGE_WINDOWS, SPEECH_TRIAGE_WINDOW_SECONDS, SPEECH_TRIAGE_SILENCE_DB,
+    VAD_MIN_SILENCE_MS, AUDIO_CACHE_ENABLED
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03                       # Quadro da medida de energia (30 ms)
+
+
+def _silero_vad():
+    """Retorna a função de VAD do Faster-Whisper, ou None se ele não estiver instalado."""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        return None
+    options = VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, speech_pad_ms=0)
+    return lambda samples: sum(ts["end"] - ts["start"] for ts in get_speech_timestamps(samples, vad_options=options))
+
+
+def _window_starts(total_samples, windows, window_samples):
+    """Inícios das janelas amostradas, distribuídas uniformemente pelo áudio."""
+    if total_samples <= windows * window_samples:
+        # Áudio curto: as janelas cobrem o áudio inteiro
+        return list(range(0, total_samples, window_samples))
+    return sorted({int(start) for start in np.linspace(0, total_samples - window_samples, windows)})
+
+
+def speech_ratio(audio, windows=SPEECH_TRIAGE_WINDOWS, window_seconds=SPEECH_TRIAGE_WINDOW_SECONDS,
+                 silence_db=SPEECH_TRIAGE_SILENCE_DB, sample_rate=SAMPLE_RATE, total_samples=None):
+    """
+    Estima a fração de fala de um áudio a partir de janelas amostradas.
+
+    Sem o Faster-Whisper instalado, apenas o limiar de energia é aplicado: os quadros não
+    silenciosos contam como fala, de modo que só áudios quase silenciosos são descartados.
+
+    Args:
+        audio (np.ndarray or LazyAudio): Amostras mono em float32 (pode ser um np.memmap ou um
+                                         LazyAudio: só as janelas são lidas).
+        windows (int): Número de janelas amostradas.
+        window_seconds (float): Duração de cada janela.
+        silence_db (float): Energia (dBFS) abaixo da qual um quadro é silêncio.
+        sample_rate (int): Taxa de amostragem do áudio.
+        total_samples (int, optional): Número de amostras do áudio (padrão: len(audio)).
+
+    Returns:
+        tuple: (fração de fala, segundos amostrados, método: "silero" ou "energy")
+    """
+    vad = _silero_vad()
+    frame = int(FRAME_SECONDS * sample_rate)
+    window_samples = int(window_seconds * sample_rate)
+    sampled = speech = 0
+    total_samples = len(audio) if total_samples is None else total_samples
+    for start in _window_starts(total_samples, windows, window_samples):
+        samples = np.asarray(audio[start:start + window_samples], dtype=np.float32)
+        frames = samples[:len(samples) // frame * frame].reshape(-1, frame)
+        if not len(frames):
+            continue
+        sampled += len(samples)
+        energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-12)
+        active = int(np.count_nonzero(energy_db > silence_db))
+        if not active:
+            continue
+        speech += vad(samples) if vad is not None else active * frame
+    ratio = min(1.0, speech / sampled) if sampled else 0.0
+    return ratio, sampled / sample_rate, "silero" if vad is not None else "energy"
+
+
+def triage_file(audio_path, threshold=None, use_daemon=True):
+    """
+    Avalia se um arquivo tem fala suficiente para ser transcrito.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio.
+        threshold (float, optional): Fração mínima de fala (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config).
+        use_daemon (bool): Se True e o daemon de transcrição estiver em execução, a triagem é feita
+                           por ele, sem importar o Faster-Whisper (VAD) neste processo.
+
+    Returns:
+        dict: speech_ratio, threshold, has_speech, sampled_seconds, audio_seconds, method e elapsed;
+              None se não for possível decodificar o áudio.
+    """
+    if use_daemon:
+        from src.transcription_daemon import triage_via_daemon
+        result = triage_via_daemon(audio_path, threshold)
+        if result is not None:
+            return result
+    from src.audio_cache import load_audio
+    threshold = SPEECH_TRIAGE_MIN_SPEECH_RATIO if threshold is None else threshold
+    start_time = time.time()
+    try:
+        audio = total_samples = None
+        if not AUDIO_CACHE_ENABLED:
+            # Sem o cache, só as janelas amostradas são decodificadas (ffmpeg -ss/-t), não o arquivo inteiro
+            duration = probe_duration(audio_path)
+            if duration is not None:
+                audio, total_samples = LazyAudio(audio_path), int(duration * SAMPLE_RATE)
+        if audio is None:
+            audio = load_audio(audio_path)
+            total_samples = len(audio)
+        ratio, sampled_seconds, method = speech_ratio(audio, total_samples=total_samples)
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"Triagem de fala indisponível para {audio_path}: {e}")
+        return None
+    return {
+        "speech_ratio": round(ratio, 4),
+        "threshold": threshold,
+        "has_speech": ratio >= threshold,
+        "sampled_seconds": sampled_seconds,
+        "audio_seconds": total_samples / SAMPLE_RATE,
+        "method": method,
+        "elapsed": time.time() - start_time,
+    }
+
+
+def write_no_speech_transcript(video_id, words_dir, result):
+    """
+    Grava a transcrição vazia de um arquivo sem fala: um único segmento sem texto que cobre
+    o áudio inteiro e traz a chave "no_speech" com o resultado da triagem.
+
+    Args:
+        video_id (str): ID do vídeo.
+        words_dir (str): Diretório das transcrições.
+        result (dict): Resultado de triage_file.
+
+    Returns:
+        str: Caminho do .txt gravado.
+    """
+    with StreamingTranscriptWriter(video_id, words_dir) as writer:
+        writer.write_segment({
+            "id": 1,
+            "start": 0.0,
+            "end": round(result["audio_seconds"], 3),
+            "text": "",
+            "no_speech": {key: result[key] for key in ("speech_ratio", "threshold", "sampled_seconds", "method")},
+        })
+        output_txt, _ = writer.finalize()
+    return output_txt
+
+
+def no_speech_marker(video_id, words_dir):
+    """
+    Lê o resultado da triagem gravado na transcrição vazia de um arquivo sem fala.
+
+    Args:
+        video_id (str): ID do vídeo.
+        words_dir (str): Diretório das transcrições.
+
+    Returns:
+        dict or None: speech_ratio, threshold, sampled_seconds e method da triagem, ou None se
+                      a transcrição não existir ou não for de um arquivo sem fala.
+    """
+    from src.word_store import load_segments
+    output_txt = os.path.join(words_dir, f"{video_id}.txt")
+    # Só uma transcrição com o .txt vazio pode ser de um arquivo sem fala
+    if not os.path.exists(output_txt) or os.path.getsize(output_txt) > 0:
+        return None
+    segments = load_segments(video_id, words_dir) or []
+    if len(segments) == 1 and "no_speech" in segments[0]:
+        return segments[0]["no_speech"]
+    return None
+
+
+def no_speech_outdated(video_id, words_dir, speech_triage=True, threshold=None):
+    """
+    Indica se a transcrição vazia de um arquivo sem fala deixou de valer: com a triagem
+    desativada, ou com um limiar que a fração de fala medida agora alcançaria, o arquivo
+    precisa ser transcrito pelo modelo.
+
+    Args:
+        video_id (str): ID do vídeo.
+        words_dir (str): Diretório das transcrições.
+        speech_triage (bool): Se a triagem de fala está ativada nesta execução.
+        threshold (float, optional): Fração mínima de fala (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config).
+
+    Returns:
+        bool: True se houver uma transcrição de arquivo sem fala que deve ser refeita.
+    """
+    marker = no_speech_marker(video_id, words_dir)
+    if marker is None:
+        return False
+    threshold = SPEECH_TRIAGE_MIN_SPEECH_RATIO if threshold is None else threshold
+    return not speech_triage or marker["speech_ratio"] >= threshold
+
+
+def triage_queue(video_ids, audio_dir, words_dir, threshold=None):
+    """
+    Separa, em uma fila de transcrição, os arquivos sem fala (música, silêncio), gravando
+    para eles uma transcrição vazia.
+
+    Args:
+        video_ids (list): IDs dos vídeos a transcrever.
+        audio_dir (str): Diretório dos arquivos de áudio.
+        words_dir (str): Diretório das transcrições.
+        threshold (float, optional): Fração mínima de fala (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config).
+
+    Returns:
+        tuple: (IDs que ainda precisam ser transcritos, lista de resultados dos arquivos pulados,
+                cada um com video_id)
+    """
+    remaining, skipped = [], []
+    for video_id in video_ids:
+        audio_file = find_audio_file(video_id, audio_dir)
+        result = triage_file(audio_file, threshold) if audio_file else None
+        if result is None or result["has_speech"]:
+            remaining.append(video_id)
+            continue
+        logger.info(f"{video_id} sem fala suficiente ({result['speech_ratio']:.1%} de "
+                    f"{result['sampled_seconds']:.0f}s amostrados, {result['method']}); transcrição pulada")
+        write_no_speech_transcript(video_id, words_dir, result)
+        skipped.append(dict(result, video_id=video_id))
+    return remaining, skipped
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estima a fração de fala de arquivos de áudio.")
+    parser.add_argument("files", nargs="+", help="Arquivos de áudio")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"Fração mínima de fala (padrão: {SPEECH_TRIAGE_MIN_SPEECH_RATIO})")
+    args = parser.parse_args()
+    for path in args.files:
+        result = triage_file(path, args.threshold)
+        if result is None:
+            print(f"{os.path.basename(path)}: não foi possível decodificar")
+            continue
+        status = "fala" if result["has_speech"] else "sem fala"
+        print(f"{os.path.basename(path)}: {result['speech_ratio']:.1%} de fala ({status}; "
+              f"{result['sampled_seconds']:.0f}s amostrados em {result['elapsed']:.2f}s, {result['method']})")
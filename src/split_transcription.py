@@ -7,12 +7,20 @@ import re
 import json
 from pathlib import Path
 import sys
+import numpy as np
 from src.utils.logger import setup_logger
-from src.config import TARGET_WORDS_PER_BLOCK, WORDS_TOLERANCE, SECTIONS_DIR
+from src.config import (
+    TARGET_WORDS_PER_BLOCK, WORDS_TOLERANCE, SECTIONS_DIR, BLOCK_EDGE_REFINEMENT, BLOCK_EDGE_SEARCH_SECONDS,
+    SPEECH_TRIAGE_SILENCE_DB
+)
 
 # Configurar logger para este módulo
 logger = setup_logger(__name__)
 
+SAMPLE_RATE = 16000
+EDGE_FRAME_SECONDS = 0.03                  # Quadro da medida de energia no ajuste das bordas
+EDGE_NOISE_MARGIN_DB = 10                  # Fala: energia ao menos N dB acima do ruído de fundo da janela
+
 def split_transcription(text, target_words=None, tolerance=None):
     """
     Divide um texto de transcrição em blocos menores baseados em frases.
@@ -70,9 +78,11 @@ def split_transcription(text, target_words=None, tolerance=None):
         blocks.append(' '.join(current_block))
     return blocks
 
-def split_transcription_json(json_data, target_words=None, tolerance=None):
+def split_transcription_json(json_data, target_words=None, tolerance=None, load_audio=None):
     """
     Divide dados JSON de transcrição em blocos menores, preservando timestamps.
+    Transcrições sem timestamps de palavras são divididas nos limites dos segmentos
+    (ver split_transcription_segments).
     
     Args:
         json_data (list): Lista de segmentos de transcrição no formato JSON.
@@ -80,6 +90,9 @@ def split_transcription_json(json_data, target_words=None, tolerance=None):
                                       Se None, usa o valor da configuração.
         tolerance (int, optional): Tolerância no número de palavras. 
                                    Se None, usa o valor da configuração.
+        load_audio (callable, optional): Função sem argumentos que retorna o áudio decodificado
+                                         (16 kHz) ou None; chamada apenas para ajustar as bordas dos
+                                         blocos montados a partir dos segmentos.
     
     Returns:
         list: Lista de dicionários, cada um contendo um bloco com timestamps e texto.
@@ -97,9 +110,13 @@ def split_transcription_json(json_data, target_words=None, tolerance=None):
             for w in block["words"]:
                 all_words.append(w)
     
-    # Se não tiver palavras com timestamps, retorna vazio
+    # Sem timestamps de palavras, os blocos seguem os limites dos segmentos
     if not all_words:
-        return []
+        blocks = split_transcription_segments(json_data, target_words, tolerance)
+        audio = load_audio() if blocks and load_audio is not None else None
+        if audio is not None:
+            refine_block_edges(blocks, audio)
+        return blocks
     
     # Agora, agrupa as palavras em frases baseado em pontuação
     sentences = []
@@ -214,6 +231,161 @@ def split_transcription_json(json_data, target_words=None, tolerance=None):
     
     return blocks
 
+def split_transcription_segments(json_data, target_words=None, tolerance=None):
+    """
+    Divide uma transcrição sem timestamps de palavras em blocos, com as bordas nos limites
+    dos segmentos. Segmentos consecutivos são unidos em frases até um que termine em
+    pontuação, e as frases são agrupadas como em split_transcription.
+    
+    Args:
+        json_data (list): Lista de segmentos de transcrição no formato JSON.
+        target_words (int, optional): Número alvo de palavras por bloco.
+        tolerance (int, optional): Tolerância no número de palavras.
+    
+    Returns:
+        list: Lista de dicionários com start, end e text de cada bloco.
+    """
+    target_words = target_words or TARGET_WORDS_PER_BLOCK
+    tolerance = tolerance or WORDS_TOLERANCE
+    
+    # Agrupa os segmentos em frases (marcadores sem texto, como laços descartados, são ignorados)
+    sentences = []
+    current_sentence = []
+    for seg in json_data:
+        text = seg.get("text", "").strip()
+        if not text:
+            continue
+        current_sentence.append({"start": seg["start"], "end": seg["end"], "text": text})
+        if text.endswith(('.', '!', '?')):
+            sentences.append(current_sentence)
+            current_sentence = []
+    if current_sentence:
+        sentences.append(current_sentence)
+    
+    def make_block(sentence_list):
+        segments = [seg for sentence in sentence_list for seg in sentence]
+        return {
+            "start": segments[0]["start"],
+            "end": segments[-1]["end"],
+            "text": ' '.join(seg["text"] for seg in segments),
+        }
+    
+    blocks = []
+    current_block = []
+    current_count = 0
+    for sentence in sentences:
+        n_words = sum(len(seg["text"].split()) for seg in sentence)
+        # Se a frase for muito grande, vira um bloco sozinha
+        if n_words > target_words + tolerance:
+            if current_block:
+                blocks.append(make_block(current_block))
+                current_block = []
+                current_count = 0
+            blocks.append(make_block([sentence]))
+            continue
+        # Se a frase for muito pequena ou couber no bloco atual, só adiciona
+        if n_words < 10 or current_count + n_words <= target_words + tolerance:
+            current_block.append(sentence)
+            current_count += n_words
+            continue
+        # Fecha o bloco atual e começa outro
+        if current_block:
+            blocks.append(make_block(current_block))
+        current_block = [sentence]
+        current_count = n_words
+    if current_block:
+        blocks.append(make_block(current_block))
+    return blocks
+
+def _speech_edge(audio, time, limit, onset, sample_rate=SAMPLE_RATE):
+    """
+    Transição silêncio/fala mais próxima de time, procurada só no lado de dentro do bloco:
+    para a frente até limit no início do bloco (onset=True), para trás até limit no fim.
+    Se time já cai em fala (ou a janela não tem contraste de energia), time é mantido.
+    """
+    window_start = max(0.0, min(time, limit))
+    window_end = max(time, limit)
+    first = int(window_start * sample_rate)
+    samples = np.asarray(audio[first:int(window_end * sample_rate)], dtype=np.float32)
+    frame = int(EDGE_FRAME_SECONDS * sample_rate)
+    frames = samples[:len(samples) // frame * frame].reshape(-1, frame)
+    if len(frames) < 2:
+        return time
+    energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-12)
+    noise_floor = np.percentile(energy_db, 10)
+    if np.percentile(energy_db, 90) - noise_floor < EDGE_NOISE_MARGIN_DB:
+        # Fala contínua (ou só silêncio): não há borda a ajustar
+        return time
+    active = energy_db > max(SPEECH_TRIAGE_SILENCE_DB, noise_floor + EDGE_NOISE_MARGIN_DB)
+    if onset:
+        # Primeiro quadro de fala a partir da borda original
+        if active[0]:
+            return time
+        index = np.flatnonzero(active)
+        return window_start + index[0] * EDGE_FRAME_SECONDS if len(index) else time
+    # Último quadro de fala antes da borda original
+    if active[-1]:
+        return time
+    index = np.flatnonzero(active)
+    return window_start + (index[-1] + 1) * EDGE_FRAME_SECONDS if len(index) else time
+
+def refine_block_edges(blocks, audio, search_seconds=BLOCK_EDGE_SEARCH_SECONDS, sample_rate=SAMPLE_RATE):
+    """
+    Ajusta o início e o fim de cada bloco ao início/fim da fala no áudio.
+    
+    Os timestamps de segmento do Whisper costumam incluir parte do silêncio vizinho; em vez do
+    alinhamento de palavras da transcrição inteira, só uma janela curta dentro de cada borda
+    de bloco é analisada (energia por quadro acima do ruído de fundo da janela). As bordas só
+    avançam para dentro do bloco, de modo que nenhum bloco invade a fala do vizinho.
+    
+    Args:
+        blocks (list): Blocos de split_transcription_segments (alterados no lugar).
+        audio (np.ndarray): Áudio decodificado (pode ser um np.memmap: só as janelas são lidas).
+        search_seconds (float): Distância máxima (s) do ajuste em cada borda.
+        sample_rate (int): Taxa de amostragem do áudio.
+    
+    Returns:
+        list: Os mesmos blocos, com start/end ajustados.
+    """
+    for i, block in enumerate(blocks):
+        start, end = block["start"], block["end"]
+        reach = min(search_seconds, (end - start) / 2)
+        if reach > 0:
+            start = _speech_edge(audio, block["start"], block["start"] + reach, True, sample_rate)
+            end = _speech_edge(audio, block["end"], block["end"] - reach, False, sample_rate)
+        if i + 1 < len(blocks):
+            # O fim de um bloco nunca passa do início (original) do seguinte
+            end = min(end, blocks[i + 1]["start"])
+        if start < end:
+            block["start"], block["end"] = round(float(start), 3), round(float(end), 3)
+    return blocks
+
+def load_block_audio(video_id, audio_dir):
+    """
+    Retorna o áudio decodificado (cache mapeado em memória) usado no ajuste das bordas dos blocos.
+    
+    O ajuste só usa um áudio que já esteja no cache: a divisão (ex: --only-excel) nunca dispara
+    uma decodificação completa apenas para refinar as bordas.
+    
+    Args:
+        video_id (str): ID do vídeo.
+        audio_dir (str): Diretório dos arquivos de áudio.
+    
+    Returns:
+        np.ndarray or None: Áudio, ou None se o ajuste estiver desativado ou o áudio não estiver no cache.
+    """
+    if not BLOCK_EDGE_REFINEMENT:
+        return None
+    from src.utils.audio_files import find_audio_file
+    from src.audio_cache import cached_audio
+    audio_file = find_audio_file(video_id, audio_dir) if audio_dir else None
+    if not audio_file:
+        return None
+    audio = cached_audio(audio_file)
+    if audio is None:
+        logger.debug(f"Áudio de {video_id} não está no cache; bordas dos blocos mantidas")
+    return audio
+
 if __name__ == "__main__":
     """
     Execute o script diretamente para processar um arquivo JSON de transcrição.
@@ -0,0 +1,194 @@
+"""
+Módulo de escrita incremental de transcrições.
+Grava cada segmento em um arquivo parcial JSONL assim que é decodificado e, ao final,
+gera de forma atômica os arquivos {base_name}.txt, {base_name}.json e {base_name}.words.bin
+(formato colunar) em WORDS_DIR.
+Checkpoints periódicos permitem retomar uma transcrição interrompida.
+"""
+import os
+import json
+import time
+from datetime import datetime
+from src.utils.logger import setup_logger
+from src.word_store import WordStoreBuilder, word_store_path
+from src.config import WORDS_DIR, CHECKPOINT_INTERVAL_SECONDS, WORDS_JSON_ENABLED, WORD_STORE_ENABLED
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+
+def checkpoint_path(base_name, output_dir=None):
+    """Retorna o caminho do arquivo de checkpoint de uma transcrição."""
+    return os.path.join(str(output_dir or WORDS_DIR), f"{base_name}.checkpoint")
+
+
+def load_checkpoint(base_name, output_dir=None):
+    """
+    Carrega o checkpoint de uma transcrição interrompida, se existir.
+
+    Args:
+        base_name (str): Nome base dos arquivos de saída.
+        output_dir (str, optional): Diretório de saída (padrão: WORDS_DIR do config).
+
+    Returns:
+        dict or None: Conteúdo do checkpoint ou None se não houver checkpoint válido.
+    """
+    path = checkpoint_path(base_name, output_dir)
+    partial_path = os.path.join(str(output_dir or WORDS_DIR), f"{base_name}.partial.jsonl")
+    if not os.path.exists(path) or not os.path.exists(partial_path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Checkpoint inválido ignorado ({path}): {e}")
+        return None
+
+
+class StreamingTranscriptWriter:
+    """Escritor de segmentos em streaming com checkpoints e finalização atômica."""
+
+    def __init__(self, base_name, output_dir=None, resume=False, params=None):
+        """
+        Inicializa o escritor e abre o arquivo parcial.
+
+        Args:
+            base_name (str): Nome base para os arquivos de saída.
+            output_dir (str, optional): Diretório de saída (padrão: WORDS_DIR do config).
+            resume (bool): Se True, mantém os segmentos completos já gravados no arquivo
+                           parcial e continua a partir do último deles.
+            params (dict, optional): Parâmetros da transcrição gravados no checkpoint.
+        """
+        self.output_dir = str(output_dir or WORDS_DIR)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.base_name = base_name
+        self.params = params or {}
+        self.partial_path = os.path.join(self.output_dir, f"{base_name}.partial.jsonl")
+        self.checkpoint_path = checkpoint_path(base_name, self.output_dir)
+        self.output_txt = os.path.join(self.output_dir, f"{base_name}.txt")
+        self.output_json = os.path.join(self.output_dir, f"{base_name}.json")
+        self.output_store = word_store_path(base_name, self.output_dir)
+        self.segment_count = 0
+        self.last_end = 0.0
+        self._last_checkpoint = time.time()
+        if resume and os.path.exists(self.partial_path):
+            self._recover_partial()
+            self._partial = open(self.partial_path, 'a', encoding='utf-8')
+        else:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            self._partial = open(self.partial_path, 'w', encoding='utf-8')
+
+    def _recover_partial(self):
+        """Mantém apenas as linhas completas do arquivo parcial e restaura o progresso."""
+        valid_bytes = 0
+        with open(self.partial_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    seg_dict = json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                self.segment_count += 1
+                self.last_end = seg_dict["end"]
+        with open(self.partial_path, 'r+b') as f:
+            f.truncate(valid_bytes)
+        logger.info(f"Retomando {self.base_name}: {self.segment_count} segmentos recuperados até {self.last_end:.1f}s")
+
+    def write_segment(self, seg_dict):
+        """
+        Acrescenta um segmento ao arquivo parcial e grava um checkpoint periodicamente.
+
+        Args:
+            seg_dict (dict): Segmento no formato do JSON de palavras.
+        """
+        self._partial.write(json.dumps(seg_dict, ensure_ascii=False) + "\n")
+        self._partial.flush()
+        self.segment_count += 1
+        self.last_end = seg_dict["end"]
+        if time.time() - self._last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Grava de forma atômica o progresso atual (último segmento concluído)."""
+        data = {
+            "base_name": self.base_name,
+            "segment_count": self.segment_count,
+            "last_end": self.last_end,
+            "params": self.params,
+            "updated_at": datetime.now().isoformat(),
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+        self._last_checkpoint = time.time()
+
+    def iter_segments(self):
+        """Percorre os segmentos já gravados no arquivo parcial, um por vez."""
+        if not self._partial.closed:
+            self._partial.flush()
+        with open(self.partial_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def finalize(self):
+        """
+        Gera os arquivos finais a partir do arquivo parcial, sem carregar todos os segmentos
+        como dicionários em memória, e os move para o destino de forma atômica: o .txt, o .json
+        (se WORDS_JSON_ENABLED) e o .words.bin colunar (se WORD_STORE_ENABLED).
+
+        Returns:
+            tuple: Caminhos (output_txt, output_json) dos arquivos gerados; sem o JSON,
+                   o segundo caminho é o do arquivo colunar.
+        """
+        self._partial.close()
+        tmp_txt = self.output_txt + ".tmp"
+        tmp_json = self.output_json + ".tmp"
+        store = WordStoreBuilder() if WORD_STORE_ENABLED else None
+        f_json = open(tmp_json, 'w', encoding='utf-8') if WORDS_JSON_ENABLED else None
+        try:
+            with open(tmp_txt, 'w', encoding='utf-8') as f_txt:
+                first = first_text = True
+                for seg_dict in self.iter_segments():
+                    if f_json is not None:
+                        # Mesmo formato de json.dump(segmentos, indent=2)
+                        item = json.dumps(seg_dict, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                        f_json.write(("[\n  " if first else ",\n  ") + item)
+                    if store is not None:
+                        store.add_segment(seg_dict)
+                    if seg_dict["text"]:
+                        # Segmentos sem texto (ex: laços de alucinação descartados) não entram no .txt
+                        f_txt.write(seg_dict["text"] if first_text else " " + seg_dict["text"])
+                        first_text = False
+                    first = False
+                if f_json is not None:
+                    f_json.write("[]" if first else "\n]")
+        finally:
+            if f_json is not None:
+                f_json.close()
+        os.replace(tmp_txt, self.output_txt)
+        if f_json is not None:
+            os.replace(tmp_json, self.output_json)
+        if store is not None:
+            store.write(self.output_store)
+        os.remove(self.partial_path)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return self.output_txt, self.output_json if WORDS_JSON_ENABLED else self.output_store
+
+    def abort(self):
+        """Fecha o arquivo parcial sem gerar os arquivos finais, gravando um último checkpoint."""
+        if not self._partial.closed:
+            self._partial.close()
+            self.checkpoint()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
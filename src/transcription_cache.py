@@ -0,0 +1,204 @@
+"""
+Módulo de cache de transcrições endereçado por conteúdo.
+Identifica cada transcrição pelo hash dos bytes do áudio e pelos parâmetros de
+decodificação, reaproveitando o resultado para o mesmo áudio com outro nome/ID.
+"""
+import os
+import json
+import shutil
+import uuid
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from src.utils.logger import setup_logger
+from src.utils.file_hash import file_sha256
+from src.word_store import WORD_STORE_SUFFIX
+from src.config import TRANSCRIPTION_CACHE_DIR, TRANSCRIPTION_CACHE_ENABLED, WORDS_DIR
+
+try:
+    import fcntl
+except ImportError:                        # Windows: só o lock entre threads do processo
+    fcntl = None
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Arquivos de saída de uma transcrição armazenados no cache
+OUTPUT_SUFFIXES = (".txt", ".json", WORD_STORE_SUFFIX)
+
+
+def cache_key(audio_hash, params):
+    """
+    Gera a chave de cache a partir do hash do áudio e dos parâmetros de transcrição.
+
+    Args:
+        audio_hash (str): SHA-256 do arquivo de áudio.
+        params (dict): Backend, modelo, compute_type, idioma e parâmetros de decodificação.
+
+    Returns:
+        str: Chave hexadecimal.
+    """
+    payload = audio_hash + json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _tmp_path(destination):
+    """Temporário exclusivo de processo/chamada: processos do pool podem gravar a mesma entrada."""
+    return f"{destination}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def _copy_atomic(source, destination):
+    """Copia um arquivo para um temporário e o move para o destino."""
+    tmp_path = _tmp_path(destination)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class TranscriptionCache:
+    """Cache de transcrições em disco, indexado pelo conteúdo do áudio."""
+
+    def __init__(self, cache_dir=TRANSCRIPTION_CACHE_DIR, enabled=TRANSCRIPTION_CACHE_ENABLED):
+        """
+        Inicializa o cache.
+
+        Args:
+            cache_dir (str or Path): Diretório onde as transcrições são armazenadas.
+            enabled (bool): Se False, get/put não fazem nada.
+        """
+        self.cache_dir = str(cache_dir)
+        self.enabled = enabled
+        self.stats_file = os.path.join(self.cache_dir, "stats.json")
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".meta.json", {suffix: base + suffix for suffix in OUTPUT_SUFFIXES}
+
+    def get(self, audio_path, params, base_name, output_dir=None):
+        """
+        Materializa a transcrição em cache em {base_name}.txt/.json/.words.bin, se existir.
+
+        Args:
+            audio_path (str): Caminho do arquivo de áudio.
+            params (dict): Parâmetros de transcrição que compõem a chave.
+            base_name (str): Nome base dos arquivos de saída.
+            output_dir (str, optional): Diretório de saída (padrão: WORDS_DIR do config).
+
+        Returns:
+            dict or None: Metadados da entrada (inclui compute_seconds) em caso de hit, None em caso de miss.
+        """
+        if not self.enabled:
+            return None
+        key = cache_key(file_sha256(audio_path), params)
+        cached_meta, cached_files = self._paths(key)
+        if not os.path.exists(cached_meta):
+            self._record(hit=False)
+            return None
+
+        with open(cached_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        # Entradas antigas não registram os arquivos: apenas .txt e .json
+        suffixes = meta.get("files", [".txt", ".json"])
+        if not all(os.path.exists(cached_files[suffix]) for suffix in suffixes):
+            self._record(hit=False)
+            return None
+        output_dir = str(output_dir or WORDS_DIR)
+        os.makedirs(output_dir, exist_ok=True)
+        for suffix in suffixes:
+            _copy_atomic(cached_files[suffix], os.path.join(output_dir, f"{base_name}{suffix}"))
+        self._record(hit=True, saved_seconds=meta.get("compute_seconds", 0.0))
+        logger.info(f"Transcrição reaproveitada do cache para {base_name} "
+                    f"(origem: {meta.get('base_name')}, {meta.get('compute_seconds', 0.0):.1f}s economizados)")
+        return meta
+
+    def put(self, audio_path, params, base_name, compute_seconds, output_dir=None):
+        """
+        Armazena no cache a transcrição recém-gerada de {base_name}.
+
+        Args:
+            audio_path (str): Caminho do arquivo de áudio transcrito.
+            params (dict): Parâmetros de transcrição que compõem a chave.
+            base_name (str): Nome base dos arquivos de saída.
+            compute_seconds (float): Tempo gasto na transcrição.
+            output_dir (str, optional): Diretório de saída (padrão: WORDS_DIR do config).
+        """
+        if not self.enabled:
+            return
+        try:
+            audio_hash = file_sha256(audio_path)
+            key = cache_key(audio_hash, params)
+            cached_meta, cached_files = self._paths(key)
+            os.makedirs(os.path.dirname(cached_meta), exist_ok=True)
+            output_dir = str(output_dir or WORDS_DIR)
+            suffixes = []
+            for suffix, cached_path in cached_files.items():
+                output_path = os.path.join(output_dir, f"{base_name}{suffix}")
+                if os.path.exists(output_path):
+                    _copy_atomic(output_path, cached_path)
+                    suffixes.append(suffix)
+            meta = {
+                "base_name": base_name,
+                "audio_hash": audio_hash,
+                "params": params,
+                "compute_seconds": compute_seconds,
+                "files": suffixes,
+                "created_at": datetime.now().isoformat(),
+            }
+            tmp_meta = _tmp_path(cached_meta)
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_meta, cached_meta)
+        except OSError as e:
+            logger.warning(f"Não foi possível armazenar {base_name} no cache de transcrições: {e}")
+
+    @contextmanager
+    def _stats_lock(self):
+        """Exclusão mútua na atualização de stats.json entre threads e entre processos (flock)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.stats_file + ".lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _record(self, hit, saved_seconds=0.0):
+        """Atualiza as estatísticas acumuladas do cache."""
+        with self._stats_lock():
+            stats = self.stats()
+            stats["hits" if hit else "misses"] += 1
+            stats["saved_seconds"] += saved_seconds
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_stats = _tmp_path(self.stats_file)
+            with open(tmp_stats, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp_stats, self.stats_file)
+
+    def stats(self):
+        """
+        Retorna as estatísticas acumuladas do cache.
+
+        Returns:
+            dict: hits, misses e saved_seconds (tempo de transcrição economizado).
+        """
+        stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
+        if os.path.exists(self.stats_file):
+            try:
+                with open(self.stats_file, encoding='utf-8') as f:
+                    stats.update(json.load(f))
+            except (json.JSONDecodeError, OSError):
+                pass
+        return stats
+
+
+# Instância global do cache de transcrições
+transcription_cache = TranscriptionCache()
@@ -0,0 +1,336 @@
+"""
+Módulo do daemon de transcrição.
+Um processo de longa duração mantém os modelos carregados e atende pedidos de transcrição
+por um socket Unix local, evitando que cada execução da CLI reimporte torch/faster-whisper
+e recarregue o modelo. O protocolo é uma linha JSON de pedido e uma linha JSON de resposta;
+assim que lê o pedido, o daemon envia uma linha vazia (aceite) e, enquanto o processa, outras
+linhas vazias periódicas (sinais de vida), até TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT: o cliente
+detecta um daemon travado sem limitar a duração das transcrições normais.
+
+Uso:
+    python -m src.transcription_daemon --preload faster-whisper:small
+"""
+import os
+import time
+import json
+import socket
+import signal
+import argparse
+import threading
+import traceback
+import socketserver
+from src.utils.logger import setup_logger
+from src.config import (
+    TRANSCRIPTION_DAEMON_SOCKET, TRANSCRIPTION_DAEMON_ENABLED, TRANSCRIPTION_DAEMON_CONNECT_TIMEOUT,
+    TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS, TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT
+)
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+
+class DaemonRequestError(OSError):
+    """O daemon aceitou o pedido, mas a resposta não chegou (tempo esgotado ou conexão perdida)."""
+
+
+def _request(message, socket_path=None, timeout=None):
+    """
+    Envia um pedido ao daemon e retorna a resposta.
+
+    Args:
+        message (dict): Pedido serializável em JSON.
+        socket_path (str, optional): Caminho do socket (padrão: TRANSCRIPTION_DAEMON_SOCKET).
+        timeout (float, optional): Tempo máximo (s) sem receber a resposta nem um sinal de vida
+                                   (padrão: 3 intervalos de TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS).
+
+    Returns:
+        dict: Resposta do daemon.
+
+    Raises:
+        OSError: Se o daemon não estiver em execução ou não aceitar o pedido.
+        DaemonRequestError: Se o daemon aceitou o pedido, mas não respondeu a tempo ou a conexão caiu
+                            (o pedido pode continuar em andamento no daemon).
+    """
+    socket_path = str(socket_path or TRANSCRIPTION_DAEMON_SOCKET)
+    if timeout is None:
+        timeout = 3 * TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(min(timeout, TRANSCRIPTION_DAEMON_CONNECT_TIMEOUT))
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            # A primeira linha (aceite) confirma que o daemon leu o pedido
+            line = f.readline()
+            if not line:
+                raise ConnectionError("O daemon encerrou a conexão sem aceitar o pedido")
+            sock.settimeout(timeout)
+            try:
+                # Linhas vazias são sinais de vida enviados durante pedidos longos
+                while line == b"\n":
+                    line = f.readline()
+            except OSError as e:
+                raise DaemonRequestError(f"Sem resposta do daemon para o pedido aceito: {e}") from e
+    if not line:
+        raise DaemonRequestError("O daemon encerrou a conexão sem responder ao pedido aceito")
+    return json.loads(line)
+
+
+def daemon_status(socket_path=None):
+    """
+    Consulta o daemon de transcrição.
+
+    Args:
+        socket_path (str, optional): Caminho do socket (padrão: TRANSCRIPTION_DAEMON_SOCKET).
+
+    Returns:
+        dict: PID, modelos carregados e pedidos atendidos, ou None se o daemon não estiver em execução.
+    """
+    socket_path = str(socket_path or TRANSCRIPTION_DAEMON_SOCKET)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        return _request({"command": "status"}, socket_path, timeout=5)
+    except (OSError, ValueError):
+        return None
+
+
+def transcribe_via_daemon(backend, video_id, audio_dir, stats=None, socket_path=None, **options):
+    """
+    Transcreve um video_id no daemon, se ele estiver em execução.
+
+    Args:
+        backend (str): Nome do backend de transcrição.
+        video_id (str): ID do vídeo cujo áudio está em audio_dir.
+        audio_dir (str): Diretório dos arquivos de áudio.
+        stats (dict, optional): Dicionário preenchido com as estatísticas da transcrição.
+        socket_path (str, optional): Caminho do socket (padrão: TRANSCRIPTION_DAEMON_SOCKET).
+        **options: Opções repassadas a transcribe_audio_by_video_id no daemon.
+
+    Returns:
+        bool: Resultado da transcrição, ou None se o daemon não estiver disponível ou não aceitar o
+              pedido (o chamador deve então transcrever no próprio processo). Depois de aceito, o
+              pedido nunca volta para o chamador: erros e tempo esgotado resultam em False, para que
+              dois processos não gravem os mesmos arquivos parciais.
+    """
+    socket_path = str(socket_path or TRANSCRIPTION_DAEMON_SOCKET)
+    if not TRANSCRIPTION_DAEMON_ENABLED or not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    message = {
+        "command": "transcribe",
+        "backend": backend,
+        "video_id": video_id,
+        "audio_dir": os.path.abspath(audio_dir) if audio_dir else None,
+        "options": {key: value for key, value in options.items() if value is not None},
+    }
+    try:
+        response = _request(message, socket_path)
+    except (DaemonRequestError, ValueError) as e:
+        logger.error(f"Transcrição de {video_id} no daemon sem resultado: {e}")
+        return False
+    except OSError as e:
+        logger.warning(f"Daemon de transcrição indisponível ({e}); transcrevendo no próprio processo")
+        return None
+    if "error" in response:
+        logger.error(f"Erro no daemon ao transcrever {video_id}: {response['error']}")
+        return False
+    if stats is not None:
+        stats.update(response.get("stats", {}))
+        stats["daemon"] = True
+    logger.info(f"Transcrição de {video_id} feita pelo daemon (PID {response.get('pid')})")
+    return bool(response.get("success"))
+
+
+def triage_via_daemon(audio_path, threshold=None, socket_path=None):
+    """
+    Faz a triagem de fala de um arquivo no daemon, se ele estiver em execução: o VAD do
+    Faster-Whisper é usado lá, sem importá-lo no processo da CLI.
+
+    Args:
+        audio_path (str): Caminho do arquivo de áudio.
+        threshold (float, optional): Fração mínima de fala (padrão: SPEECH_TRIAGE_MIN_SPEECH_RATIO do config).
+        socket_path (str, optional): Caminho do socket (padrão: TRANSCRIPTION_DAEMON_SOCKET).
+
+    Returns:
+        dict or None: Resultado de triage_file, ou None se o daemon não estiver disponível ou falhar.
+    """
+    socket_path = str(socket_path or TRANSCRIPTION_DAEMON_SOCKET)
+    if not TRANSCRIPTION_DAEMON_ENABLED or not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    message = {"command": "triage", "audio_path": os.path.abspath(audio_path), "threshold": threshold}
+    try:
+        response = _request(message, socket_path)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Triagem no daemon indisponível ({e})")
+        return None
+    if "error" in response:
+        logger.warning(f"Erro na triagem pelo daemon: {response['error']}")
+        return None
+    return response.get("result")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Atende uma conexão: lê um pedido JSON e escreve a resposta JSON."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        write_lock = threading.Lock()
+        done = threading.Event()
+        # Início do processamento (atualizado quando o pedido deixa a fila de transcrições)
+        started = [time.time()]
+
+        def heartbeat():
+            # Sinais de vida enquanto o pedido é processado (ex: transcrições de horas)
+            while not done.wait(TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS):
+                if time.time() - started[0] > TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT:
+                    # Transcrição provavelmente travada: sem sinais de vida, o cliente desiste
+                    logger.error(f"Pedido excedeu {TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT}s; sinais de vida interrompidos")
+                    return
+                with write_lock:
+                    try:
+                        self.wfile.write(b"\n")
+                    except OSError:
+                        return
+
+        try:
+            # Aceite: a partir daqui o cliente não transcreve mais o pedido por conta própria
+            self.wfile.write(b"\n")
+        except OSError:
+            return
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            response = self.server.daemon.handle(json.loads(line), on_start=lambda: started.__setitem__(0, time.time()))
+        except Exception as e:
+            logger.debug(traceback.format_exc())
+            response = {"success": False, "error": str(e)}
+        finally:
+            done.set()
+        response["pid"] = os.getpid()
+        with write_lock:
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TranscriptionDaemon:
+    """Servidor de transcrição com modelos mantidos em memória entre os pedidos."""
+
+    def __init__(self, socket_path=None):
+        """
+        Inicializa o daemon (sem abrir o socket).
+
+        Args:
+            socket_path (str, optional): Caminho do socket (padrão: TRANSCRIPTION_DAEMON_SOCKET).
+        """
+        self.socket_path = str(socket_path or TRANSCRIPTION_DAEMON_SOCKET)
+        # As transcrições são feitas uma por vez: cada uma já usa todos os núcleos/GPU
+        self._transcribe_lock = threading.Lock()
+        self.requests = 0
+        self.warmup = []
+        self.server = None
+
+    def preload(self, backend, model_size=None):
+        """
+        Carrega um modelo antes do primeiro pedido (warm-up), a partir do repositório local de modelos.
+
+        Args:
+            backend (str): Nome do backend de transcrição.
+            model_size (str, optional): Tamanho do modelo (padrão: o do backend).
+        """
+        from src.backends import create_transcriber
+        from src.autotune import apply_tuned_settings
+        transcriber = create_transcriber(backend, model_size=model_size)
+        # Mesma configuração do pipeline, para que os pedidos encontrem o modelo no cache
+        apply_tuned_settings(transcriber)
+        logger.info(f"Pré-carregando modelo {transcriber.model_size} ({backend}, {transcriber.device})")
+        start_time = time.time()
+        transcriber.load()
+        warmup_seconds = time.time() - start_time
+        # O modelo fica no cache do processo para os pedidos; o warm-up não o mantém em uso
+        transcriber.release()
+        logger.info(f"Warm-up de {backend}:{transcriber.model_size} concluído em {warmup_seconds:.1f}s")
+        self.warmup.append({"backend": backend, "model_size": transcriber.model_size,
+                            "compute_type": transcriber.compute_type, "seconds": round(warmup_seconds, 2)})
+
+    def handle(self, message, on_start=None):
+        """
+        Processa um pedido.
+
+        Args:
+            message (dict): Pedido com command ("status", "triage" ou "transcribe") e seus parâmetros.
+            on_start (callable, optional): Chamada quando a transcrição sai da fila e começa.
+
+        Returns:
+            dict: Resposta serializável em JSON.
+        """
+        from src.model_registry import model_registry
+
+        command = message.get("command")
+        if command == "status":
+            return {"requests": self.requests, "busy": self._transcribe_lock.locked(), "warmup": self.warmup,
+                    **model_registry.stats()}
+        if command == "triage":
+            from src.speech_triage import triage_file
+            return {"result": triage_file(message["audio_path"], message.get("threshold"), use_daemon=False)}
+        if command != "transcribe":
+            return {"success": False, "error": f"Comando desconhecido: {command}"}
+
+        from src.backends import get_backend
+        backend_cls = get_backend(message.get("backend"))
+        stats = {}
+        with self._transcribe_lock:
+            if on_start is not None:
+                on_start()
+            self.requests += 1
+            logger.info(f"Pedido {self.requests}: transcrever {message['video_id']} ({backend_cls.name})")
+            success = backend_cls.pipeline().transcribe_audio_by_video_id(
+                message["video_id"], message.get("audio_dir"), stats=stats, use_daemon=False,
+                **message.get("options", {})
+            )
+        return {"success": bool(success), "stats": stats}
+
+    def serve_forever(self):
+        """Abre o socket e atende pedidos até receber SIGINT/SIGTERM."""
+        if daemon_status(self.socket_path) is not None:
+            raise RuntimeError(f"Já existe um daemon de transcrição em {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            # Socket órfão de uma execução anterior interrompida
+            os.remove(self.socket_path)
+
+        self.server = _UnixServer(self.socket_path, _RequestHandler)
+        self.server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.server.shutdown).start())
+        logger.info(f"Daemon de transcrição ouvindo em {self.socket_path} (PID {os.getpid()})")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logger.info("Daemon de transcrição encerrado")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daemon de transcrição com modelos mantidos em memória.")
+    parser.add_argument("--socket", default=str(TRANSCRIPTION_DAEMON_SOCKET),
+                        help=f"Caminho do socket Unix (padrão: {TRANSCRIPTION_DAEMON_SOCKET})")
+    parser.add_argument("--preload", nargs="*", default=[], metavar="BACKEND[:MODELO]",
+                        help="Modelos carregados na inicialização (ex: faster-whisper:small)")
+    parser.add_argument("--status", action="store_true", help="Mostra o estado do daemon em execução e sai")
+    args = parser.parse_args()
+
+    if args.status:
+        status = daemon_status(args.socket)
+        print(json.dumps(status, indent=2) if status else "Daemon de transcrição não está em execução.")
+    else:
+        daemon = TranscriptionDaemon(args.socket)
+        for spec in args.preload:
+            backend, _, model_size = spec.partition(":")
+            daemon.preload(backend, model_size or None)
+        daemon.serve_forever()
@@ -0,0 +1,48 @@
+"""
+Módulo utilitário para localizar arquivos de áudio.
+Compartilhado pelos backends de transcrição.
+"""
+import os
+from src.utils.logger import setup_logger
+from src.config import SUPPORTED_AUDIO_FORMATS
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+def read_audio_files(audio_dir):
+    """
+    Lista todos os arquivos de áudio suportados em um diretório.
+
+    Args:
+        audio_dir (str): Caminho do diretório contendo os arquivos de áudio.
+
+    Returns:
+        list: Lista de nomes de arquivos de áudio no diretório.
+    """
+    try:
+        supported_files = []
+        for f in os.listdir(audio_dir):
+            if any(f.lower().endswith(ext) for ext in SUPPORTED_AUDIO_FORMATS):
+                supported_files.append(f)
+        return supported_files
+    except Exception as e:
+        logger.error(f"Erro ao listar arquivos de áudio em {audio_dir}: {e}")
+        return []
+
+def find_audio_file(video_id, audio_dir):
+    """
+    Encontra o arquivo de áudio correspondente a um video_id, suportando múltiplos formatos.
+
+    Args:
+        video_id (str): ID do vídeo para procurar
+        audio_dir (str): Diretório onde procurar os arquivos
+
+    Returns:
+        str or None: Caminho do arquivo encontrado ou None se não encontrado
+    """
+    for ext in SUPPORTED_AUDIO_FORMATS:
+        potential_file = os.path.join(audio_dir, f"{video_id}{ext}")
+        if os.path.exists(potential_file):
+            return potential_file
+
+    return None
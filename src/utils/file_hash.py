@@ -0,0 +1,39 @@
+"""
+Módulo utilitário para cálculo de hash de arquivos.
+Mantém em memória o hash já calculado de cada arquivo enquanto tamanho e data de
+modificação não mudarem, evitando reler arquivos grandes de áudio.
+"""
+import os
+import hashlib
+import threading
+
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo.
+
+    Args:
+        path (str): Caminho do arquivo.
+        chunk_size (int): Tamanho dos blocos lidos do disco.
+
+    Returns:
+        str: Hash hexadecimal do conteúdo.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        if memo_key in _hash_cache:
+            return _hash_cache[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    file_hash = digest.hexdigest()
+
+    with _hash_lock:
+        _hash_cache[memo_key] = file_hash
+    return file_hash
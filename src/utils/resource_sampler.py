@@ -0,0 +1,275 @@
+"""
+Módulo de amostragem de recursos por etapa do pipeline.
+Registra periodicamente, em uma thread de fundo, a memória residente (RSS), o uso de CPU,
+o número de threads, os bytes lidos/gravados em disco e, quando a GPU está em uso, a
+memória alocada pelo torch. Usa o psutil se instalado (incluindo processos filhos, como
+os do pool de transcrição); sem ele, lê /proc do processo atual.
+"""
+import os
+import sys
+import time
+import threading
+from src.config import RESOURCE_SAMPLING_ENABLED, RESOURCE_SAMPLE_INTERVAL
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Campos cujo valor máximo é registrado em "peaks"
+PEAK_FIELDS = ("rss_mb", "cpu_percent", "threads", "gpu_mb")
+
+
+def _read_proc_status():
+    """Lê VmRSS (MB) e Threads de /proc/self/status."""
+    values = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    values["rss_mb"] = int(line.split()[1]) / 1024
+                elif line.startswith("Threads:"):
+                    values["threads"] = int(line.split()[1])
+    except OSError:
+        values["threads"] = threading.active_count()
+    return values
+
+
+def _read_proc_io():
+    """Lê os bytes lidos e gravados em disco de /proc/self/io (pode não ser permitido)."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _gpu_memory_mb():
+    """Memória da GPU alocada pelo torch, apenas se ele já foi importado e há CUDA."""
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            return torch.cuda.memory_allocated(0) / 1024 ** 2
+    except Exception:
+        pass
+    return None
+
+
+class ResourceSampler:
+    """Coleta uma série temporal de uso de recursos enquanto uma etapa do pipeline executa."""
+
+    def __init__(self, stage=None, interval=None, include_children=True):
+        """
+        Inicializa o amostrador (a coleta começa em start() ou ao entrar no bloco 'with').
+
+        Args:
+            stage (str, optional): Nome da etapa (ex: "download", "transcription").
+            interval (float, optional): Intervalo (s) entre amostras (padrão: RESOURCE_SAMPLE_INTERVAL).
+            include_children (bool): Se True e o psutil estiver instalado, soma os processos filhos.
+        """
+        self.stage = stage
+        self.interval = interval or RESOURCE_SAMPLE_INTERVAL
+        self.include_children = include_children
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._end_time = None
+        self._process = psutil.Process() if psutil is not None else None
+        self._children = {}
+        self._last_cpu = None
+        self._io_last = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """Inicia a coleta em segundo plano."""
+        self._start_time = time.time()
+        self._last_cpu = (time.time(), sum(os.times()[:2]))
+        if self._process is not None:
+            self._process.cpu_percent(None)
+        self._io_last = self._read_io()
+        self._thread = threading.Thread(target=self._run, name=f"resource-sampler-{self.stage}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra a coleta, registrando uma última amostra."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._take_sample()
+        self._end_time = time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._take_sample()
+
+    def _processes(self):
+        """Processo atual e, se solicitado, seus filhos (mantendo o estado de cpu_percent de cada um)."""
+        processes = [self._process]
+        if self.include_children:
+            try:
+                children = self._process.children(recursive=True)
+            except psutil.Error:
+                children = []
+            alive = {}
+            for child in children:
+                if child.pid not in self._children:
+                    try:
+                        child.cpu_percent(None)
+                    except psutil.Error:
+                        continue
+                alive[child.pid] = self._children.get(child.pid, child)
+            self._children = alive
+            processes += list(alive.values())
+        return processes
+
+    def _read_io(self):
+        """Bytes lidos e gravados em disco até o momento."""
+        if self._process is not None:
+            read_bytes = write_bytes = 0
+            for process in [self._process, *self._children.values()]:
+                try:
+                    counters = process.io_counters()
+                except (psutil.Error, AttributeError):
+                    continue
+                read_bytes += counters.read_bytes
+                write_bytes += counters.write_bytes
+            return read_bytes, write_bytes
+        return _read_proc_io()
+
+    def _take_sample(self):
+        sample = {"t": round(time.time() - self._start_time, 3)}
+        if self._process is not None:
+            rss = cpu = threads = 0
+            for process in self._processes():
+                try:
+                    with process.oneshot():
+                        rss += process.memory_info().rss
+                        cpu += process.cpu_percent(None)
+                        threads += process.num_threads()
+                except psutil.Error:
+                    continue
+            sample.update({"rss_mb": rss / 1024 ** 2, "cpu_percent": cpu, "threads": threads})
+        else:
+            sample.update(_read_proc_status())
+            now, cpu_time = time.time(), sum(os.times()[:2])
+            last_time, last_cpu_time = self._last_cpu
+            if now > last_time:
+                sample["cpu_percent"] = 100 * (cpu_time - last_cpu_time) / (now - last_time)
+            self._last_cpu = (now, cpu_time)
+
+        read_bytes, write_bytes = self._read_io()
+        if read_bytes is not None and self._io_last[0] is not None:
+            # Processos filhos que terminam saem da soma; a diferença nunca é negativa
+            sample["read_bytes"] = max(0, read_bytes - self._io_last[0])
+            sample["write_bytes"] = max(0, write_bytes - self._io_last[1])
+            self._io_last = (read_bytes, write_bytes)
+
+        gpu_mb = _gpu_memory_mb()
+        if gpu_mb is not None:
+            sample["gpu_mb"] = gpu_mb
+        for key in ("rss_mb", "cpu_percent", "gpu_mb"):
+            if key in sample:
+                sample[key] = round(sample[key], 1)
+        self.samples.append(sample)
+
+    def summary(self, include_samples=True):
+        """
+        Retorna o resumo da coleta.
+
+        Args:
+            include_samples (bool): Se True, inclui a série temporal completa.
+
+        Returns:
+            dict: stage, duration_seconds, interval, peaks (máximos de rss_mb, cpu_percent, threads
+                  e gpu_mb), mean_cpu_percent, read_bytes, write_bytes e, opcionalmente, samples.
+        """
+        end_time = self._end_time or time.time()
+        peaks = {}
+        for key in PEAK_FIELDS:
+            values = [s[key] for s in self.samples if key in s]
+            if values:
+                peaks[key] = max(values)
+        cpu_values = [s["cpu_percent"] for s in self.samples if "cpu_percent" in s]
+        result = {
+            "stage": self.stage,
+            "duration_seconds": round(end_time - self._start_time, 3) if self._start_time else 0.0,
+            "interval": self.interval,
+            "peaks": peaks,
+            "mean_cpu_percent": round(sum(cpu_values) / len(cpu_values), 1) if cpu_values else None,
+            "read_bytes": sum(s.get("read_bytes", 0) for s in self.samples),
+            "write_bytes": sum(s.get("write_bytes", 0) for s in self.samples),
+        }
+        if include_samples:
+            result["samples"] = self.samples
+        return result
+
+
+class StageSampler:
+    """Amostra as etapas sucessivas de uma execução e grava o resumo de cada uma em report["resources"]."""
+
+    def __init__(self, report, interval=None):
+        """
+        Inicializa o amostrador de etapas.
+
+        Não faz nada se report for None ou se a amostragem estiver desativada no config.
+
+        Args:
+            report (dict): Relatório da execução (ex: run_report de process_all).
+            interval (float, optional): Intervalo (s) entre amostras.
+        """
+        self.report = report if RESOURCE_SAMPLING_ENABLED else None
+        self.interval = interval
+        self._sampler = None
+
+    def begin(self, stage):
+        """
+        Inicia a amostragem de uma etapa, encerrando a etapa anterior.
+
+        Args:
+            stage (str): Nome da etapa.
+        """
+        self.end()
+        if self.report is not None:
+            self._sampler = ResourceSampler(stage, self.interval).start()
+
+    def end(self):
+        """Encerra a etapa atual (se houver) e grava o seu resumo no relatório."""
+        if self._sampler is None:
+            return
+        self._sampler.stop()
+        self.report.setdefault("resources", {})[self._sampler.stage] = self._sampler.summary()
+        self._sampler = None
+
+
+def format_peaks(summary):
+    """
+    Formata os picos de um resumo para exibição em log.
+
+    Args:
+        summary (dict): Resultado de ResourceSampler.summary.
+
+    Returns:
+        str: Texto como "RSS 812 MB, CPU 395% (média 310%), 12 threads, GPU 1540 MB".
+    """
+    peaks = summary.get("peaks", {})
+    parts = []
+    if "rss_mb" in peaks:
+        parts.append(f"RSS {peaks['rss_mb']:.0f} MB")
+    if "cpu_percent" in peaks:
+        mean = summary.get("mean_cpu_percent")
+        parts.append(f"CPU {peaks['cpu_percent']:.0f}%" + (f" (média {mean:.0f}%)" if mean is not None else ""))
+    if "threads" in peaks:
+        parts.append(f"{peaks['threads']} threads")
+    if "gpu_mb" in peaks:
+        parts.append(f"GPU {peaks['gpu_mb']:.0f} MB")
+    return ", ".join(parts) or "sem amostras"
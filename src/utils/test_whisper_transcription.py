@@ -1,6 +1,5 @@
 from src.utils.extract_video_id import extract_video_id
-from src.generate_transcription import transcribe_audio as whisper_transcribe_audio
-from src.generate_transcription_fw import transcribe_audio as fw_transcribe_audio
+from src.backends import get_backend
 from src.download_audio import read_urls, download_audio
 import os
 
@@ -23,10 +22,7 @@ def test_whisper_transcription(video_id, audio_dir, transcript_dir, force_cpu=Fa
             print(f"Falha ao baixar áudio de teste para {video_id}")
             return
     print(f"Transcrevendo áudio de teste para {video_id}...")
-    if use_whisper:
-        whisper_transcribe_audio(audio_file, transcription_file)
-    else:
-        fw_transcribe_audio(audio_file, transcription_file)
+    get_backend("whisper" if use_whisper else "faster-whisper").transcribe_file(audio_file, transcription_file)
     print(f"Transcrição de teste salva em {transcription_file} e segmentos em {segments_file}")
 
 if __name__ == "__main__":
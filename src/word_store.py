@@ -0,0 +1,381 @@
+"""
+Módulo de armazenamento colunar de timestamps de palavras.
+Grava os segmentos de uma transcrição em um único arquivo binário ({base_name}.words.bin),
+com colunas float32 (início, fim, probabilidade), textos UTF-8 indexados por offsets e uma
+tabela de segmentos; chaves adicionais dos segmentos (ex: hallucination, no_speech) são
+guardadas como JSON por segmento. A leitura é feita por mapeamento em memória, sem cópia, com acesso
+aleatório por intervalo de tempo.
+
+Layout do arquivo:
+    magic (4 bytes) | versão (uint32) | tamanho do cabeçalho (uint32) | cabeçalho JSON |
+    colunas alinhadas em 8 bytes, descritas no cabeçalho (dtype, quantidade e offset).
+"""
+import os
+import json
+import struct
+from array import array
+import numpy as np
+from src.utils.logger import setup_logger
+from src.config import WORDS_DIR
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+WORD_STORE_SUFFIX = ".words.bin"
+MAGIC = b"YTWS"
+VERSION = 1
+ALIGNMENT = 8
+
+# Campos opcionais de confiança dos segmentos (NaN quando ausentes)
+SEGMENT_METRICS = ("avg_logprob", "compression_ratio", "no_speech_prob")
+# Chaves gravadas em colunas próprias; as demais vão para o JSON adicional do segmento
+SEGMENT_COLUMN_KEYS = frozenset(("id", "start", "end", "text", "words") + SEGMENT_METRICS)
+
+
+def word_store_path(base_name, output_dir=None):
+    """Retorna o caminho do arquivo colunar de uma transcrição."""
+    return os.path.join(str(output_dir or WORDS_DIR), f"{base_name}{WORD_STORE_SUFFIX}")
+
+
+def _to_float(value):
+    return float("nan") if value is None else float(value)
+
+
+def _time(value):
+    # Timestamps em float32: arredonda ao milissegundo para não expor o ruído de precisão
+    return round(float(value), 3)
+
+
+def _from_float(value, digits=4):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class WordStoreBuilder:
+    """Acumula segmentos em colunas compactas e grava o arquivo colunar."""
+
+    def __init__(self):
+        self.seg_id = array('i')
+        self.seg_start = array('f')
+        self.seg_end = array('f')
+        self.seg_metrics = {field: array('f') for field in SEGMENT_METRICS}
+        self.seg_word_offsets = array('I', [0])
+        self.seg_text_offsets = array('I', [0])
+        self.seg_text = bytearray()
+        self.seg_extra_offsets = array('I', [0])
+        self.seg_extra = bytearray()
+        self.word_start = array('f')
+        self.word_end = array('f')
+        self.word_prob = array('f')
+        self.word_text_offsets = array('I', [0])
+        self.word_text = bytearray()
+
+    def add_segment(self, seg_dict):
+        """
+        Acrescenta um segmento no formato do JSON de palavras.
+
+        Args:
+            seg_dict (dict): Segmento com id, start, end, text e, opcionalmente, words, métricas
+                             de confiança e outras chaves serializáveis em JSON.
+        """
+        self.seg_id.append(seg_dict.get("id") if seg_dict.get("id") is not None else len(self.seg_id) + 1)
+        self.seg_start.append(seg_dict["start"])
+        self.seg_end.append(seg_dict["end"])
+        for field in SEGMENT_METRICS:
+            self.seg_metrics[field].append(_to_float(seg_dict.get(field)))
+        self.seg_text.extend(seg_dict.get("text", "").encode("utf-8"))
+        self.seg_text_offsets.append(len(self.seg_text))
+        extra = {key: value for key, value in seg_dict.items() if key not in SEGMENT_COLUMN_KEYS}
+        if extra:
+            self.seg_extra.extend(json.dumps(extra, ensure_ascii=False).encode("utf-8"))
+        self.seg_extra_offsets.append(len(self.seg_extra))
+        for w in seg_dict.get("words") or []:
+            self.word_start.append(w["start"])
+            self.word_end.append(w["end"])
+            self.word_prob.append(_to_float(w.get("probability")))
+            self.word_text.extend(w["word"].encode("utf-8"))
+            self.word_text_offsets.append(len(self.word_text))
+        self.seg_word_offsets.append(len(self.word_start))
+
+    def write(self, path):
+        """
+        Grava o arquivo colunar de forma atômica.
+
+        Args:
+            path (str): Caminho do arquivo de destino.
+
+        Returns:
+            str: Caminho do arquivo gravado.
+        """
+        columns = {
+            "seg_id": np.frombuffer(self.seg_id, dtype=np.int32),
+            "seg_start": np.frombuffer(self.seg_start, dtype=np.float32),
+            "seg_end": np.frombuffer(self.seg_end, dtype=np.float32),
+            "seg_word_offsets": np.frombuffer(self.seg_word_offsets, dtype=np.uint32),
+            "seg_text_offsets": np.frombuffer(self.seg_text_offsets, dtype=np.uint32),
+            "seg_text": np.frombuffer(bytes(self.seg_text), dtype=np.uint8),
+            "seg_extra_offsets": np.frombuffer(self.seg_extra_offsets, dtype=np.uint32),
+            "seg_extra": np.frombuffer(bytes(self.seg_extra), dtype=np.uint8),
+            "word_start": np.frombuffer(self.word_start, dtype=np.float32),
+            "word_end": np.frombuffer(self.word_end, dtype=np.float32),
+            "word_prob": np.frombuffer(self.word_prob, dtype=np.float32),
+            "word_text_offsets": np.frombuffer(self.word_text_offsets, dtype=np.uint32),
+            "word_text": np.frombuffer(bytes(self.word_text), dtype=np.uint8),
+        }
+        for field in SEGMENT_METRICS:
+            columns[f"seg_{field}"] = np.frombuffer(self.seg_metrics[field], dtype=np.float32)
+
+        word_start = columns["word_start"]
+        header = {
+            "segments": len(self.seg_start),
+            "words": len(word_start),
+            # Permite a busca binária por tempo quando os inícios das palavras são crescentes
+            "sorted": bool(np.all(np.diff(word_start) >= 0)),
+            "columns": {},
+        }
+        offset = 0
+        for name, values in columns.items():
+            header["columns"][name] = {"dtype": values.dtype.str, "count": len(values), "offset": offset}
+            offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_len = 12 + len(header_bytes)
+        data_start = -(-prefix_len // ALIGNMENT) * ALIGNMENT
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack("<II", VERSION, len(header_bytes)) + header_bytes)
+            f.write(b"\0" * (data_start - prefix_len))
+            for values in columns.values():
+                f.write(values.tobytes())
+                f.write(b"\0" * (-values.nbytes % ALIGNMENT))
+        os.replace(tmp_path, path)
+        return path
+
+
+def write_word_store(segments, path):
+    """
+    Grava uma lista (ou iterador) de segmentos no formato colunar.
+
+    Args:
+        segments (iterable): Segmentos no formato do JSON de palavras.
+        path (str): Caminho do arquivo de destino.
+
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    builder = WordStoreBuilder()
+    for seg_dict in segments:
+        builder.add_segment(seg_dict)
+    return builder.write(path)
+
+
+class WordStore:
+    """Leitura mapeada em memória de um arquivo colunar de palavras."""
+
+    def __init__(self, path):
+        """
+        Abre o arquivo colunar. As colunas são visões sem cópia sobre o mapeamento.
+
+        Args:
+            path (str): Caminho do arquivo .words.bin.
+        """
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._buffer[:4]) != MAGIC:
+            raise ValueError(f"Arquivo colunar de palavras inválido: {path}")
+        version, header_len = struct.unpack("<II", bytes(self._buffer[4:12]))
+        if version != VERSION:
+            raise ValueError(f"Versão não suportada do arquivo colunar ({version}): {path}")
+        self.header = json.loads(bytes(self._buffer[12:12 + header_len]).decode("utf-8"))
+        data_start = -(-(12 + header_len) // ALIGNMENT) * ALIGNMENT
+        self.columns = {}
+        for name, spec in self.header["columns"].items():
+            dtype = np.dtype(spec["dtype"])
+            start = data_start + spec["offset"]
+            self.columns[name] = self._buffer[start:start + spec["count"] * dtype.itemsize].view(dtype)
+
+    def __len__(self):
+        return self.header["words"]
+
+    @property
+    def segment_count(self):
+        """Número de segmentos armazenados."""
+        return self.header["segments"]
+
+    def _text(self, blob, offsets, index):
+        return bytes(self.columns[blob][offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    def word(self, index):
+        """
+        Retorna uma palavra no formato do JSON de palavras.
+
+        Args:
+            index (int): Índice global da palavra.
+
+        Returns:
+            dict: word, start, end e probability.
+        """
+        return {
+            "word": self._text("word_text", self.columns["word_text_offsets"], index),
+            "start": _time(self.columns["word_start"][index]),
+            "end": _time(self.columns["word_end"][index]),
+            "probability": _from_float(self.columns["word_prob"][index]),
+        }
+
+    def segment(self, index, include_words=True):
+        """
+        Retorna um segmento no formato do JSON de palavras.
+
+        Args:
+            index (int): Índice do segmento.
+            include_words (bool): Se True, inclui a lista de palavras.
+
+        Returns:
+            dict: Segmento com id, start, end, text, métricas de confiança, chaves adicionais e palavras.
+        """
+        cols = self.columns
+        seg_dict = {
+            "id": int(cols["seg_id"][index]),
+            "start": _time(cols["seg_start"][index]),
+            "end": _time(cols["seg_end"][index]),
+            "text": self._text("seg_text", cols["seg_text_offsets"], index),
+        }
+        for field in SEGMENT_METRICS:
+            value = _from_float(cols[f"seg_{field}"][index])
+            if value is not None:
+                seg_dict[field] = value
+        # Arquivos gravados antes da coluna de chaves adicionais não a têm
+        if "seg_extra" in cols:
+            extra = self._text("seg_extra", cols["seg_extra_offsets"], index)
+            if extra:
+                seg_dict.update(json.loads(extra))
+        first, last = int(cols["seg_word_offsets"][index]), int(cols["seg_word_offsets"][index + 1])
+        if include_words and last > first:
+            seg_dict["words"] = [self.word(i) for i in range(first, last)]
+        return seg_dict
+
+    def word_range(self, start, end):
+        """
+        Retorna os índices das palavras que se sobrepõem ao intervalo [start, end).
+
+        Args:
+            start (float): Início do intervalo (s).
+            end (float): Fim do intervalo (s).
+
+        Returns:
+            np.ndarray: Índices das palavras, em ordem.
+        """
+        word_start, word_end = self.columns["word_start"], self.columns["word_end"]
+        if self.header["sorted"]:
+            # Busca binária pelas palavras que começam dentro do intervalo
+            first = int(np.searchsorted(word_start, start, side="left"))
+            last = int(np.searchsorted(word_start, end, side="left"))
+            # Inclui palavras que começam antes do intervalo mas ainda o alcançam
+            while first > 0 and word_end[first - 1] > start:
+                first -= 1
+            indices = np.arange(first, last)
+            return indices[word_end[first:last] > start]
+        return np.nonzero((word_start < end) & (word_end > start))[0]
+
+    def words_between(self, start, end):
+        """
+        Retorna as palavras que se sobrepõem a um intervalo de tempo.
+
+        Args:
+            start (float): Início do intervalo (s).
+            end (float): Fim do intervalo (s).
+
+        Returns:
+            list: Palavras no formato do JSON de palavras.
+        """
+        return [self.word(int(i)) for i in self.word_range(start, end)]
+
+    def segments_between(self, start, end, include_words=True):
+        """
+        Retorna os segmentos que se sobrepõem a um intervalo de tempo.
+
+        Args:
+            start (float): Início do intervalo (s).
+            end (float): Fim do intervalo (s).
+            include_words (bool): Se True, inclui as palavras de cada segmento.
+
+        Returns:
+            list: Segmentos no formato do JSON de palavras.
+        """
+        seg_start, seg_end = self.columns["seg_start"], self.columns["seg_end"]
+        indices = np.nonzero((seg_start < end) & (seg_end > start))[0]
+        return [self.segment(int(i), include_words) for i in indices]
+
+    def iter_segments(self):
+        """Percorre todos os segmentos no formato do JSON de palavras."""
+        for index in range(self.segment_count):
+            yield self.segment(index)
+
+
+def load_segments(base_name, words_dir=None):
+    """
+    Carrega os segmentos de uma transcrição, preferindo o arquivo colunar ao JSON.
+
+    Args:
+        base_name (str): Nome base da transcrição (video_id).
+        words_dir (str, optional): Diretório das transcrições (padrão: WORDS_DIR do config).
+
+    Returns:
+        list or None: Segmentos no formato do JSON de palavras, ou None se não houver nenhum dos arquivos.
+    """
+    words_dir = str(words_dir or WORDS_DIR)
+    store_path = word_store_path(base_name, words_dir)
+    if os.path.exists(store_path):
+        try:
+            return list(WordStore(store_path).iter_segments())
+        except (ValueError, OSError) as e:
+            logger.warning(f"Arquivo colunar ilegível ({store_path}); usando o JSON: {e}")
+    json_path = os.path.join(words_dir, f"{base_name}.json")
+    if os.path.exists(json_path):
+        with open(json_path, encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def convert_directory(words_dir=None, overwrite=False):
+    """
+    Converte os arquivos {id}.json existentes de um diretório para o formato colunar.
+
+    Args:
+        words_dir (str, optional): Diretório das transcrições (padrão: WORDS_DIR do config).
+        overwrite (bool): Se True, regrava arquivos colunares já existentes.
+
+    Returns:
+        int: Número de arquivos convertidos.
+    """
+    words_dir = str(words_dir or WORDS_DIR)
+    converted = 0
+    for filename in sorted(os.listdir(words_dir)):
+        if not filename.endswith(".json"):
+            continue
+        base_name = filename[:-len(".json")]
+        store_path = word_store_path(base_name, words_dir)
+        if os.path.exists(store_path) and not overwrite:
+            continue
+        try:
+            with open(os.path.join(words_dir, filename), encoding="utf-8") as f:
+                segments = json.load(f)
+            write_word_store(segments, store_path)
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            logger.warning(f"Não foi possível converter {filename}: {e}")
+            continue
+        json_size = os.path.getsize(os.path.join(words_dir, filename))
+        logger.info(f"{filename} convertido ({json_size / 1024:.0f} KB -> {os.path.getsize(store_path) / 1024:.0f} KB)")
+        converted += 1
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Converte os JSON de palavras existentes para o formato colunar.")
+    parser.add_argument("-d", "--words-dir", default=str(WORDS_DIR),
+                        help=f"Diretório das transcrições (padrão: {WORDS_DIR})")
+    parser.add_argument("--overwrite", action="store_true", help="Regrava arquivos colunares já existentes")
+    args = parser.parse_args()
+
+    total = convert_directory(args.words_dir, overwrite=args.overwrite)
+    logger.info(f"{total} transcrição(ões) convertida(s) para o formato colunar.")
@@ -0,0 +1,196 @@
+"""
+Módulo de pool de processos para transcrição em CPU.
+Distribui uma fila de video_ids entre vários processos, cada um com seu próprio
+modelo (Faster-Whisper por padrão) e uma fatia dos núcleos disponíveis.
+"""
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.utils.logger import setup_logger
+from src.config import WORKER_POOL_THREADS_PER_WORKER
+
+# Configurar logger para este módulo
+logger = setup_logger(__name__)
+
+# Configuração do processo worker atual (definida pelo inicializador do pool)
+_worker_settings = {}
+
+
+def derive_pool_size(workers=None, threads_per_worker=None, cpu_count=None):
+    """
+    Calcula o número de processos e de threads por processo a partir dos núcleos disponíveis.
+
+    Args:
+        workers (int, optional): Número de processos desejado (None ou 0 = automático).
+        threads_per_worker (int, optional): Threads por processo (None ou 0 = automático).
+        cpu_count (int, optional): Número de núcleos (padrão: os.cpu_count()).
+
+    Returns:
+        tuple: (workers, threads_per_worker)
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if not workers:
+        per_worker = threads_per_worker or WORKER_POOL_THREADS_PER_WORKER
+        workers = max(1, cpu_count // per_worker)
+    if not threads_per_worker:
+        threads_per_worker = max(1, cpu_count // workers)
+    return workers, threads_per_worker
+
+
+def _init_worker(threads_per_worker, backend=None, model_size=None):
+    """
+    Inicializa um processo do pool limitando as threads das bibliotecas numéricas e
+    carregando o modelo (warm-up) antes da primeira tarefa.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+    _worker_settings["cpu_threads"] = threads_per_worker
+    if backend is None:
+        return
+    from src.backends import create_transcriber
+    from src.autotune import apply_tuned_settings
+
+    start_time = time.time()
+    try:
+        # Mesma configuração do pipeline, para que a transcrição encontre o modelo no cache do processo
+        transcriber = create_transcriber(backend, model_size=model_size, device="cpu")
+        apply_tuned_settings(transcriber)
+        transcriber.load_options.update(cpu_threads=threads_per_worker, num_workers=1)
+        transcriber.load()
+        transcriber.release()
+    except Exception as e:
+        logger.warning(f"Warm-up do modelo falhou no processo {os.getpid()}: {e}")
+        return
+    _worker_settings["warmup_seconds"] = time.time() - start_time
+
+
+def _transcribe_in_worker(video_id, audio_dir, backend, options):
+    """Transcreve um video_id dentro de um processo do pool."""
+    from src.backends import get_backend
+
+    start_time = time.time()
+    stats = {}
+    # O warm-up do processo é atribuído à sua primeira tarefa
+    warmup_seconds = _worker_settings.pop("warmup_seconds", 0.0)
+    try:
+        success = get_backend(backend).transcribe_by_video_id(
+            video_id,
+            audio_dir,
+            stats=stats,
+            device="cpu",
+            cpu_threads=_worker_settings.get("cpu_threads"),
+            num_workers=1,
+            # Os workers já são o pool de transcrição: nunca repassam ao daemon
+            **dict(options, use_daemon=False)
+        )
+    except Exception as e:
+        logger.error(f"Erro no worker ao transcrever {video_id}: {e}")
+        success = False
+    return {
+        "video_id": video_id,
+        "success": bool(success),
+        "elapsed": time.time() - start_time - stats.get("warmup_seconds", 0.0),
+        "warmup_seconds": warmup_seconds + stats.get("warmup_seconds", 0.0),
+        "audio_seconds": stats.get("audio_seconds", 0.0),
+        "wall_seconds": stats.get("wall_seconds", 0.0),
+        "cache_hit": stats.get("cache_hit", False),
+        "saved_seconds": stats.get("saved_seconds", 0.0),
+        "profile": stats.get("profile"),
+        "redecoded_fraction": stats.get("redecoded_fraction", 0.0),
+        "cascade_seconds": stats.get("cascade_seconds", 0.0),
+        "cascade_fraction": stats.get("cascade_fraction", 0.0),
+        "hallucination_seconds": stats.get("hallucination_seconds", 0.0),
+        "resources": stats.get("resources"),
+        "worker_pid": os.getpid(),
+    }
+
+
+class TranscriptionWorkerPool:
+    """Pool de processos de transcrição na CPU (backends com supports_worker_pool)."""
+
+    def __init__(self, workers=None, threads_per_worker=None, audio_dir=None, backend="faster-whisper",
+                 **transcription_options):
+        """
+        Inicializa o pool.
+
+        Args:
+            workers (int, optional): Número de processos (None ou 0 = automático).
+            threads_per_worker (int, optional): Threads de CPU por processo (None ou 0 = automático).
+            audio_dir (str, optional): Diretório dos arquivos de áudio.
+            backend (str): Nome do backend de transcrição usado nos processos.
+            **transcription_options: Opções repassadas a transcribe_by_video_id do backend.
+        """
+        if not workers and not threads_per_worker:
+            # Divisão dos núcleos calibrada para este host (python -m src.autotune)
+            from src.autotune import tuned_settings
+            from src.backends import get_backend
+            tuned = tuned_settings(backend, transcription_options.get("model_size")
+                                   or get_backend(backend).default_model_size, "cpu")
+            if tuned and tuned.get("workers"):
+                workers, threads_per_worker = tuned["workers"], tuned["threads_per_worker"]
+        self.workers, self.threads_per_worker = derive_pool_size(workers, threads_per_worker)
+        self.audio_dir = audio_dir
+        self.backend = backend
+        self.options = {k: v for k, v in transcription_options.items() if v is not None}
+        self._executor = None
+
+    def __enter__(self):
+        logger.info(f"Iniciando pool de transcrição: {self.workers} processo(s) x {self.threads_per_worker} thread(s)")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, self.backend, self.options.get("model_size")),
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Encerra os processos do pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def transcribe(self, video_ids):
+        """
+        Transcreve uma fila de video_ids distribuindo-os entre os processos.
+
+        Args:
+            video_ids (list): IDs dos vídeos a transcrever.
+
+        Returns:
+            list: Um dicionário por vídeo (na ordem de entrada) com video_id, success, elapsed,
+                  warmup_seconds (carregamento do modelo, fora de elapsed), audio_seconds, wall_seconds, cache_hit, saved_seconds, profile,
+                  redecoded_fraction, cascade_seconds, cascade_fraction, hallucination_seconds,
+                  resources (picos de recursos do processo) e worker_pid.
+        """
+        if self._executor is None:
+            raise RuntimeError("O pool deve ser usado dentro de um bloco 'with'.")
+
+        futures = {
+            self._executor.submit(_transcribe_in_worker, video_id, self.audio_dir, self.backend, self.options): video_id
+            for video_id in video_ids
+        }
+        results = {}
+        for done, future in enumerate(as_completed(futures), 1):
+            video_id = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Processo do pool falhou ao transcrever {video_id}: {e}")
+                result = {"video_id": video_id, "success": False, "elapsed": 0.0, "warmup_seconds": 0.0,
+                          "audio_seconds": 0.0,
+                          "wall_seconds": 0.0, "cache_hit": False, "saved_seconds": 0.0, "profile": None,
+                          "redecoded_fraction": 0.0, "cascade_seconds": 0.0, "cascade_fraction": 0.0,
+                          "hallucination_seconds": 0.0,
+                          "resources": None, "worker_pid": None}
+            results[video_id] = result
+            status = "concluído" if result["success"] else "falhou"
+            logger.info(f"[{done}/{len(futures)}] {video_id} {status} em {result['elapsed']:.1f}s")
+
+        successful = sum(1 for r in results.values() if r["success"])
+        logger.info(f"Pool finalizado. {successful}/{len(video_ids)} arquivos transcritos com sucesso.")
+        return [results[video_id] for video_id in video_ids]
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Permite importar o pacote src a partir da raiz do projeto
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(ROOT, "tests", "fixtures")
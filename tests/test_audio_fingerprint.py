@@ -0,0 +1,88 @@
+import numpy as np
+
+from src.audio_fingerprint import (SAMPLE_RATE, FingerprintIndex, compute_fingerprint, find_duplicates,
+                                   resolve_pending_duplicates, reuse_sections)
+
+
+def synthetic_audio(seconds, seed=0):
+    """Ruído com envelope espectral variando no tempo, como a fala."""
+    rng = np.random.default_rng(seed)
+    noise = rng.standard_normal(seconds * SAMPLE_RATE).astype(np.float32)
+    envelope = np.repeat(rng.uniform(0.1, 1.0, seconds * 10), SAMPLE_RATE // 10).astype(np.float32)
+    tones = np.sin(2 * np.pi * np.cumsum(np.repeat(rng.uniform(300, 2500, seconds * 5), SAMPLE_RATE // 5))
+                   / SAMPLE_RATE).astype(np.float32)
+    return 0.1 * envelope * (noise + 4 * tones)
+
+
+def reencoded(audio, seed=1):
+    """Volume reduzido, ruído de quantização e suavização (perda de agudos)."""
+    rng = np.random.default_rng(seed)
+    smoothed = np.convolve(audio, np.ones(3, dtype=np.float32) / 3, mode='same')
+    return (0.6 * smoothed + 0.002 * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+def indexed(tmp_path, **audios):
+    index = FingerprintIndex(tmp_path / "fingerprints")
+    for video_id, audio in audios.items():
+        index.add(video_id, compute_fingerprint(audio), len(audio) / SAMPLE_RATE)
+    return index
+
+
+def test_reencoded_audio_is_found(tmp_path):
+    original = synthetic_audio(60)
+    index = indexed(tmp_path, original=original, other=synthetic_audio(60, seed=7))
+    match = index.find_duplicate(compute_fingerprint(reencoded(original)))
+    assert match["video_id"] == "original"
+    assert match["offset_seconds"] == 0.0
+    assert match["coverage"] > 0.99
+
+
+def test_offset_audio_reports_offset(tmp_path):
+    original = synthetic_audio(60)
+    index = indexed(tmp_path, original=original)
+    # Mesmo clipe sem os 2 primeiros segundos
+    match = index.find_duplicate(compute_fingerprint(reencoded(original[2 * SAMPLE_RATE:])),
+                                 min_coverage=0.9)
+    assert match["video_id"] == "original"
+    assert abs(match["offset_seconds"] - 2.0) <= 0.1
+
+
+def test_unrelated_audio_is_not_a_duplicate(tmp_path):
+    index = indexed(tmp_path, original=synthetic_audio(60))
+    assert index.find_duplicate(compute_fingerprint(synthetic_audio(60, seed=3))) is None
+
+
+def test_queue_entries_stay_pending_until_transcribed(tmp_path, monkeypatch):
+    audio = synthetic_audio(30)
+    audios = {"first": audio, "copy": reencoded(audio)}
+    monkeypatch.setattr("src.audio_fingerprint.find_audio_file", lambda video_id, audio_dir: video_id)
+    monkeypatch.setattr("src.audio_fingerprint.fingerprint_file",
+                        lambda path: (compute_fingerprint(audios[path]), len(audios[path]) / SAMPLE_RATE))
+    words_dir = tmp_path / "words"
+    words_dir.mkdir()
+    index = FingerprintIndex(tmp_path / "fingerprints")
+
+    remaining, matches = find_duplicates(["first", "copy"], "audios", str(words_dir), index=index)
+    assert remaining == ["first"]
+    assert [m["duplicate_of"] for m in matches] == ["first"]
+    assert index.pending_ids() == {"first"}
+
+    # Execução interrompida antes da transcrição: a entrada pendente não serve de origem
+    remaining, matches = find_duplicates(["copy"], "audios", str(words_dir), index=FingerprintIndex(index.index_dir))
+    assert remaining == ["copy"] and matches == []
+
+    (words_dir / "first.txt").write_text(" olá", encoding="utf-8")
+    index = FingerprintIndex(index.index_dir)
+    resolve_pending_duplicates([], str(words_dir), failed={"copy"}, compute_seconds={"first": 12.5}, index=index)
+    assert index.pending_ids() == set()
+    assert index.meta["first"]["compute_seconds"] == 12.5
+    assert "copy" not in index.meta
+
+
+def test_duplicate_reuses_source_sections(tmp_path):
+    assert not reuse_sections("first", "copy", str(tmp_path))
+    (tmp_path / "first_split.json").write_text('[{"start": 0.0, "end": 1.0, "text": "olá"}]', encoding="utf-8")
+    (tmp_path / "first_split.txt").write_text("olá\n\n", encoding="utf-8")
+    assert reuse_sections("first", "copy", str(tmp_path))
+    assert (tmp_path / "copy_split.json").read_text(encoding="utf-8") == (tmp_path / "first_split.json").read_text(encoding="utf-8")
+    assert (tmp_path / "copy_split.txt").exists()
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.audio_stream import (SAMPLE_RATE, ArrayAudioReader, CachedFileAudioReader, open_audio_reader,
+                              transcribe_windows)
+
+
+class FakeTranscriber:
+    """Um segmento por segundo de áudio recebido, com timestamps absolutos."""
+
+    def transcribe(self, audio, offset=0.0, **options):
+        seconds = int(len(audio) / SAMPLE_RATE)
+        return [{"start": offset + i, "end": offset + i + 1.0, "text": f" {offset + i:.0f}"}
+                for i in range(seconds)], None
+
+
+def cached(tmp_path, seconds):
+    path = tmp_path / "audio.f32"
+    np.arange(seconds * SAMPLE_RATE, dtype=np.float32).tofile(path)
+    return np.memmap(path, dtype=np.float32, mode='r')
+
+
+def test_memmap_is_read_from_file(tmp_path):
+    audio = cached(tmp_path, 3)
+    with open_audio_reader(audio, start=1.0) as reader:
+        assert isinstance(reader, CachedFileAudioReader)
+        block = reader.read(SAMPLE_RATE)
+        assert not isinstance(block, np.memmap)
+        np.testing.assert_array_equal(block, np.asarray(audio[SAMPLE_RATE:2 * SAMPLE_RATE]))
+        assert len(reader.read(5 * SAMPLE_RATE)) == SAMPLE_RATE
+        assert reader.eof
+
+
+def test_windows_match_array_reader(tmp_path):
+    audio = cached(tmp_path, 25)
+    from_file = list(transcribe_windows(FakeTranscriber(), audio, window_seconds=10, margin_seconds=2))
+    from_array = list(transcribe_windows(FakeTranscriber(), np.asarray(audio).copy(), window_seconds=10,
+                                         margin_seconds=2))
+    assert from_file == from_array
+    assert [seg["start"] for seg in from_file] == list(range(25))
+    assert isinstance(open_audio_reader(np.zeros(10, dtype=np.float32)), ArrayAudioReader)
@@ -0,0 +1,47 @@
+import src.autotune as autotune
+from src.autotune import apply_tuned_settings, save_settings, tuned_settings
+from src.backends.base import Transcriber
+
+BEST = {"compute_type": "int8", "cpu_threads": 4, "workers": 2, "threads_per_worker": 2}
+
+
+class FakeTranscriber(Transcriber):
+    name = "fake"
+    default_model_size = "small"
+
+
+def calibrated(monkeypatch, tmp_path):
+    path = str(tmp_path / "autotune.json")
+    monkeypatch.setattr(autotune, "AUTOTUNE_FILE", path)
+    monkeypatch.setattr(autotune, "AUTOTUNE_ENABLED", True)
+    monkeypatch.setattr(autotune, "_settings_cache", {})
+    save_settings("fake", "small", "cpu", BEST, [dict(BEST, rtf=0.1)])
+    return path
+
+
+def test_tuned_settings_are_per_model_and_device(monkeypatch, tmp_path):
+    path = calibrated(monkeypatch, tmp_path)
+    assert tuned_settings("fake", "small", "cpu") == BEST
+    assert tuned_settings("fake", "small", "cpu", path=path) == BEST
+    assert tuned_settings("fake", "medium", "cpu") is None
+    assert tuned_settings("fake", "small", "cuda") is None
+    monkeypatch.setattr(autotune, "AUTOTUNE_ENABLED", False)
+    assert tuned_settings("fake", "small", "cpu") is None
+
+
+def test_apply_tuned_settings_keeps_explicit_threads(monkeypatch, tmp_path):
+    calibrated(monkeypatch, tmp_path)
+    transcriber = FakeTranscriber(device="cpu", compute_type="float32")
+    assert apply_tuned_settings(transcriber) == BEST
+    assert (transcriber.compute_type, transcriber.load_options) == ("int8", {"cpu_threads": 4})
+
+    explicit = FakeTranscriber(device="cpu", cpu_threads=8)
+    apply_tuned_settings(explicit)
+    assert explicit.load_options == {"cpu_threads": 8}
+
+    # Transcrição em trechos: só o compute_type calibrado
+    chunked = FakeTranscriber(device="cpu")
+    apply_tuned_settings(chunked, cpu_threads=False)
+    assert (chunked.compute_type, chunked.load_options) == ("int8", {})
+
+    assert apply_tuned_settings(FakeTranscriber("medium", device="cpu")) is None
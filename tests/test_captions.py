@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from src.config import CAPTION_MIN_COVERAGE
+from src.download_audio import (
+    parse_captions, select_caption_track, caption_coverage, captions_from_track, transcript_from_caption_file
+)
+from conftest import FIXTURES_DIR
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, "captions", name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_auto_rolling_lines_are_deduplicated():
+    segments = parse_captions(read_fixture("auto_rolling.pt.vtt"))
+    assert [seg["text"] for seg in segments] == [
+        " olá pessoal tudo bem",
+        " hoje vamos falar de economia",
+        " e política & cultura",
+    ]
+    assert [seg["id"] for seg in segments] == [1, 2, 3]
+    assert (segments[0]["start"], segments[0]["end"]) == (0.16, 2.869)
+
+
+def test_auto_word_times_come_from_inline_tags():
+    words = parse_captions(read_fixture("auto_rolling.pt.vtt"))[0]["words"]
+    assert [w["word"] for w in words] == [" olá", " pessoal", " tudo", " bem"]
+    assert [w["start"] for w in words] == [0.16, 0.48, 0.96, 1.36]
+    assert words[-1]["end"] == 2.869
+    assert all(w["probability"] is None for w in words)
+
+
+def test_manual_srt_keeps_repeated_and_numeric_lines():
+    segments = parse_captions(read_fixture("manual.pt.srt"))
+    assert [seg["text"] for seg in segments] == [
+        " Você concorda?",
+        " Sim.",
+        " Sim.",
+        " Foram 2024 10",
+        " Fim da conversa.",
+    ]
+    assert (segments[1]["start"], segments[1]["end"]) == (3.6, 4.4)
+
+
+def test_manual_words_are_spread_over_the_cue():
+    words = parse_captions(read_fixture("manual.pt.srt"))[0]["words"]
+    assert [w["word"] for w in words] == [" Você", " concorda?"]
+    assert words[0]["start"] == 1.0
+    assert words[-1]["end"] == 3.5
+    assert words[0]["end"] == words[1]["start"]
+
+
+def test_kind_overrides_detection():
+    content = read_fixture("auto_rolling.pt.vtt")
+    assert len(parse_captions(content, kind="auto")) == 3
+    # Sem a remoção da rolagem, as legendas de 10 ms que repetem a linha anterior são mantidas
+    assert len(parse_captions(content, kind="manual")) == 5
+
+
+def test_caption_coverage():
+    segments = parse_captions(read_fixture("low_coverage.pt.vtt"))
+    assert caption_coverage(segments, 600) == pytest.approx(5 / 600)
+    assert caption_coverage(segments, 600) < CAPTION_MIN_COVERAGE
+    assert caption_coverage(segments, None) is None
+    assert caption_coverage(parse_captions(read_fixture("manual.pt.srt")), 5) == 1.0
+
+
+def test_low_coverage_track_falls_back_to_asr():
+    track = {"kind": "manual", "language": "pt"}
+    assert captions_from_track(read_fixture("low_coverage.pt.vtt"), track, duration=600) is None
+    assert captions_from_track("WEBVTT\n\n", track, duration=600) is None
+    result = captions_from_track(read_fixture("manual.pt.srt"), track, duration=12)
+    assert result["source"] == "captions"
+    assert result["coverage"] == pytest.approx(8.2 / 12)
+    assert len(result["segments"]) == 5
+
+
+def _tracks(*exts):
+    return [{"ext": ext, "url": f"https://example.com/{ext}"} for ext in exts]
+
+
+def test_select_prefers_manual_track():
+    info = {"language": "pt", "subtitles": {"pt-BR": _tracks("srt", "vtt")},
+            "automatic_captions": {"pt-orig": _tracks("vtt")}}
+    track = select_caption_track(info, ["pt"])
+    assert (track["kind"], track["language"], track["ext"]) == ("manual", "pt-BR", "vtt")
+
+
+def test_select_auto_only_in_original_language():
+    info = {"language": "pt", "subtitles": {"live_chat": _tracks("json")},
+            "automatic_captions": {"pt": _tracks("vtt"), "pt-orig": _tracks("json3", "vtt")}}
+    track = select_caption_track(info, ["pt"])
+    assert (track["kind"], track["language"], track["ext"]) == ("auto", "pt-orig", "vtt")
+    # Em um vídeo em inglês, a faixa automática em português é uma tradução
+    assert select_caption_track(dict(info, language="en"), ["pt"]) is None
+    assert select_caption_track(info, ["pt"], accept_auto=False) is None
+
+
+def test_select_skips_unsupported_formats():
+    info = {"subtitles": {"pt": _tracks("json3", "ttml")}}
+    assert select_caption_track(info, ["pt"]) is None
+    assert select_caption_track({}, ["pt"]) is None
+
+
+def test_transcript_from_caption_file(tmp_path):
+    path = os.path.join(FIXTURES_DIR, "captions", "auto_rolling.pt.vtt")
+    output_txt = transcript_from_caption_file(path, "abc", str(tmp_path))
+    with open(output_txt, encoding="utf-8") as f:
+        text = f.read()
+    assert "olá pessoal tudo bem" in text
+    assert text.count("olá pessoal") == 1
@@ -0,0 +1,72 @@
+import numpy as np
+
+from src.chunked_transcription import plan_chunks, stitch_chunks
+
+
+def word(text, start, end):
+    return {"word": " " + text, "start": start, "end": end, "probability": 0.9}
+
+
+def segment(words):
+    return {"id": 0, "start": words[0]["start"], "end": words[-1]["end"],
+            "text": "".join(w["word"] for w in words), "words": words}
+
+
+CHUNKS = [
+    {"start": 0.0, "end": 12.0, "keep_start": 0.0, "keep_end": 10.0},
+    {"start": 8.0, "end": 20.0, "keep_start": 10.0, "keep_end": 20.0},
+]
+
+
+def test_overlap_words_are_kept_once():
+    # As duas janelas decodificam a sobreposição 8-12 s
+    first = [segment([word("um", 1.0, 2.0), word("dois", 2.0, 3.0)]),
+             segment([word("três", 8.5, 9.5), word("quatro", 9.6, 10.3), word("cinco", 10.6, 11.5)])]
+    second = [segment([word("três", 8.4, 9.4), word("quatro", 9.5, 10.2), word("cinco", 10.5, 11.4)]),
+              segment([word("seis", 15.0, 16.0)])]
+    stitched = stitch_chunks([first, second], CHUNKS)
+    words = [w["word"].strip() for seg in stitched for w in seg["words"]]
+    assert words == ["um", "dois", "três", "quatro", "cinco", "seis"]
+    assert [seg["id"] for seg in stitched] == list(range(1, len(stitched) + 1))
+
+
+def test_trimmed_segment_text_and_bounds_follow_kept_words():
+    first = [segment([word("três", 8.5, 9.5), word("quatro", 9.6, 10.3), word("cinco", 10.6, 11.5)])]
+    second = [segment([word("cinco", 10.5, 11.4), word("seis", 11.5, 12.5)])]
+    stitched = stitch_chunks([first, second], CHUNKS)
+    assert stitched[0]["text"] == " três quatro"
+    assert (stitched[0]["start"], stitched[0]["end"]) == (8.5, 10.3)
+    assert stitched[1]["text"] == " cinco seis"
+
+
+def test_stitched_timestamps_are_monotonic():
+    first = [segment([word("a", 9.0, 9.9)])]
+    # Palavra do trecho seguinte com início anterior ao fim da última mantida
+    second = [segment([word("b", 9.95, 10.6), word("c", 10.7, 11.0)])]
+    stitched = stitch_chunks([first, second], CHUNKS)
+    times = [(w["start"], w["end"]) for seg in stitched for w in seg["words"]]
+    for (_, previous_end), (start, end) in zip(times, times[1:]):
+        assert start >= previous_end
+        assert end >= start
+
+
+def test_segments_without_words_are_kept_by_midpoint():
+    first = [{"id": 0, "start": 1.0, "end": 4.0, "text": " antes"},
+             {"id": 0, "start": 9.0, "end": 12.0, "text": " sobreposto"}]
+    second = [{"id": 0, "start": 9.2, "end": 11.8, "text": " sobreposto"},
+              {"id": 0, "start": 14.0, "end": 15.0, "text": " depois"}]
+    stitched = stitch_chunks([first, second], CHUNKS)
+    assert [seg["text"] for seg in stitched] == [" antes", " sobreposto", " depois"]
+
+
+def test_plan_chunks_covers_audio_and_cuts_in_silence():
+    sample_rate = 16000
+    audio = np.full(60 * sample_rate, 0.3, dtype=np.float32)
+    audio[int(19.5 * sample_rate):int(20.5 * sample_rate)] = 0.0
+    chunks = plan_chunks(audio, chunk_seconds=20, overlap_seconds=2, search_seconds=3)
+    assert chunks[0]["keep_start"] == 0.0
+    assert chunks[-1]["keep_end"] == 60.0
+    assert 19.5 <= chunks[0]["keep_end"] <= 20.5
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous["keep_end"] == current["keep_start"]
+        assert current["start"] == current["keep_start"] - 2
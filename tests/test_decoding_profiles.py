@@ -0,0 +1,80 @@
+import numpy as np
+
+from src.backends.base import Transcriber
+from src.config import FALLBACK_COMPRESSION_RATIO_THRESHOLD, FALLBACK_LOGPROB_THRESHOLD
+from src.decoding_profiles import CascadeRedecoder, SegmentRedecoder, needs_redecode
+
+
+class FakeTranscriber(Transcriber):
+    name = "fake"
+    default_model_size = "small"
+
+
+class RedecodeTranscriber(FakeTranscriber):
+    """Devolve, a cada chamada, um segmento com o avg_logprob informado, registrando os trechos decodificados."""
+
+    def __init__(self, avg_logprob):
+        super().__init__(device="cpu")
+        self.avg_logprob = avg_logprob
+        self.calls = []
+
+    def transcribe(self, audio, offset=0.0, **options):
+        self.calls.append((offset, len(audio), options))
+        end = offset + len(audio) / self.sample_rate
+        segment = {"id": None, "start": offset, "end": end, "text": " feixe", "avg_logprob": self.avg_logprob}
+        return iter([segment]), None
+
+
+def segment(start, end, avg_logprob=-0.2, **fields):
+    return dict({"id": None, "start": start, "end": end, "text": " guloso", "avg_logprob": avg_logprob}, **fields)
+
+
+def redecoder(avg_logprob):
+    transcriber = RedecodeTranscriber(avg_logprob)
+    audio = np.zeros(60 * transcriber.sample_rate, dtype=np.float32)
+    return SegmentRedecoder(transcriber, lambda: audio, beam_size=5, word_timestamps=False)
+
+
+def test_needs_redecode_thresholds():
+    assert not needs_redecode(segment(0, 1, FALLBACK_LOGPROB_THRESHOLD + 0.1, compression_ratio=1.5))
+    assert needs_redecode(segment(0, 1, FALLBACK_LOGPROB_THRESHOLD - 0.1))
+    assert needs_redecode(segment(0, 1, compression_ratio=FALLBACK_COMPRESSION_RATIO_THRESHOLD + 0.1))
+    # Provável silêncio: não vale a re-decodificação, mesmo com baixa confiança
+    assert not needs_redecode(segment(0, 1, FALLBACK_LOGPROB_THRESHOLD - 0.1, no_speech_prob=0.9))
+
+
+def test_redecode_keeps_the_more_confident_decode():
+    better = redecoder(-0.3)
+    result = list(better.process([segment(0.0, 2.0), segment(2.0, 5.0, -1.5)]))
+    assert [seg["text"] for seg in result] == [" guloso", " feixe"]
+    assert [seg["id"] for seg in result] == [1, 2]
+    offset, samples, options = better.transcriber.calls[0]
+    assert (offset, samples) == (2.0, 3 * better.transcriber.sample_rate)
+    assert (options["beam_size"], options["temperature"], options["word_timestamps"]) == (5, 0.0, False)
+
+    worse = redecoder(-2.0)
+    result = list(worse.process([segment(2.0, 5.0, -1.5)]))
+    assert [seg["text"] for seg in result] == [" guloso"]
+    assert worse.redecoded_segments == 1
+
+
+def test_short_segments_are_not_redecoded_and_fraction_is_reported():
+    redec = redecoder(-0.3)
+    list(redec.process([segment(0.0, 0.1, -1.5), segment(10.0, 16.0, -1.5)]))
+    assert len(redec.transcriber.calls) == 1
+    stats = redec.stats(60.0)
+    assert stats["redecoded_segments"] == 1
+    assert stats["redecoded_seconds"] == 6.0
+    assert stats["redecoded_fraction"] == 0.1
+    assert redec.stats(0.0)["redecoded_fraction"] == 0.0
+
+
+def test_cascade_model_inherits_compute_type_and_threads():
+    small = FakeTranscriber(device="cpu", compute_type="int8", cpu_threads=6)
+    cascade = CascadeRedecoder(small, lambda: None, "large-v3")
+    large = cascade.transcriber
+    assert type(large) is FakeTranscriber
+    assert large.model_size == "large-v3"
+    assert (large.device, large.compute_type) == ("cpu", "int8")
+    assert large.load_options == {"cpu_threads": 6}
+    assert large.model is None
@@ -0,0 +1,61 @@
+from src.hallucination_guard import HallucinationGuard
+
+SPEECH = [" o prefeito anunciou hoje", " as obras começam em março", " segundo a secretaria de obras",
+          " o custo estimado é alto", " a população aprovou a ideia"]
+
+
+def seg(start, text, **fields):
+    return dict({"id": 0, "start": float(start), "end": float(start + 2), "text": text}, **fields)
+
+
+def timeline(texts, start=0):
+    return [seg(start + 2 * i, text) for i, text in enumerate(texts)]
+
+
+def test_repetition_loop_is_replaced_by_marker():
+    guard = HallucinationGuard(min_segments=3)
+    texts = SPEECH[:2] + [" obrigado por assistir"] * 7 + SPEECH[2:]
+    out = list(guard.process(timeline(texts)))
+    markers = [s for s in out if "hallucination" in s]
+    assert len(markers) == 1
+    # A primeira ocorrência é legítima; as 6 repetições seguintes são descartadas
+    assert markers[0]["hallucination"]["dropped_segments"] == 6
+    assert markers[0]["hallucination"]["reasons"] == ["repetition"]
+    assert (markers[0]["start"], markers[0]["end"]) == (6.0, 18.0)
+    assert [s["text"] for s in out if s["text"]] == SPEECH[:2] + [" obrigado por assistir"] + SPEECH[2:]
+    assert [s["id"] for s in out] == list(range(1, len(out) + 1))
+    assert guard.stats(30.0)["hallucination_seconds"] == 12.0
+
+
+def test_short_repetition_is_kept():
+    guard = HallucinationGuard(min_segments=3)
+    texts = SPEECH[:2] + [" muito obrigado"] * 3 + SPEECH[2:]
+    out = list(guard.process(timeline(texts)))
+    assert [s["text"] for s in out] == texts
+    assert guard.regions == []
+
+
+def test_restart_skips_ahead_of_loop():
+    restarts = []
+
+    def restart(at):
+        restarts.append(at)
+        return iter(timeline(SPEECH[2:], start=at))
+
+    guard = HallucinationGuard(restart=restart, duration=100.0, min_segments=3, skip_seconds=10)
+    loop = timeline(SPEECH[:1] + [" la la la"] * 4 + SPEECH[1:])
+    out = list(guard.process(iter(loop)))
+    # Laço de 4-10 s (três repetições após a primeira ocorrência): retoma em 10 + 10 s
+    assert restarts == [20.0]
+    marker = next(s for s in out if "hallucination" in s)
+    assert (marker["start"], marker["end"]) == (4.0, 20.0)
+    assert out[-1]["text"] == SPEECH[-1] and out[-1]["start"] == 20.0 + 2 * (len(SPEECH) - 3)
+
+
+def test_quality_checks_only_when_enabled():
+    bad = [seg(2 * i, f" palavra{i} diferente{i} texto{i}", compression_ratio=3.5) for i in range(4)]
+    out = list(HallucinationGuard(check_quality=False, min_segments=3).process(list(map(dict, bad))))
+    assert all("hallucination" not in s for s in out)
+    guard = HallucinationGuard(check_quality=True, min_segments=3)
+    out = list(guard.process(list(map(dict, bad))))
+    assert guard.regions and guard.regions[0]["reasons"] == {"compression_ratio"}
@@ -0,0 +1,39 @@
+import src.model_registry as model_registry
+from src.model_registry import ModelRegistry
+
+
+def fake_registry(monkeypatch, max_memory_mb):
+    loads = []
+
+    def load(model_size, device, compute_type, **load_kwargs):
+        loads.append((model_size, load_kwargs))
+        return object()
+    monkeypatch.setitem(model_registry.MODEL_LOADERS, "fake", load)
+    return ModelRegistry(max_memory_mb=max_memory_mb), loads
+
+
+def test_lru_eviction_skips_models_in_use(monkeypatch):
+    # Cada "small" em float32 ocupa ~970 MB: cabem dois no orçamento
+    registry, loads = fake_registry(monkeypatch, 2000)
+    in_use = registry.get_model("fake", "small", "cpu", cpu_threads=1)
+    registry.get_model("fake", "small", "cpu", cpu_threads=2)
+    registry.release("fake", "small", "cpu", cpu_threads=2)
+    registry.get_model("fake", "small", "cpu", cpu_threads=3)
+    # O mais antigo ainda está em uso: o descartado é o seguinte, já devolvido
+    cached = [key[-1] for key in registry._models]
+    assert cached == [("cpu_threads", 1), ("cpu_threads", 3)]
+    assert registry.get_model("fake", "small", "cpu", cpu_threads=1) is in_use
+    assert (registry.hits, registry.misses, len(loads)) == (1, 3, 3)
+
+
+def test_release_counts_references(monkeypatch):
+    registry, loads = fake_registry(monkeypatch, 2000)
+    model = registry.get_model("fake", "base", "cpu")
+    assert registry.get_model("fake", "base", "cpu") is model
+    registry.release("fake", "base", "cpu")
+    assert not registry.unload("fake", "base", "cpu")
+    registry.release("fake", "base", "cpu")
+    assert registry.stats()["in_use"] == []
+    assert registry.unload("fake", "base", "cpu")
+    assert registry.stats()["models"] == []
+    assert len(loads) == 1
@@ -0,0 +1,65 @@
+import hashlib
+import os
+
+import pytest
+
+import src.model_store as model_store
+from src.model_store import model_dir, prefetch, resolve_model, verify
+
+WEIGHTS = b"pesos do modelo" * 100
+
+
+def fake_fetcher(monkeypatch, published=None):
+    def fetch(model_size, target):
+        with open(os.path.join(target, "model.bin"), "wb") as f:
+            f.write(WEIGHTS)
+        return f"hub/{model_size}", {"model.bin": published or hashlib.sha256(WEIGHTS).hexdigest()}
+    monkeypatch.setitem(model_store.MODEL_FETCHERS, "faster-whisper", fetch)
+
+
+def test_verify_against_manifest(monkeypatch, tmp_path):
+    fake_fetcher(monkeypatch)
+    manifest = prefetch("faster-whisper", "small", root=tmp_path)
+    assert manifest["upstream_verified"] == ["model.bin"]
+    assert verify("faster-whisper", "small", root=tmp_path) == []
+
+    weights = os.path.join(model_dir("faster-whisper", "small", tmp_path), "model.bin")
+    with open(weights, "r+b") as f:
+        f.write(b"X")
+    assert verify("faster-whisper", "small", root=tmp_path, checksums=False) == []
+    assert verify("faster-whisper", "small", root=tmp_path) == ["model.bin: SHA-256 não confere"]
+    os.remove(weights)
+    assert verify("faster-whisper", "small", root=tmp_path) == ["model.bin: arquivo ausente"]
+    assert verify("faster-whisper", "base", root=tmp_path)[0].startswith("manifesto ausente")
+
+
+def test_prefetch_replaces_directory_without_manifest(monkeypatch, tmp_path):
+    fake_fetcher(monkeypatch)
+    directory = model_dir("faster-whisper", "small", tmp_path)
+    os.makedirs(directory)
+    with open(os.path.join(directory, "model.bin"), "wb") as f:
+        f.write(b"incompleto")
+    prefetch("faster-whisper", "small", root=tmp_path)
+    assert verify("faster-whisper", "small", root=tmp_path) == []
+    assert os.listdir(os.path.dirname(directory)) == ["small"]
+
+
+def test_prefetch_rejects_checksum_mismatch(monkeypatch, tmp_path):
+    fake_fetcher(monkeypatch, published="0" * 64)
+    with pytest.raises(ValueError):
+        prefetch("faster-whisper", "small", root=tmp_path)
+    assert os.listdir(os.path.join(tmp_path, "faster-whisper")) == []
+
+
+def test_resolve_model_offline_requires_local_copy(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_store, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(model_store, "MODEL_STORE_ENABLED", True)
+    monkeypatch.setattr(model_store, "MODEL_STORE_OFFLINE", True)
+    with pytest.raises(FileNotFoundError):
+        resolve_model("faster-whisper", "small")
+
+    fake_fetcher(monkeypatch)
+    prefetch("faster-whisper", "small")
+    assert resolve_model("faster-whisper", "small") == model_dir("faster-whisper", "small", tmp_path)
+    # Caminhos locais são carregados diretamente, sem o repositório
+    assert resolve_model("faster-whisper", str(tmp_path)) is None
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from src.scheduler import estimate_rtf, plan_schedule, record_rtf
+
+
+def test_longest_first_with_unknown_duration_estimated_by_mean():
+    schedule = plan_schedule({"short": 60.0, "unknown": None, "long": 600.0, "mid": 240.0}, workers=1, rtf=0.5)
+    # Desconhecida = média das conhecidas (300 s)
+    assert schedule["order"] == ["long", "unknown", "mid", "short"]
+    unknown = next(a for a in schedule["assignments"] if a["video_id"] == "unknown")
+    assert unknown["audio_seconds"] == 300.0 and not unknown["duration_known"]
+    assert schedule["audio_seconds"] == 1200.0
+    assert schedule["estimated_seconds"] == 600.0
+
+
+def test_parallel_eta_follows_first_free_worker():
+    schedule = plan_schedule({"a": 100.0, "b": 80.0, "c": 60.0, "d": 30.0}, workers=2, rtf=1.0)
+    by_id = {a["video_id"]: a for a in schedule["assignments"]}
+    assert (by_id["a"]["worker"], by_id["b"]["worker"]) == (0, 1)
+    # c vai para o processo de b (livre em 80 s), d para o de a (livre em 100 s)
+    assert (by_id["c"]["worker"], by_id["c"]["start"], by_id["c"]["end"]) == (1, 80.0, 140.0)
+    assert (by_id["d"]["worker"], by_id["d"]["start"], by_id["d"]["end"]) == (0, 100.0, 130.0)
+    assert schedule["estimated_seconds"] == 140.0
+    eta = datetime.fromisoformat(schedule["eta"])
+    assert 130 <= (eta - datetime.now()).total_seconds() <= 141
+
+
+def test_empty_queue():
+    schedule = plan_schedule({}, workers=4)
+    assert schedule["order"] == [] and schedule["estimated_seconds"] == 0.0
+
+
+def test_recorded_rtf_is_smoothed_and_skips_cache_hits(tmp_path):
+    path = str(tmp_path / "rtf.json")
+    results = [{"success": True, "elapsed": 30.0, "audio_seconds": 100.0},
+               {"success": True, "cache_hit": True, "elapsed": 0.1, "audio_seconds": 500.0},
+               {"success": False, "elapsed": 5.0, "audio_seconds": 50.0}]
+    assert record_rtf("fw", "small", 2, results, path) == 0.3
+    assert estimate_rtf("fw", "small", 2, path) == (0.3, "history")
+    record_rtf("fw", "small", 2, [{"success": True, "elapsed": 50.0, "audio_seconds": 100.0}], path)
+    assert estimate_rtf("fw", "small", 2, path) == (0.4, "history")
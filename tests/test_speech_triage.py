@@ -0,0 +1,64 @@
+import numpy as np
+
+import src.speech_triage as speech_triage
+from src.speech_triage import (SAMPLE_RATE, no_speech_marker, no_speech_outdated, speech_ratio, triage_file,
+                               write_no_speech_transcript)
+
+
+class WindowAudio:
+    """Áudio acessado só por fatias, como o LazyAudio, registrando os trechos lidos."""
+
+    def __init__(self, audio):
+        self.audio = audio
+        self.reads = []
+
+    def __getitem__(self, key):
+        self.reads.append((key.start, key.stop))
+        return self.audio[key].copy()
+
+
+def tone(seconds, amplitude=0.1):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_only_sampled_windows_are_read():
+    audio = WindowAudio(tone(600))
+    ratio, sampled_seconds, _ = speech_ratio(audio, windows=12, window_seconds=10, total_samples=600 * SAMPLE_RATE)
+    assert len(audio.reads) == 12
+    assert sampled_seconds == 120
+    assert ratio > 0.99
+
+
+def test_silence_has_no_speech():
+    ratio, _, _ = speech_ratio(np.zeros(60 * SAMPLE_RATE, dtype=np.float32), windows=4, window_seconds=5)
+    assert ratio == 0.0
+
+
+def test_triage_without_cache_seeks_windows(monkeypatch):
+    audio = WindowAudio(np.concatenate([tone(100, 0.0), tone(200)]))
+    monkeypatch.setattr(speech_triage, "AUDIO_CACHE_ENABLED", False)
+    monkeypatch.setattr(speech_triage, "probe_duration", lambda path: 300.0)
+    monkeypatch.setattr(speech_triage, "LazyAudio", lambda path: audio)
+
+    def full_decode(path):
+        raise AssertionError("o arquivo inteiro não deve ser decodificado")
+    monkeypatch.setattr("src.audio_cache.load_audio", full_decode)
+
+    result = triage_file("video.m4a", threshold=0.5, use_daemon=False)
+    assert len(audio.reads) == speech_triage.SPEECH_TRIAGE_WINDOWS
+    assert result["audio_seconds"] == 300.0
+    assert result["has_speech"]
+
+
+def test_no_speech_transcript_is_redone_when_it_would_now_pass(tmp_path):
+    result = {"speech_ratio": 0.03, "threshold": 0.05, "sampled_seconds": 120.0, "method": "silero",
+              "audio_seconds": 600.0}
+    write_no_speech_transcript("music", str(tmp_path), result)
+    assert no_speech_marker("music", str(tmp_path))["speech_ratio"] == 0.03
+    assert not no_speech_outdated("music", str(tmp_path), threshold=0.05)
+    assert no_speech_outdated("music", str(tmp_path), threshold=0.02)
+    assert no_speech_outdated("music", str(tmp_path), speech_triage=False)
+    # Transcrições comuns nunca são refeitas
+    (tmp_path / "talk.txt").write_text("Olá", encoding="utf-8")
+    assert not no_speech_outdated("talk", str(tmp_path), speech_triage=False)
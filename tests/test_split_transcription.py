@@ -0,0 +1,73 @@
+import numpy as np
+
+from src.split_transcription import (SAMPLE_RATE, refine_block_edges, split_transcription_json,
+                                     split_transcription_segments)
+
+
+def seg(start, end, text):
+    return {"id": 0, "start": start, "end": end, "text": " " + text}
+
+
+def words(n, tag):
+    return " ".join(f"{tag}{i}" for i in range(n))
+
+
+def test_blocks_follow_segment_and_sentence_boundaries():
+    segments = [
+        seg(0.0, 4.0, words(12, "a")), seg(4.0, 9.0, words(12, "b") + "."),
+        # Marcador de laço descartado: sem texto, não entra nos blocos
+        {"id": 0, "start": 9.0, "end": 20.0, "text": "", "hallucination": {"reasons": ["repetition"]}},
+        seg(20.0, 26.0, words(20, "c") + "."),
+        seg(26.0, 30.0, words(15, "d") + "!"),
+    ]
+    blocks = split_transcription_segments(segments, target_words=30, tolerance=10)
+    assert [(b["start"], b["end"]) for b in blocks] == [(0.0, 9.0), (20.0, 30.0)]
+    assert blocks[0]["text"] == words(12, "a") + " " + words(12, "b") + "."
+    assert blocks[1]["text"].split()[-1] == "d14!"
+
+
+def test_oversized_sentence_becomes_its_own_block():
+    segments = [seg(0.0, 5.0, words(12, "a") + "."), seg(5.0, 60.0, words(80, "b") + "."),
+                seg(60.0, 65.0, words(12, "c") + ".")]
+    blocks = split_transcription_segments(segments, target_words=30, tolerance=10)
+    assert [(b["start"], b["end"]) for b in blocks] == [(0.0, 5.0), (5.0, 60.0), (60.0, 65.0)]
+
+
+def test_audio_is_only_loaded_for_segment_only_transcripts():
+    calls = []
+
+    def load_audio():
+        calls.append(True)
+        return None
+
+    with_words = [dict(seg(0.0, 1.0, "olá."), words=[{"word": " olá.", "start": 0.1, "end": 0.9, "probability": 0.9}])]
+    split_transcription_json(with_words, load_audio=load_audio)
+    assert calls == []
+    blocks = split_transcription_json([seg(0.0, 1.0, "olá.")], load_audio=load_audio)
+    assert calls == [True] and blocks[0]["text"] == "olá."
+
+
+def speech_between(*ranges, seconds=20):
+    rng = np.random.default_rng(0)
+    audio = (1e-4 * rng.standard_normal(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in ranges:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] += (
+            0.1 * rng.standard_normal(int((end - start) * SAMPLE_RATE))).astype(np.float32)
+    return audio
+
+
+def test_edges_move_inward_to_speech():
+    # Fala em 1-4.7 s e 5.3-9 s; os segmentos incluem a pausa entre os blocos
+    audio = speech_between((1.0, 4.7), (5.3, 9.0))
+    blocks = refine_block_edges([{"start": 0.5, "end": 5.0, "text": "a"}, {"start": 5.0, "end": 9.5, "text": "b"}],
+                                audio, search_seconds=1.0)
+    assert abs(blocks[0]["start"] - 1.0) <= 0.03 and abs(blocks[0]["end"] - 4.7) <= 0.03
+    assert abs(blocks[1]["start"] - 5.3) <= 0.03 and abs(blocks[1]["end"] - 9.0) <= 0.03
+    assert blocks[0]["end"] <= blocks[1]["start"]
+
+
+def test_edges_never_move_outward():
+    # A fala começa antes da borda do bloco (o segmento anterior a inclui): a borda é mantida
+    audio = speech_between((1.0, 9.0))
+    blocks = refine_block_edges([{"start": 3.0, "end": 6.0, "text": "a"}], audio, search_seconds=1.0)
+    assert (blocks[0]["start"], blocks[0]["end"]) == (3.0, 6.0)
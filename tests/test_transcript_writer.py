@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+
+from src.audio_stream import SAMPLE_RATE, transcribe_windows
+from src.transcript_writer import StreamingTranscriptWriter, load_checkpoint
+
+
+def seg(seg_id, start, end, text):
+    return {"id": seg_id, "start": start, "end": end, "text": text,
+            "words": [{"word": text, "start": start, "end": end, "probability": 0.9}]}
+
+
+class FakeTranscriber:
+    """Um segmento por segundo de áudio recebido, com timestamps absolutos."""
+
+    def transcribe(self, audio, offset=0.0, **options):
+        return [seg(0, offset + i, offset + i + 1.0, f" {offset + i:.0f}")
+                for i in range(int(len(audio) / SAMPLE_RATE))], None
+
+
+def test_torn_last_line_is_dropped_on_resume(tmp_path):
+    with StreamingTranscriptWriter("video", tmp_path, params={"model_size": "small"}) as writer:
+        writer.write_segment(seg(1, 0.0, 1.5, " olá"))
+        writer.write_segment(seg(2, 1.5, 3.0, " mundo"))
+        writer.abort()
+    # Processo interrompido no meio da gravação do terceiro segmento
+    with open(tmp_path / "video.partial.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"id": 3, "start": 3.0, "end"')
+    assert load_checkpoint("video", tmp_path)["params"] == {"model_size": "small"}
+
+    with StreamingTranscriptWriter("video", tmp_path, resume=True) as writer:
+        assert (writer.segment_count, writer.last_end) == (2, 3.0)
+        writer.write_segment(seg(3, 3.0, 4.0, " de novo"))
+        output_txt, output_json = writer.finalize()
+
+    with open(output_json, encoding="utf-8") as f:
+        assert [s["id"] for s in json.load(f)] == [1, 2, 3]
+    with open(output_txt, encoding="utf-8") as f:
+        assert f.read() == " olá  mundo  de novo"
+    assert not (tmp_path / "video.partial.jsonl").exists()
+    assert load_checkpoint("video", tmp_path) is None
+
+
+def test_fresh_start_discards_old_checkpoint(tmp_path):
+    with StreamingTranscriptWriter("video", tmp_path) as writer:
+        writer.write_segment(seg(1, 0.0, 1.0, " a"))
+        writer.abort()
+    with StreamingTranscriptWriter("video", tmp_path) as writer:
+        assert (writer.segment_count, writer.last_end) == (0, 0.0)
+        assert load_checkpoint("video", tmp_path) is None
+        writer.abort()
+
+
+def test_resume_seam_has_no_gap_or_overlap(tmp_path):
+    audio = np.zeros(40 * SAMPLE_RATE, dtype=np.float32)
+    options = dict(window_seconds=10, margin_seconds=2)
+    with StreamingTranscriptWriter("video", tmp_path) as writer:
+        for seg_dict in transcribe_windows(FakeTranscriber(), audio, **options):
+            writer.write_segment(seg_dict)
+            if writer.segment_count == 13:
+                break
+        writer.abort()
+
+    # Na retomada, a decodificação recomeça no fim do último segmento gravado
+    with StreamingTranscriptWriter("video", tmp_path, resume=True) as writer:
+        for seg_dict in transcribe_windows(FakeTranscriber(), audio, start=writer.last_end, **options):
+            writer.write_segment(seg_dict)
+        segments = list(writer.iter_segments())
+        writer.finalize()
+    assert [s["start"] for s in segments] == list(range(40))
+    assert all(a["end"] == b["start"] for a, b in zip(segments, segments[1:]))
@@ -0,0 +1,79 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from src import transcription_cache as tc
+from src.transcription_cache import TranscriptionCache, cache_key
+
+PARAMS = {"backend": "faster-whisper", "model_size": "small", "compute_type": "int8", "language": "pt",
+          "beam_size": 5}
+
+
+def test_cache_key_is_stable_and_parameter_sensitive():
+    assert cache_key("abc", PARAMS) == cache_key("abc", dict(reversed(list(PARAMS.items()))))
+    assert cache_key("abc", PARAMS) != cache_key("abd", PARAMS)
+    assert cache_key("abc", PARAMS) != cache_key("abc", dict(PARAMS, beam_size=1))
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF" + os.urandom(256))
+    return str(path)
+
+
+def write_outputs(directory, base_name):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{base_name}.txt"), "w", encoding="utf-8") as f:
+        f.write("olá mundo")
+    with open(os.path.join(directory, f"{base_name}.json"), "w", encoding="utf-8") as f:
+        json.dump([{"id": 1, "start": 0.0, "end": 1.0, "text": " olá mundo"}], f)
+
+
+def test_round_trip_materializes_under_new_name(tmp_path, audio_file):
+    cache = TranscriptionCache(cache_dir=tmp_path / "cache")
+    words_dir = str(tmp_path / "words")
+    write_outputs(words_dir, "original")
+
+    assert cache.get(audio_file, PARAMS, "copia", words_dir) is None
+    cache.put(audio_file, PARAMS, "original", 12.5, words_dir)
+    meta = cache.get(audio_file, PARAMS, "copia", words_dir)
+
+    assert meta["base_name"] == "original"
+    assert meta["compute_seconds"] == 12.5
+    with open(os.path.join(words_dir, "copia.txt"), encoding="utf-8") as f:
+        assert f.read() == "olá mundo"
+    assert os.path.exists(os.path.join(words_dir, "copia.json"))
+    # Outros parâmetros, outra entrada
+    assert cache.get(audio_file, dict(PARAMS, beam_size=1), "outra", words_dir) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "saved_seconds": 12.5}
+    leftovers = [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_disabled_cache_does_nothing(tmp_path, audio_file):
+    cache = TranscriptionCache(cache_dir=tmp_path / "cache", enabled=False)
+    write_outputs(str(tmp_path / "words"), "original")
+    cache.put(audio_file, PARAMS, "original", 1.0, str(tmp_path / "words"))
+    assert cache.get(audio_file, PARAMS, "copia", str(tmp_path / "words")) is None
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def _record_misses(cache_dir, count):
+    cache = TranscriptionCache(cache_dir=cache_dir)
+    for _ in range(count):
+        cache._record(hit=False)
+
+
+@pytest.mark.skipif(tc.fcntl is None, reason="sem fcntl (lock apenas entre threads)")
+def test_stats_are_not_lost_across_processes(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_record_misses, args=(cache_dir, 25)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert TranscriptionCache(cache_dir=cache_dir).stats()["misses"] == 100
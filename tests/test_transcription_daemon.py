@@ -0,0 +1,83 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+import src.transcription_daemon as transcription_daemon
+from src.transcription_daemon import TranscriptionDaemon, _RequestHandler, _UnixServer, transcribe_via_daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requer sockets Unix")
+
+
+class FakeDaemon(TranscriptionDaemon):
+    """Daemon cujas transcrições são substituídas por uma função de teste."""
+
+    def __init__(self, socket_path, work):
+        super().__init__(socket_path)
+        self.work = work
+
+    def handle(self, message, on_start=None):
+        with self._transcribe_lock:
+            if on_start is not None:
+                on_start()
+            return self.work(message)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    monkeypatch.setattr(transcription_daemon, "TRANSCRIPTION_DAEMON_HEARTBEAT_SECONDS", 0.05)
+    servers = []
+
+    def start(work):
+        # Caminho curto: sockets Unix têm limite de ~100 caracteres
+        socket_path = os.path.join(tempfile.mkdtemp(dir="/tmp"), "d.sock")
+        server = _UnixServer(socket_path, _RequestHandler)
+        server.daemon = FakeDaemon(socket_path, work)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return socket_path
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+        os.remove(server.server_address)
+
+
+def test_success_fills_stats(serve):
+    socket_path = serve(lambda message: {"success": True, "stats": {"audio_seconds": 12.0}})
+    stats = {}
+    assert transcribe_via_daemon("faster-whisper", "abc", "audios", stats=stats, socket_path=socket_path) is True
+    assert stats == {"audio_seconds": 12.0, "daemon": True}
+
+
+def test_not_running_falls_back(tmp_path):
+    assert transcribe_via_daemon("faster-whisper", "abc", "audios", socket_path=str(tmp_path / "none.sock")) is None
+    # Socket órfão (daemon encerrado sem removê-lo): a conexão é recusada antes do aceite
+    stale = os.path.join(tempfile.mkdtemp(dir="/tmp"), "stale.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(stale)
+    sock.close()
+    assert transcribe_via_daemon("faster-whisper", "abc", "audios", socket_path=stale) is None
+
+
+def test_error_after_accept_does_not_fall_back(serve):
+    def fail(message):
+        raise RuntimeError("arquivo corrompido")
+    socket_path = serve(fail)
+    assert transcribe_via_daemon("faster-whisper", "abc", "audios", socket_path=socket_path) is False
+
+
+def test_hung_transcription_stops_heartbeats(serve, monkeypatch):
+    monkeypatch.setattr(transcription_daemon, "TRANSCRIPTION_DAEMON_REQUEST_TIMEOUT", 0.2)
+    release = threading.Event()
+    socket_path = serve(lambda message: release.wait(5) and {"success": True})
+    start = time.time()
+    try:
+        assert transcribe_via_daemon("faster-whisper", "abc", "audios", socket_path=socket_path) is False
+    finally:
+        release.set()
+    assert time.time() - start < 2
@@ -0,0 +1,53 @@
+import json
+
+from src.word_store import WordStore, load_segments, word_store_path, write_word_store
+
+SEGMENTS = [
+    {"id": 1, "start": 0.0, "end": 2.48, "text": " Olá, açúcar!", "avg_logprob": -0.25, "compression_ratio": 1.3,
+     "no_speech_prob": 0.01,
+     "words": [{"word": " Olá,", "start": 0.0, "end": 0.9, "probability": 0.9},
+               {"word": " açúcar!", "start": 1.1, "end": 2.48, "probability": 0.875}]},
+    # Segmento sem palavras nem métricas (ex: modo só com timestamps de segmento)
+    {"id": 2, "start": 2.5, "end": 6.123, "text": " Sem palavras."},
+    {"id": 3, "start": 6.2, "end": 8.0, "text": " fim",
+     "words": [{"word": " fim", "start": 6.2, "end": 8.0, "probability": None}]},
+]
+
+
+def test_round_trip_preserves_segments(tmp_path):
+    store = WordStore(write_word_store(SEGMENTS, str(tmp_path / "video.words.bin")))
+    assert (store.segment_count, len(store)) == (3, 3)
+    restored = list(store.iter_segments())
+    expected = json.loads(json.dumps(SEGMENTS))
+    del expected[2]["words"][0]["probability"]
+    restored[2]["words"][0].pop("probability")
+    assert restored == expected
+
+
+def test_time_range_queries(tmp_path):
+    store = WordStore(write_word_store(SEGMENTS, str(tmp_path / "video.words.bin")))
+    assert [w["word"] for w in store.words_between(0.95, 1.2)] == [" açúcar!"]
+    # Palavra que começa antes do intervalo, mas ainda o alcança
+    assert [w["word"] for w in store.words_between(2.0, 2.1)] == [" açúcar!"]
+    assert [s["id"] for s in store.segments_between(2.4, 6.5, include_words=False)] == [1, 2, 3]
+    assert store.words_between(8.0, 9.0) == []
+
+
+def test_extra_segment_keys_round_trip(tmp_path):
+    segments = [
+        {"id": 1, "start": 0.0, "end": 30.0, "text": "",
+         "no_speech": {"speech_ratio": 0.01, "threshold": 0.05, "sampled_seconds": 30.0, "method": "energy"}},
+        {"id": 2, "start": 30.0, "end": 32.5, "text": "",
+         "hallucination": {"reasons": ["repetition"], "dropped_segments": 4, "sample": " Obrigado."}},
+    ]
+    store = WordStore(write_word_store(segments + SEGMENTS[1:2], str(tmp_path / "video.words.bin")))
+    assert list(store.iter_segments()) == segments + SEGMENTS[1:2]
+
+
+def test_load_segments_prefers_store_and_falls_back_to_json(tmp_path):
+    with open(tmp_path / "video.json", "w", encoding="utf-8") as f:
+        json.dump(SEGMENTS[:1], f)
+    assert load_segments("video", tmp_path) == SEGMENTS[:1]
+    write_word_store(SEGMENTS, word_store_path("video", tmp_path))
+    assert len(load_segments("video", tmp_path)) == 3
+    assert load_segments("missing", tmp_path) is None
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import src.worker_pool as worker_pool
+from src.worker_pool import TranscriptionWorkerPool, derive_pool_size
+
+
+class FakeBackend:
+    """Backend que "transcreve" os IDs conhecidos e falha nos demais, registrando as opções recebidas."""
+    calls = []
+
+    @classmethod
+    def transcribe_by_video_id(cls, video_id, audio_dir=None, stats=None, **options):
+        cls.calls.append((video_id, options))
+        if video_id == "broken":
+            raise RuntimeError("modelo corrompido")
+        stats.update({"audio_seconds": 60.0, "profile": options.get("profile")})
+        return video_id != "missing"
+
+
+def thread_pool(monkeypatch):
+    # Threads no lugar de processos (sem __enter__): o backend falso existe só neste processo
+    monkeypatch.setattr("src.backends.get_backend", lambda name: FakeBackend)
+    FakeBackend.calls = []
+    pool = TranscriptionWorkerPool(workers=2, threads_per_worker=3, audio_dir="audios", backend="fake",
+                                   profile="fast", cascade_model=None)
+    pool._executor = ThreadPoolExecutor(max_workers=2)
+    return pool
+
+
+def test_derive_pool_size():
+    assert derive_pool_size(cpu_count=8, threads_per_worker=2) == (4, 2)
+    assert derive_pool_size(workers=3, cpu_count=8) == (3, 2)
+    assert derive_pool_size(workers=16, cpu_count=8) == (16, 1)
+
+
+def test_results_and_failures_propagate_in_input_order(monkeypatch):
+    pool = thread_pool(monkeypatch)
+    results = pool.transcribe(["ok", "missing", "broken"])
+    pool.close()
+    assert [(r["video_id"], r["success"]) for r in results] == [("ok", True), ("missing", False), ("broken", False)]
+    assert results[0]["audio_seconds"] == 60.0
+    assert results[0]["profile"] == "fast"
+    options = dict(FakeBackend.calls)["ok"]
+    assert (options["device"], options["num_workers"], options["use_daemon"]) == ("cpu", 1, False)
+    assert "cascade_model" not in options
+
+
+def test_crashed_worker_is_reported_as_failure(monkeypatch):
+    def crash(video_id, audio_dir, backend, options):
+        raise OSError("processo encerrado")
+    monkeypatch.setattr(worker_pool, "_transcribe_in_worker", crash)
+    pool = thread_pool(monkeypatch)
+    results = pool.transcribe(["a", "b"])
+    pool.close()
+    assert [(r["video_id"], r["success"], r["worker_pid"]) for r in results] == [("a", False, None), ("b", False, None)]